@@ -0,0 +1,84 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Query
+from typing import Optional
+from app.core.config import get_settings
+from app.core.job_manager import create_job, run_async_job
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+def require_admin(x_admin_token: str = Header("", alias="X-Admin-Token")):
+    """Admin endpoints need the X-Admin-Token header to match ADMIN_TOKEN."""
+    token = get_settings().ADMIN_TOKEN
+    if not token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_admin_token != token:
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+@router.get("/fastf1-cache", dependencies=[Depends(require_admin)])
+def get_fastf1_cache_stats():
+    """
+    Size of the FastF1 disk cache, its budget, and every cached session
+    ordered by last access (most recent first).
+    """
+    from app.core.fastf1_client import cache_manager, failed_loads
+    return {**cache_manager.stats(), "failed_loads": failed_loads.stats()}
+
+
+@router.delete("/fastf1-cache/failures", dependencies=[Depends(require_admin)])
+def clear_failed_loads():
+    """Forget remembered session load failures so the next request retries immediately."""
+    from app.core.fastf1_client import failed_loads
+    failed_loads.clear()
+    return {"cleared": True}
+
+
+@router.post("/fastf1-cache/scan", dependencies=[Depends(require_admin)])
+def scan_fastf1_cache():
+    """Re-measure the cache directory (e.g. after files were removed by hand) and apply the budget."""
+    from app.core.fastf1_client import cache_manager
+    cache_manager.scan()
+    evicted = cache_manager.enforce_budget()
+    return {"evicted": evicted, "total_bytes": cache_manager.total_bytes()}
+
+
+@router.post("/fastf1-cache/prefetch", dependencies=[Depends(require_admin)])
+def prefetch_fastf1_cache(
+    bg_tasks: BackgroundTasks,
+    days_back: int = Query(7, ge=0, le=60),
+    days_ahead: int = Query(7, ge=0, le=60),
+):
+    """
+    Warm the disk cache from the race calendar in the background.
+    Poll /jobs/{job_id} for the loaded/skipped/failed sessions.
+    """
+    from app.core.fastf1_cache_manager import prefetch_calendar
+    job_id = create_job()
+    bg_tasks.add_task(run_async_job, job_id, prefetch_calendar, days_back, days_ahead)
+    return {"job_id": job_id, "status": "pending"}
+
+
+@router.delete("/artifacts", dependencies=[Depends(require_admin)])
+def invalidate_artifacts(
+    year: Optional[int] = Query(None, ge=1950),
+    round: Optional[int] = Query(None, ge=1),
+    session: Optional[str] = Query(None, description="FP1, FP2, FP3, Q, S, SQ, R"),
+    data_type: Optional[str] = Query(None, description="e.g. stints; also removes variants like minisectors_25"),
+    all: bool = Query(False, description="Required to delete every artifact when no filter is given"),
+):
+    """Delete computed artifacts from fastf1_cache so they are recomputed on the next request."""
+    if year is None and round is None and session is None and data_type is None and not all:
+        raise HTTPException(status_code=400, detail="Give at least one filter, or all=true")
+    if round is not None and year is None:
+        raise HTTPException(status_code=400, detail="round requires year")
+
+    from app.services.artifact_cache import invalidate_cached
+    deleted = invalidate_cached(year=year, round=round, session_name=session, data_type=data_type)
+    return {"deleted": deleted}
+
+
+@router.post("/artifacts/purge-expired", dependencies=[Depends(require_admin)])
+def purge_expired_artifacts():
+    """Delete fastf1_cache rows whose TTL has passed (reads already ignore them)."""
+    from app.services.artifact_cache import purge_expired
+    return {"deleted": purge_expired()}
@@ -2,9 +2,12 @@
 API Router — Circuits
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Response
+from app.core.lazy_import import LazyModule
 from app.services import circuit_service
 
+track_geometry_service = LazyModule("app.services.track_geometry_service")
+
 router = APIRouter(prefix="/circuits", tags=["Circuits"])
 
 
@@ -22,3 +25,22 @@ def get_circuit(circuit_id: str):
     if not data:
         raise HTTPException(status_code=404, detail=f"Circuit '{circuit_id}' not found")
     return data
+
+
+@router.get("/layouts/{layout_key}/geometry")
+def get_layout_geometry(
+    layout_key: str,
+    response: Response,
+    level: int = Query(2, ge=0, description="Zoom level: 0 = every point, higher = simpler outline"),
+):
+    """
+    Return the simplified track outline of a circuit layout.
+    Layout keys come from the minisector endpoints (`track_layout`); segment
+    `start_index`/`end_index` refer to the `indices` of the points returned here.
+    """
+    data = track_geometry_service.get_track_geometry_level(layout_key, level)
+    if not data:
+        raise HTTPException(status_code=404, detail=f"Track layout '{layout_key}' not found")
+    # A layout's geometry never changes, so clients can cache it aggressively
+    response.headers["Cache-Control"] = "public, max-age=604800, immutable"
+    return data
@@ -0,0 +1,82 @@
+"""
+API Router — Historical comparisons (head-to-head, teammates, aggregates)
+"""
+
+from fastapi import APIRouter, HTTPException, Query
+from app.core.lazy_import import LazyModule
+
+results_engine = LazyModule("app.services.results_engine")
+
+router = APIRouter(prefix="/compare", tags=["Comparisons"])
+
+
+def _unknown_driver(*driver_ids: str):
+    engine = results_engine.get_engine()
+    missing = next(d for d in driver_ids if engine.driver_code(d) is None)
+    raise HTTPException(status_code=404, detail=f"No results for driver '{missing}'")
+
+
+@router.get("/drivers/{driver_a}/{driver_b}")
+def head_to_head(
+    driver_a: str,
+    driver_b: str,
+    teammates_only: bool = Query(False, description="Only races where both drove for the same constructor"),
+):
+    """
+    Return the race and qualifying record of two drivers in every race both entered:
+    who finished ahead, wins, podiums, points, qualifying and the median qualifying gap,
+    overall and per season.
+    """
+    if driver_a == driver_b:
+        raise HTTPException(status_code=400, detail="Two different drivers are required for a comparison")
+    data = results_engine.get_engine().head_to_head(driver_a, driver_b, teammates_only=teammates_only)
+    if data is None:
+        _unknown_driver(driver_a, driver_b)
+    return data
+
+
+@router.get("/teammates/{driver_id}")
+def get_teammates(driver_id: str):
+    """Return every teammate of a driver, with races together and who finished ahead."""
+    data = results_engine.get_engine().teammates(driver_id)
+    if data is None:
+        _unknown_driver(driver_id)
+    return {"driver_id": driver_id, "total": len(data), "teammates": data}
+
+
+@router.get("/qualifying-gap/{driver_id}")
+def get_qualifying_gap(driver_id: str):
+    """
+    Return a driver's qualifying gap to their teammates, season by season
+    (median of the last session both set a time in; negative = faster).
+    """
+    data = results_engine.get_engine().qualifying_gap(driver_id)
+    if data is None:
+        _unknown_driver(driver_id)
+    return {"driver_id": driver_id, "seasons": data}
+
+
+@router.get("/aggregate")
+def aggregate_results(
+    group_by: str = Query("driver", pattern="^(driver|constructor|year)$"),
+    year_from: int | None = Query(None),
+    year_to: int | None = Query(None),
+    driver_id: str | None = Query(None),
+    constructor_id: str | None = Query(None),
+    grid_min: int | None = Query(None, ge=1, description="Started from this grid slot or further back"),
+    grid_max: int | None = Query(None, ge=1, description="Started from this grid slot or further forward"),
+    order_by: str = Query("wins", pattern="^(entries|starts|wins|podiums|points|poles)$"),
+    limit: int = Query(20, ge=1, le=200),
+):
+    """
+    Filter race results and aggregate them by driver, constructor or year,
+    e.g. `?year_from=2000&grid_min=11&order_by=wins` for wins from outside the top 10.
+    """
+    data = results_engine.get_engine().aggregate(
+        group_by=group_by, year_from=year_from, year_to=year_to,
+        driver_id=driver_id, constructor_id=constructor_id,
+        grid_min=grid_min, grid_max=grid_max, order_by=order_by, limit=limit,
+    )
+    if data is None:
+        raise HTTPException(status_code=404, detail="Unknown driver or constructor filter")
+    return data
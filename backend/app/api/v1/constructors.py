@@ -3,7 +3,7 @@ API Router — Constructors
 """
 
 from fastapi import APIRouter, HTTPException, Query
-from app.services import constructor_service
+from app.services import constructor_service, stats_service
 
 router = APIRouter(prefix="/constructors", tags=["Constructors"])
 
@@ -25,3 +25,18 @@ def get_constructor(constructor_id: str):
     if not data:
         raise HTTPException(status_code=404, detail=f"Constructor '{constructor_id}' not found")
     return data
+
+
+@router.get("/{constructor_id}/stats")
+def get_constructor_stats(
+    constructor_id: str,
+    year: int | None = Query(None, description="Only this season in `seasons`"),
+):
+    """
+    Return precomputed career totals and per-season statistics for a constructor
+    (wins, 1-2 finishes, podiums, poles, points and championship positions...).
+    """
+    data = stats_service.get_constructor_stats(constructor_id, year=year)
+    if not data:
+        raise HTTPException(status_code=404, detail=f"No statistics for constructor '{constructor_id}'")
+    return data
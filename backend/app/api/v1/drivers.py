@@ -3,7 +3,7 @@ API Router — Drivers
 """
 
 from fastapi import APIRouter, HTTPException, Query
-from app.services import driver_service
+from app.services import driver_service, stats_service
 
 router = APIRouter(prefix="/drivers", tags=["Drivers"])
 
@@ -42,3 +42,18 @@ def get_driver_results(
     """Return race results for a driver, optionally filtered by year."""
     data = driver_service.get_driver_results(driver_id, year=year)
     return {"driver_id": driver_id, "total_results": len(data), "results": data}
+
+
+@router.get("/{driver_id}/stats")
+def get_driver_stats(
+    driver_id: str,
+    year: int | None = Query(None, description="Only this season in `seasons`"),
+):
+    """
+    Return precomputed career totals and per-season statistics for a driver
+    (wins, podiums, poles, points, qualifying and championship positions...).
+    """
+    data = stats_service.get_driver_stats(driver_id, year=year)
+    if not data:
+        raise HTTPException(status_code=404, detail=f"No statistics for driver '{driver_id}'")
+    return data
@@ -1,13 +1,25 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from app.services.live_f1_service import live_f1_manager
+from app.core.lazy_import import LazyModule
 import logging
 
 router = APIRouter()
 logger = logging.getLogger("LiveRouter")
 
+# Pulls in the FastF1 SignalR client, so it is only imported once someone uses live timing
+live_f1_service = LazyModule("app.services.live_f1_service")
+
+@router.get("/health")
+def live_health():
+    """
+    Lifecycle status of the upstream live feed.
+    state can be: 'idle', 'running', 'backoff', 'stopping'
+    """
+    return live_f1_service.live_f1_manager.health()
+
 @router.websocket("/ws")
 async def websocket_live_timing(websocket: WebSocket):
-    await live_f1_manager.connect_client(websocket)
+    manager = live_f1_service.live_f1_manager
+    await manager.connect_client(websocket)
     try:
         while True:
             # We don't expect messages from client for now, 
@@ -15,7 +27,7 @@ async def websocket_live_timing(websocket: WebSocket):
             data = await websocket.receive_text()
             # Handle client commands if needed
     except WebSocketDisconnect:
-        live_f1_manager.disconnect_client(websocket)
+        manager.disconnect_client(websocket)
     except Exception as e:
         logger.error(f"WebSocket Error: {e}")
-        live_f1_manager.disconnect_client(websocket)
+        manager.disconnect_client(websocket)
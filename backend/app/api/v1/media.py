@@ -0,0 +1,45 @@
+"""
+API Router — Media derivatives
+"""
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from app.services import media_service
+
+router = APIRouter(prefix="/media", tags=["Media"])
+
+_NOT_BUILT = "No media derivatives have been built (run media_derivatives.py)"
+
+
+@router.get("/manifest")
+def get_media_manifest(
+    request: Request,
+    response: Response,
+    prefix: str = Query("", description="Only assets under this media/ folder, e.g. 'drivers'"),
+):
+    """
+    Map every image under /media to its resized WebP/AVIF variants.
+    Each asset carries the variant URLs (served from /media-derived with immutable
+    caching) and a ready-made `srcset` per format.
+    """
+    version = media_service.manifest_version()
+    if version is None:
+        raise HTTPException(status_code=404, detail=_NOT_BUILT)
+    if request.headers.get("if-none-match") == version:
+        return Response(status_code=304, headers={"ETag": version})
+    data = media_service.get_manifest(prefix)
+    # Changes only when the derivatives are rebuilt
+    response.headers["ETag"] = version
+    response.headers["Cache-Control"] = "public, max-age=300"
+    return data
+
+
+@router.get("/variants/{path:path}")
+def get_media_variants(path: str, response: Response):
+    """Variants of a single image, by its path under /media (e.g. drivers/lewis-hamilton/2025.webp)."""
+    data = media_service.get_asset(path)
+    if data is None:
+        if media_service.load_manifest() is None:
+            raise HTTPException(status_code=404, detail=_NOT_BUILT)
+        raise HTTPException(status_code=404, detail=f"No variants for '{path}'")
+    response.headers["Cache-Control"] = "public, max-age=300"
+    return data
@@ -12,6 +12,9 @@ from app.api.v1.sessions import router as sessions_router
 from app.api.v1.telemetry import router as telemetry_router
 from app.api.v1.jobs import router as jobs_router
 from app.api.v1.live import router as live_router
+from app.api.v1.admin import router as admin_router
+from app.api.v1.media import router as media_router
+from app.api.v1.comparisons import router as comparisons_router
 
 v1_router = APIRouter()
 
@@ -24,3 +27,6 @@ v1_router.include_router(sessions_router)
 v1_router.include_router(telemetry_router)
 v1_router.include_router(jobs_router)
 v1_router.include_router(live_router, prefix="/live", tags=["live"])
+v1_router.include_router(admin_router)
+v1_router.include_router(media_router)
+v1_router.include_router(comparisons_router)
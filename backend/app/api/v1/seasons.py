@@ -2,9 +2,12 @@
 API Router — Seasons & Standings
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Response
+from app.core.lazy_import import LazyModule
 from app.services import season_service
 
+standings_cube = LazyModule("app.services.standings_cube")
+
 router = APIRouter(prefix="/seasons", tags=["Seasons"])
 
 
@@ -36,3 +39,24 @@ def season_constructor_standings(year: int):
     """Return final constructor championship standings for a season."""
     data = season_service.get_season_constructor_standings(year)
     return {"year": year, "standings": data}
+
+
+@router.get("/{year}/standings/progression")
+def season_standings_progression(
+    year: int,
+    response: Response,
+    type: str = Query("drivers", pattern="^(drivers|constructors)$"),
+):
+    """
+    Return the championship standings after every round of a season in one
+    columnar payload: `rounds`/`grand_prix_ids` label the columns, and for each
+    entry in `ids` (ordered by current position) `points[i]` and `positions[i]`
+    hold one value per round.
+    """
+    data = standings_cube.get_cube().progression(year, type)
+    if data is None:
+        raise HTTPException(status_code=404, detail=f"No {type} standings for season {year}")
+    if len(data["rounds"]) >= data["scheduled_rounds"]:
+        # A finished season does not change any more
+        response.headers["Cache-Control"] = "public, max-age=86400"
+    return data
@@ -1,6 +1,12 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from app.services.session_service import get_stints, get_all_laps, get_speed_traps, get_minisectors, get_best_sectors, get_fastf1_summary_data
+from typing import Optional
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Query
+from fastapi.responses import StreamingResponse
 from app.core.job_manager import create_job, run_async_job
+from app.core.lazy_import import LazyModule
+from app.core.session_errors import SessionUnavailableError
+
+session_service = LazyModule("app.services.session_service")
+telemetry_export_service = LazyModule("app.services.telemetry_export_service")
 
 router = APIRouter(prefix="/sessions", tags=["FastF1 Sessions"])
 
@@ -11,8 +17,10 @@ def get_session_stints(year: int, round: int, session_name: str):
     session_name supports: 'FP1', 'FP2', 'FP3', 'Q', 'S', 'SQ', 'R'
     """
     try:
-        stints = get_stints(year, round, session_name)
+        stints = session_service.get_stints(year, round, session_name)
         return {"stints": stints}
+    except SessionUnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -20,7 +28,7 @@ def get_session_stints(year: int, round: int, session_name: str):
 def get_session_stints_job(year: int, round: int, session_name: str, bg_tasks: BackgroundTasks):
     """Async background execution for get_session_stints."""
     job_id = create_job()
-    bg_tasks.add_task(run_async_job, job_id, get_stints, year, round, session_name)
+    bg_tasks.add_task(run_async_job, job_id, session_service.get_stints, year, round, session_name)
     return {"job_id": job_id, "status": "pending"}
 
 @router.get("/{year}/{round}/{session_name}/laps")
@@ -30,15 +38,17 @@ def get_session_laps(year: int, round: int, session_name: str):
     Useful for scatter plots.
     """
     try:
-        laps = get_all_laps(year, round, session_name)
+        laps = session_service.get_all_laps(year, round, session_name)
         return {"laps": laps}
+    except SessionUnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/{year}/{round}/{session_name}/laps/job")
 def get_session_laps_job(year: int, round: int, session_name: str, bg_tasks: BackgroundTasks):
     job_id = create_job()
-    bg_tasks.add_task(run_async_job, job_id, get_all_laps, year, round, session_name)
+    bg_tasks.add_task(run_async_job, job_id, session_service.get_all_laps, year, round, session_name)
     return {"job_id": job_id, "status": "pending"}
 
 @router.get("/{year}/{round}/{session_name}/speed-traps")
@@ -47,26 +57,33 @@ def get_session_speed_traps(year: int, round: int, session_name: str):
     Get max speeds per driver per sector and speed trap.
     """
     try:
-        traps = get_speed_traps(year, round, session_name)
+        traps = session_service.get_speed_traps(year, round, session_name)
         return {"speed_traps": traps}
+    except SessionUnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/{year}/{round}/{session_name}/minisectors")
-def get_session_minisectors(year: int, round: int, session_name: str, num: int = 25):
+def get_session_minisectors(year: int, round: int, session_name: str, num: int = Query(25, ge=1, le=200)):
     """
-    Get the fastest driver for track segments (minisectors) based on telemetry.
+    Get the fastest driver for `num` equal-distance track segments (minisectors)
+    based on every driver's fastest-lap telemetry.
+    Segments reference the shared track outline by index range:
+    fetch it once from /circuits/layouts/{track_layout}/geometry.
     """
     try:
-        segments = get_minisectors(year, round, session_name, num)
-        return {"minisectors": segments}
+        data = session_service.get_minisectors(year, round, session_name, num)
+        return {"minisectors": data["segments"], "track_layout": data["track_layout"]}
+    except SessionUnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/{year}/{round}/{session_name}/speed-traps/job")
 def get_session_speed_traps_job(year: int, round: int, session_name: str, bg_tasks: BackgroundTasks):
     job_id = create_job()
-    bg_tasks.add_task(run_async_job, job_id, get_speed_traps, year, round, session_name)
+    bg_tasks.add_task(run_async_job, job_id, session_service.get_speed_traps, year, round, session_name)
     return {"job_id": job_id, "status": "pending"}
 
 @router.get("/{year}/{round}/{session_name}/best-sectors")
@@ -75,22 +92,93 @@ def get_session_best_sectors(year: int, round: int, session_name: str):
     Get the fastest driver for each sector and judge personal performance.
     """
     try:
-        sectors = get_best_sectors(year, round, session_name)
+        sectors = session_service.get_best_sectors(year, round, session_name)
         return {"best_sectors": sectors}
+    except SessionUnavailableError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/{year}/{round}/{session_name}/conditions")
+def get_session_conditions(
+    year: int,
+    round: int,
+    session_name: str,
+    interval: int = Query(60, ge=10, le=600, description="Weather resampling interval in seconds"),
+):
+    """
+    Get resampled weather, track status intervals, safety car / VSC / red flag
+    periods and race control messages. Times are seconds of session time.
+    """
+    try:
+        return session_service.get_conditions(year, round, session_name, interval)
+    except SessionUnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/{year}/{round}/{session_name}/fastf1-summary")
 def get_fastf1_summary(year: int, round: int, session_name: str):
     """
-    Get stints, speed traps, minisectors, and best sectors in a single request,
+    Get stints, speed traps, minisectors, best sectors and conditions in a single request,
     parsing the FastF1 session exactly once.
     """
     try:
-        summary_data = get_fastf1_summary_data(year, round, session_name)
+        summary_data = session_service.get_fastf1_summary_data(year, round, session_name)
         return summary_data
+    except SessionUnavailableError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _telemetry_export(year: int, round: int, session_name: str, fmt: str,
+                      drivers: Optional[str], channels: Optional[str], media_type: str) -> StreamingResponse:
+    try:
+        selected_channels = telemetry_export_service.parse_selection(channels, telemetry_export_service.EXPORT_CHANNELS)
+        chunks = telemetry_export_service.export_session_telemetry(
+            year, round, session_name, fmt, telemetry_export_service.parse_selection(drivers), selected_channels
+        )
+    except SessionUnavailableError:
+        raise
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=501, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+    filename = f"telemetry_{year}_R{round}_{session_name}.{fmt}"
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
+@router.get("/{year}/{round}/{session_name}/telemetry.parquet")
+def export_session_telemetry_parquet(
+    year: int,
+    round: int,
+    session_name: str,
+    drivers: Optional[str] = Query(None, description="Comma separated, e.g. VER,LEC (default: all)"),
+    channels: Optional[str] = Query(None, description="Comma separated subset of Distance,Speed,RPM,Gear,Throttle,Brake,X,Y,Z"),
+):
+    """
+    Stream the full-session telemetry of all drivers as Parquet, one row group per driver.
+    Every row has Driver, LapNumber and SessionTime (seconds); Distance is lap-relative.
+    """
+    return _telemetry_export(year, round, session_name, "parquet", drivers, channels, "application/vnd.apache.parquet")
 
+@router.get("/{year}/{round}/{session_name}/telemetry.csv.gz")
+def export_session_telemetry_csv(
+    year: int,
+    round: int,
+    session_name: str,
+    drivers: Optional[str] = Query(None, description="Comma separated, e.g. VER,LEC (default: all)"),
+    channels: Optional[str] = Query(None, description="Comma separated subset of Distance,Speed,RPM,Gear,Throttle,Brake,X,Y,Z"),
+):
+    """
+    Stream the full-session telemetry of all drivers as gzip-compressed CSV.
+    Same columns as the Parquet export.
+    """
+    return _telemetry_export(year, round, session_name, "csv.gz", drivers, channels, "application/gzip")
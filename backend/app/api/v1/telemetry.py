@@ -1,55 +1,122 @@
+from typing import List, Optional
 from fastapi import APIRouter, HTTPException, Query, BackgroundTasks
-from app.services.telemetry_service import get_driver_telemetry, compare_telemetry
 from app.core.job_manager import create_job, run_async_job
+from app.core.lazy_import import LazyModule
+from app.core.session_errors import SessionUnavailableError
+
+telemetry_service = LazyModule("app.services.telemetry_service")
 
 router = APIRouter(prefix="/telemetry", tags=["FastF1 Telemetry"])
 
-@router.get("/{year}/{round}/{session_name}/{driver_id}")
-def get_telemetry(year: int, round: int, session_name: str, driver_id: str):
+
+def _compare_drivers(drivers: Optional[str], driver1: Optional[str], driver2: Optional[str]) -> List[str]:
+    """Accept either drivers=VER,LEC,NOR or the older driver1=VER&driver2=LEC form."""
+    if drivers:
+        selected = [d.strip() for d in drivers.split(",") if d.strip()]
+    else:
+        selected = [d for d in (driver1, driver2) if d]
+    selected = list(dict.fromkeys(selected))
+    if len(selected) < 2:
+        raise HTTPException(status_code=400, detail="At least two drivers are required for a comparison")
+    return selected
+
+
+# The compare routes must be declared before /{driver_id}, which would otherwise match "compare"
+@router.get("/{year}/{round}/{session_name}/compare")
+def compare_drivers_telemetry(
+    year: int,
+    round: int,
+    session_name: str,
+    drivers: Optional[str] = Query(None, description="Comma separated, e.g. VER,LEC,NOR"),
+    driver1: Optional[str] = Query(None, description="E.g., VER"),
+    driver2: Optional[str] = Query(None, description="E.g., LEC"),
+    reference: Optional[str] = Query(None, description="Driver the delta is measured against (default: fastest)"),
+):
     """
-    Get detailed telemetry for a driver's fastest lap in a session.
+    Compare the fastest laps of two or more drivers on a common distance grid,
+    with a cumulative delta-time trace to the reference driver.
     """
+    selected = _compare_drivers(drivers, driver1, driver2)
     try:
-        data = get_driver_telemetry(year, round, session_name, driver_id)
+        data = telemetry_service.compare_telemetry(year, round, session_name, selected, reference)
         if not data:
-            raise HTTPException(status_code=404, detail="Telemetry not found for this driver/session")
+            raise HTTPException(status_code=404, detail="Telemetry not found for these drivers/session")
         return data
+    except (HTTPException, SessionUnavailableError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.post("/{year}/{round}/{session_name}/{driver_id}/job")
-def start_telemetry_job(year: int, round: int, session_name: str, driver_id: str, bg_tasks: BackgroundTasks):
-    """Async background execution for telemetry extraction."""
+@router.post("/{year}/{round}/{session_name}/compare/job")
+def compare_drivers_telemetry_job(
+    year: int,
+    round: int,
+    session_name: str,
+    bg_tasks: BackgroundTasks,
+    drivers: Optional[str] = Query(None, description="Comma separated, e.g. VER,LEC,NOR"),
+    driver1: Optional[str] = Query(None, description="E.g., VER"),
+    driver2: Optional[str] = Query(None, description="E.g., LEC"),
+    reference: Optional[str] = Query(None, description="Driver the delta is measured against (default: fastest)"),
+):
+    selected = _compare_drivers(drivers, driver1, driver2)
     job_id = create_job()
-    bg_tasks.add_task(run_async_job, job_id, get_driver_telemetry, year, round, session_name, driver_id)
+    bg_tasks.add_task(run_async_job, job_id, telemetry_service.compare_telemetry, year, round, session_name, selected, reference)
     return {"job_id": job_id, "status": "pending"}
 
-@router.get("/{year}/{round}/{session_name}/compare")
-def compare_drivers_telemetry(
-    year: int, 
-    round: int, 
-    session_name: str, 
-    driver1: str = Query(..., description="E.g., VER"), 
-    driver2: str = Query(..., description="E.g., LEC")
+@router.get("/{year}/{round}/{session_name}/{driver_id}/laps")
+def get_laps_telemetry(
+    year: int,
+    round: int,
+    session_name: str,
+    driver_id: str,
+    start: int = Query(..., ge=1, description="First lap number"),
+    end: Optional[int] = Query(None, ge=1, description="Last lap number (default: start)"),
+    points: Optional[int] = Query(None, ge=20, le=5000, description="Downsample each lap to about this many samples"),
 ):
     """
-    Compare detailed telemetry for two drivers' fastest laps.
+    Get telemetry for any lap, or lap range, of a driver.
+    Time and Distance are relative to the start of each lap.
+    """
+    if end is not None and end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    data = telemetry_service.get_lap_telemetry(year, round, session_name, driver_id, start, end, points)
+    if not data:
+        raise HTTPException(status_code=404, detail="Telemetry not found for these laps")
+    return data
+
+@router.get("/{year}/{round}/{session_name}/{driver_id}")
+def get_telemetry(
+    year: int,
+    round: int,
+    session_name: str,
+    driver_id: str,
+    points: Optional[int] = Query(None, ge=20, le=5000, description="Downsample to about this many samples, e.g. 200 for overview charts"),
+):
+    """
+    Get detailed telemetry for a driver's fastest lap in a session.
+    Without `points` every sample is returned; `points` is rounded up to 250, 500,
+    1000 or 2000 samples, and above 2000 the full lap is returned.
     """
     try:
-        data = compare_telemetry(year, round, session_name, driver1, driver2)
+        data = telemetry_service.get_driver_telemetry(year, round, session_name, driver_id, points)
+        if not data:
+            raise HTTPException(status_code=404, detail="Telemetry not found for this driver/session")
         return data
+    except (HTTPException, SessionUnavailableError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.post("/{year}/{round}/{session_name}/compare/job")
-def compare_drivers_telemetry_job(
-    year: int, 
-    round: int, 
-    session_name: str, 
+@router.post("/{year}/{round}/{session_name}/{driver_id}/job")
+def start_telemetry_job(
+    year: int,
+    round: int,
+    session_name: str,
+    driver_id: str,
     bg_tasks: BackgroundTasks,
-    driver1: str = Query(..., description="E.g., VER"), 
-    driver2: str = Query(..., description="E.g., LEC")
+    points: Optional[int] = Query(None, ge=20, le=5000),
 ):
+    """Async background execution for telemetry extraction."""
     job_id = create_job()
-    bg_tasks.add_task(run_async_job, job_id, compare_telemetry, year, round, session_name, driver1, driver2)
+    bg_tasks.add_task(run_async_job, job_id, telemetry_service.get_driver_telemetry, year, round, session_name, driver_id, points)
     return {"job_id": job_id, "status": "pending"}
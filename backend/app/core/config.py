@@ -19,12 +19,67 @@ class Settings(BaseSettings):
 
     # FastF1 (Phase 2+)
     FASTF1_CACHE_DIR: str = "./fastf1_cache"
+    # Loaded sessions kept in memory per worker (each one can take a few hundred MB)
+    FASTF1_SESSION_CACHE_SIZE: int = 2
+    # Disk budget for FASTF1_CACHE_DIR in bytes (0 = unlimited); least recently
+    # used sessions are evicted first, the current season is kept
+    FASTF1_CACHE_MAX_BYTES: int = 0
+    FASTF1_CACHE_PROTECT_CURRENT_SEASON: bool = True
+
+    # Persist fastf1_cache artifacts from a background thread in batches instead
+    # of blocking the request on the Supabase upsert
+    FASTF1_CACHE_WRITE_BEHIND: bool = False
+    # fastf1_cache artifacts of a weekend still within this many hours of its
+    # end may be provisional and expire after FASTF1_CACHE_FRESH_TTL_SECONDS;
+    # later ones are kept until invalidated
+    FASTF1_CACHE_FRESH_WINDOW_HOURS: int = 48
+    FASTF1_CACHE_FRESH_TTL_SECONDS: int = 900
+
+    # How long a failed session load is remembered (seconds, 0 = not at all),
+    # by kind: no such session/data, not published yet, network or other errors
+    FASTF1_NEGATIVE_TTL_UNSUPPORTED: int = 86400
+    FASTF1_NEGATIVE_TTL_NOT_AVAILABLE: int = 300
+    FASTF1_NEGATIVE_TTL_TRANSIENT: int = 30
+
+    # Import the FastF1/pandas stack in the background right after startup, so the
+    # first analytics request does not pay for it (routers import it lazily)
+    WARM_ANALYTICS_ON_STARTUP: bool = True
+
+    # F1DB CSV release loaded by the in-memory results engine (head-to-head,
+    # teammates) and the standings progression cube
+    F1DB_DATA_DIR: str = "./data"
+
+    # Output of media_derivatives.py, served at /media-derived with immutable caching
+    MEDIA_DERIVED_DIR: str = "./media_derived"
+    # Its manifest changes on every run, so it lives outside the immutable mount
+    MEDIA_DERIVED_MANIFEST: str = "./media_derived_manifest.json"
+
+    # Admin endpoints (/admin/*) are disabled while this is empty
+    ADMIN_TOKEN: str = ""
 
     # F1TV (Live Timing)
     F1TV_EMAIL: str = ""
     F1TV_PASSWORD: str = ""
     F1TV_SUBSCRIPTION_TOKEN: str = ""
 
+    # Live feed source: 'signalr' (F1 live timing), 'replay' (recorded file) or 'synthetic'
+    LIVE_FEED_SOURCE: str = "signalr"
+    LIVE_REPLAY_FILE: str = "live_stream.txt"
+    LIVE_REPLAY_SPEED: float = 1.0
+    LIVE_REPLAY_LOOP: bool = False
+    LIVE_SYNTHETIC_RATE: float = 10.0
+    LIVE_SYNTHETIC_PAYLOAD_BYTES: int = 512
+
+    # Multi-worker live relay: when set (e.g. unix:/tmp/motorsportp1-live.sock),
+    # web workers subscribe to the feed published by live_ingest.py instead of
+    # each opening their own upstream connection.
+    LIVE_BUS_ADDRESS: str = ""
+
+    # Live upstream lifecycle
+    LIVE_IDLE_GRACE_SECONDS: float = 120.0
+    LIVE_RECONNECT_BASE_SECONDS: float = 1.0
+    LIVE_RECONNECT_MAX_SECONDS: float = 60.0
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
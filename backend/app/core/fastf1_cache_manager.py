@@ -0,0 +1,285 @@
+"""
+Size accounting, eviction and prefetch for the FastF1 disk cache.
+
+FastF1 stores every session it loads under FASTF1_CACHE_DIR/<year>/<event>/<session>/
+and never removes anything. The manager keeps a small JSON manifest next to the
+cache with the size and last access time of each session directory and, when
+the cache grows past FASTF1_CACHE_MAX_BYTES, deletes the least recently used
+sessions. Sessions of the current season are never evicted (they are the ones
+users open the most and re-downloading them during a race weekend hurts).
+"""
+
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "cache_manifest.json"
+# Access times of memory-cache hits are only persisted this often
+MANIFEST_SAVE_INTERVAL_SECONDS = 30
+
+# FastF1 session identifiers and the `races` columns holding their dates
+CALENDAR_SESSIONS = [
+    ("FP1", "freepractice1date"),
+    ("FP2", "freepractice2date"),
+    ("FP3", "freepractice3date"),
+    ("SQ", "sprintqualifyingdate"),
+    ("S", "sprintracedate"),
+    ("Q", "qualifyingdate"),
+    ("R", "date"),
+]
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class FastF1CacheManager:
+    def __init__(self, cache_dir: str, max_bytes: int = 0, protect_current_season: bool = True):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.protect_current_season = protect_current_season
+        self.manifest_path = os.path.join(cache_dir, MANIFEST_NAME)
+        self._lock = threading.RLock()
+        self._sessions: Optional[Dict[str, Dict[str, Any]]] = None
+        self._dirty = False
+        self._saved_at = 0.0
+        self.evictions = 0
+        self.evicted_bytes = 0
+
+    # ── Manifest ──────────────────────────────────────────────
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._sessions is None:
+            try:
+                with open(self.manifest_path) as f:
+                    self._sessions = json.load(f).get("sessions", {})
+            except (OSError, ValueError):
+                self._sessions = {}
+                self.scan()
+        return self._sessions
+
+    def _save(self, force: bool = False):
+        if not self._dirty or (not force and time.time() - self._saved_at < MANIFEST_SAVE_INTERVAL_SECONDS):
+            return
+        tmp_path = self.manifest_path + ".tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({"sessions": self._sessions}, f)
+            os.replace(tmp_path, self.manifest_path)
+            self._dirty = False
+            self._saved_at = time.time()
+        except OSError as e:
+            logger.error(f"Could not write FastF1 cache manifest: {e}")
+
+    def scan(self):
+        """Reconcile the manifest with what is actually on disk."""
+        with self._lock:
+            sessions = self._sessions if self._sessions is not None else {}
+            found = set()
+            if os.path.isdir(self.cache_dir):
+                for year in os.listdir(self.cache_dir):
+                    year_dir = os.path.join(self.cache_dir, year)
+                    if not (year.isdigit() and os.path.isdir(year_dir)):
+                        continue
+                    for event in os.listdir(year_dir):
+                        event_dir = os.path.join(year_dir, event)
+                        if not os.path.isdir(event_dir):
+                            continue
+                        for session in os.listdir(event_dir):
+                            session_dir = os.path.join(event_dir, session)
+                            if not os.path.isdir(session_dir):
+                                continue
+                            rel = f"{year}/{event}/{session}"
+                            found.add(rel)
+                            entry = sessions.setdefault(rel, {"year": int(year), "key": None})
+                            entry["size_bytes"] = _dir_size(session_dir)
+                            entry.setdefault("last_access", os.path.getmtime(session_dir))
+
+            for rel in set(sessions) - found:
+                del sessions[rel]
+            self._sessions = sessions
+            self._dirty = True
+            self._save(force=True)
+
+    # ── Access tracking ───────────────────────────────────────
+    def record_load(self, session, year: int, round: int, session_name: str):
+        """Called after FastF1 loaded a session: refresh its size and enforce the budget."""
+        rel = getattr(session, "api_path", "")[len("/static/"):].strip("/")
+        if not rel:
+            return
+        with self._lock:
+            sessions = self._load()
+            sessions[rel] = {
+                "year": year,
+                "key": f"{year}/{round}/{session_name}",
+                "size_bytes": _dir_size(os.path.join(self.cache_dir, rel)),
+                "last_access": time.time(),
+            }
+            self._dirty = True
+            self.enforce_budget()
+            self._save(force=True)
+
+    def record_access(self, year: int, round: int, session_name: str):
+        """Called on in-memory hits so LRU order reflects real usage."""
+        key = f"{year}/{round}/{session_name}"
+        with self._lock:
+            for entry in self._load().values():
+                if entry.get("key") == key:
+                    entry["last_access"] = time.time()
+                    self._dirty = True
+            self._save()
+
+    def is_cached(self, year: int, round: int, session_name: str) -> bool:
+        key = f"{year}/{round}/{session_name}"
+        with self._lock:
+            return any(entry.get("key") == key for entry in self._load().values())
+
+    # ── Eviction ──────────────────────────────────────────────
+    def _http_cache_bytes(self) -> int:
+        total = 0
+        for name in os.listdir(self.cache_dir) if os.path.isdir(self.cache_dir) else []:
+            if name.startswith("fastf1_http_cache"):
+                total += os.path.getsize(os.path.join(self.cache_dir, name))
+        return total
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(e.get("size_bytes", 0) for e in self._load().values()) + self._http_cache_bytes()
+
+    def _is_protected(self, entry: Dict[str, Any]) -> bool:
+        return self.protect_current_season and entry.get("year") == datetime.now(timezone.utc).year
+
+    def enforce_budget(self) -> List[str]:
+        """Evict least recently used sessions until the cache fits the byte budget."""
+        if self.max_bytes <= 0:
+            return []
+        evicted = []
+        with self._lock:
+            sessions = self._load()
+            total = self.total_bytes()
+            candidates = sorted(
+                (rel for rel, entry in sessions.items() if not self._is_protected(entry)),
+                key=lambda rel: sessions[rel].get("last_access", 0),
+            )
+            for rel in candidates:
+                if total <= self.max_bytes:
+                    break
+                size = sessions[rel].get("size_bytes", 0)
+                shutil.rmtree(os.path.join(self.cache_dir, rel), ignore_errors=True)
+                del sessions[rel]
+                total -= size
+                evicted.append(rel)
+                self.evictions += 1
+                self.evicted_bytes += size
+
+            if evicted:
+                self._dirty = True
+                self._save(force=True)
+                logger.info(f"Evicted {len(evicted)} FastF1 cache sessions, cache now {total / 1e6:.0f} MB")
+            if total > self.max_bytes:
+                logger.warning(
+                    f"FastF1 cache is {total / 1e6:.0f} MB, over its {self.max_bytes / 1e6:.0f} MB budget, "
+                    "but only protected sessions are left"
+                )
+        return evicted
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            sessions = self._load()
+            session_bytes = sum(e.get("size_bytes", 0) for e in sessions.values())
+            protected = [e for e in sessions.values() if self._is_protected(e)]
+            recent = sorted(sessions.items(), key=lambda kv: kv[1].get("last_access", 0), reverse=True)
+            return {
+                "cache_dir": self.cache_dir,
+                "budget_bytes": self.max_bytes or None,
+                "total_bytes": session_bytes + self._http_cache_bytes(),
+                "session_bytes": session_bytes,
+                "http_cache_bytes": self._http_cache_bytes(),
+                "sessions": len(sessions),
+                "protected_sessions": len(protected),
+                "protected_bytes": sum(e.get("size_bytes", 0) for e in protected),
+                "evictions": self.evictions,
+                "evicted_bytes": self.evicted_bytes,
+                "entries": [
+                    {
+                        "path": rel,
+                        "key": entry.get("key"),
+                        "size_bytes": entry.get("size_bytes", 0),
+                        "last_access": datetime.fromtimestamp(entry.get("last_access", 0), timezone.utc).isoformat(),
+                        "protected": self._is_protected(entry),
+                    }
+                    for rel, entry in recent
+                ],
+            }
+
+
+def prefetch_calendar(days_back: int = 7, days_ahead: int = 7) -> Dict[str, Any]:
+    """
+    Warm the disk cache from the `races` calendar:
+    - sessions of race weekends in the last `days_back` days that have already run
+    - last season's qualifying and race at the venues of the next `days_ahead` days,
+      which is what previews compare against
+    Sessions already on disk are skipped. Intended for a background task or cron.
+    """
+    # Imported here: the client pulls in FastF1 and this module is imported by it
+    from app.core.fastf1_client import cache_manager, load_session_to_disk
+    from app.db.supabase_client import get_supabase
+
+    today = date.today()
+    sb = get_supabase()
+    races = (
+        sb.table("races")
+        .select("*")
+        .gte("date", (today - timedelta(days=days_back)).isoformat())
+        .lte("date", (today + timedelta(days=days_ahead)).isoformat())
+        .order("date")
+        .execute()
+    ).data or []
+
+    targets = []
+    for race in races:
+        for session_name, column in CALENDAR_SESSIONS:
+            held_on = race.get(column)
+            if held_on and date.fromisoformat(held_on) < today:
+                targets.append((race["year"], race["round"], session_name))
+
+        if race.get("date") and date.fromisoformat(race["date"]) >= today:
+            previous = (
+                sb.table("races")
+                .select("year, round")
+                .eq("year", race["year"] - 1)
+                .eq("circuitid", race["circuitid"])
+                .limit(1)
+                .execute()
+            ).data
+            if previous:
+                targets += [(previous[0]["year"], previous[0]["round"], s) for s in ("Q", "R")]
+
+    loaded, skipped, failed = [], [], []
+    for year, round_num, session_name in targets:
+        key = f"{year}/{round_num}/{session_name}"
+        if year < 2018 or cache_manager.is_cached(year, round_num, session_name):
+            skipped.append(key)
+            continue
+        try:
+            load_session_to_disk(year, round_num, session_name)
+            loaded.append(key)
+        except Exception as e:
+            logger.error(f"Prefetch failed for {key}: {e}")
+            failed.append(key)
+
+    logger.info(f"FastF1 prefetch: {len(loaded)} loaded, {len(skipped)} skipped, {len(failed)} failed")
+    return {"loaded": loaded, "skipped": skipped, "failed": failed}
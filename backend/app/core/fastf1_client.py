@@ -1,32 +1,206 @@
 import os
+import threading
+from collections import OrderedDict
 import fastf1
+import pandas as pd
 from app.core.config import get_settings
+from app.core.fastf1_cache_manager import FastF1CacheManager
+from app.core.session_errors import (
+    NOT_AVAILABLE, TRANSIENT, UNSUPPORTED, NegativeCache, SessionUnavailableError,
+)
 import logging
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
-# Ensure Cache Directory exists
-if not os.path.exists(settings.FASTF1_CACHE_DIR):
-    os.makedirs(settings.FASTF1_CACHE_DIR)
+# Size/LRU accounting of the FastF1 disk cache
+cache_manager = FastF1CacheManager(
+    settings.FASTF1_CACHE_DIR,
+    max_bytes=settings.FASTF1_CACHE_MAX_BYTES,
+    protect_current_season=settings.FASTF1_CACHE_PROTECT_CURRENT_SEASON,
+)
+
+# Recently loaded sessions, most recent last. Parsing a session from the disk
+# cache still takes seconds, so endpoints hit in a row (summary, telemetry,
+# comparisons) reuse the loaded object instead.
+_SESSIONS: "OrderedDict[tuple, fastf1.core.Session]" = OrderedDict()
+_SESSIONS_LOCK = threading.Lock()
+# One lock per session key so concurrent requests for the same session load it once
+_LOAD_LOCKS: dict = {}
+
+# Recent load failures, so bad (year, round, session) requests fail fast
+failed_loads = NegativeCache()
+
+# A session whose data is missing this soon after its start is treated as
+# not published yet rather than as having no data
+DATA_PUBLISH_DELAY = pd.Timedelta(hours=6)
+
+_cache_enabled = False
+_cache_lock = threading.Lock()
+
+
+def ensure_cache():
+    """
+    Create the cache directory and enable the FastF1 cache.
+    Done on first use rather than at import so importing this module has no
+    side effects (and costs nothing at API startup).
+    """
+    global _cache_enabled
+    if _cache_enabled:
+        return
+    with _cache_lock:
+        if _cache_enabled:
+            return
+        os.makedirs(settings.FASTF1_CACHE_DIR, exist_ok=True)
+        fastf1.Cache.enable_cache(settings.FASTF1_CACHE_DIR)
+        _cache_enabled = True
 
-# Enable Cache
-fastf1.Cache.enable_cache(settings.FASTF1_CACHE_DIR)
 
 def get_fastf1_session(year: int, round: int, session_type: str):
     """
     Safely load a FastF1 session.
     session_type: 'FP1', 'FP2', 'FP3', 'Q', 'S', 'SQ', 'R'
+
+    Raises SessionUnavailableError when the session cannot be loaded; the
+    failure is remembered for a while (see load_session_to_disk).
     """
     if year < 2018:
-        raise ValueError(f"FastF1 does not support detailed telemetry for year {year}")
-    
+        raise SessionUnavailableError(UNSUPPORTED, f"FastF1 does not support detailed telemetry for year {year}")
+
+    key = (year, round, session_type)
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(key)
+        if session is not None:
+            _SESSIONS.move_to_end(key)
+        else:
+            load_lock = _LOAD_LOCKS.setdefault(key, threading.Lock())
+
+    if session is not None:
+        cache_manager.record_access(year, round, session_type)
+        return session
+
+    with load_lock:
+        # Another thread may have finished loading while we waited
+        with _SESSIONS_LOCK:
+            if key in _SESSIONS:
+                _SESSIONS.move_to_end(key)
+                return _SESSIONS[key]
+
+        try:
+            session = load_session_to_disk(year, round, session_type)
+        finally:
+            with _SESSIONS_LOCK:
+                _LOAD_LOCKS.pop(key, None)
+
+        _remember_session(key, session)
+        return session
+
+
+def load_session_to_disk(year: int, round: int, session_type: str):
+    """
+    Load a session through the FastF1 disk cache, without keeping it in memory.
+
+    Failures are classified (see app.core.session_errors) and remembered for
+    FASTF1_NEGATIVE_TTL_* seconds; until then the same request fails
+    immediately with the same SessionUnavailableError.
+    """
+    key = (year, round, session_type)
+    failed_loads.check(key)
+    ensure_cache()
     logger.info(f"Loading FastF1 Data: {year} R{round} {session_type}")
-    
+
+    try:
+        session = _load(year, round, session_type)
+    except SessionUnavailableError as e:
+        logger.warning(f"FastF1 session {year} R{round} {session_type} unavailable ({e.kind}): {e}")
+        ttl = _negative_ttl(e.kind)
+        failed_loads.remember(key, e, ttl)
+        e.retry_after = ttl or None
+        raise
+
+    try:
+        cache_manager.record_load(session, year, round, session_type)
+    except Exception as e:
+        logger.error(f"FastF1 cache accounting failed: {e}")
+    return session
+
+
+def _load(year: int, round: int, session_type: str):
     try:
         session = fastf1.get_session(year, round, session_type)
+    except ValueError as e:
+        # Unknown round for the season or session type for the weekend
+        raise SessionUnavailableError(UNSUPPORTED, str(e))
+    except Exception as e:
+        raise SessionUnavailableError(TRANSIENT, f"Event schedule unavailable: {e}")
+
+    started = _session_start(session)
+    now = pd.Timestamp.now(tz="UTC")
+    if started is not None and started > now:
+        raise SessionUnavailableError(NOT_AVAILABLE, f"Session starts at {started.isoformat()}")
+
+    try:
         session.load(telemetry=True, laps=True, weather=True)
-        return session
     except Exception as e:
         logger.error(f"Failed to load FastF1 session {year} R{round} {session_type}: {e}")
-        raise e
+        raise SessionUnavailableError(TRANSIENT, str(e))
+
+    # FastF1 logs missing data instead of raising, network and API errors
+    # included; without laps there is nothing to serve
+    if not _has_laps(session):
+        if started is not None and now - started < DATA_PUBLISH_DELAY:
+            raise SessionUnavailableError(NOT_AVAILABLE, "Session data has not been published yet")
+        if not _has_timing_api(year, session):
+            raise SessionUnavailableError(UNSUPPORTED, "No timing data available for this session")
+        # The data should exist: most likely an outage, so only the short TTL
+        raise SessionUnavailableError(TRANSIENT, "No laps loaded; timing data may be temporarily unavailable")
+    return session
+
+
+def _has_timing_api(year: int, session) -> bool:
+    """Whether the F1 live timing API has data for the session (2018 on, per the event schedule)."""
+    if year < 2018:
+        return False
+    event = getattr(session, "event", None)
+    try:
+        supported = event.get("F1ApiSupport") if event is not None else None
+    except Exception:
+        supported = None
+    # Not in the schedule: assume supported rather than blocking the session for a day
+    return supported is None or pd.isna(supported) or bool(supported)
+
+
+def _session_start(session):
+    date = getattr(session, "date", None)
+    if date is None or pd.isna(date):
+        return None
+    date = pd.Timestamp(date)
+    # FastF1 gives the UTC start time without a timezone
+    return date.tz_localize("UTC") if date.tzinfo is None else date.tz_convert("UTC")
+
+
+def _has_laps(session) -> bool:
+    try:
+        return not session.laps.empty
+    except Exception:
+        return False
+
+
+def _negative_ttl(kind: str) -> int:
+    return {
+        UNSUPPORTED: settings.FASTF1_NEGATIVE_TTL_UNSUPPORTED,
+        NOT_AVAILABLE: settings.FASTF1_NEGATIVE_TTL_NOT_AVAILABLE,
+        TRANSIENT: settings.FASTF1_NEGATIVE_TTL_TRANSIENT,
+    }.get(kind, settings.FASTF1_NEGATIVE_TTL_TRANSIENT)
+
+
+def _remember_session(key: tuple, session):
+    size = settings.FASTF1_SESSION_CACHE_SIZE
+    if size <= 0:
+        return
+    with _SESSIONS_LOCK:
+        _SESSIONS[key] = session
+        _SESSIONS.move_to_end(key)
+        while len(_SESSIONS) > size:
+            evicted, _ = _SESSIONS.popitem(last=False)
+            logger.info(f"Evicted FastF1 session {evicted} from memory")
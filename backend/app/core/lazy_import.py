@@ -0,0 +1,38 @@
+"""
+Deferred module imports.
+
+The FastF1 analytics stack (fastf1, pandas, numpy and the services built on
+them) takes most of the API's import time. Routers reference those services
+through LazyModule so a cold start only pays for them on the first request
+that actually needs them; plain Supabase endpoints never do.
+"""
+
+import importlib
+from types import ModuleType
+
+
+class LazyModule:
+    """
+    Stand-in for a module that is imported on first attribute access.
+
+    Routers hold their NumPy/pandas/FastF1 backed services (and anything those
+    build on import or first use, such as the F1DB CSV engines) as LazyModules,
+    so the cost lands on the first request that needs them, not on startup.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module: ModuleType | None = None
+
+    def _load(self) -> ModuleType:
+        if self._module is None:
+            # import_module holds the import lock, so concurrent first requests are safe
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<LazyModule {self._name} ({state})>"
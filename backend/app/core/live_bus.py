@@ -0,0 +1,170 @@
+"""
+Local pub/sub bus for the live timing feed.
+
+With several uvicorn workers, each worker used to open its own SignalR
+connection. Instead, ``live_ingest.py`` runs once, owns the single upstream
+connection, and publishes every decoded feed payload on this bus; web workers
+subscribe to it (``LIVE_BUS_ADDRESS``) and only fan out to their WebSockets.
+
+Addresses:
+    unix:/tmp/motorsportp1-live.sock   Unix domain socket (default on Linux)
+    tcp://127.0.0.1:7799               loopback TCP (e.g. Windows dev machines)
+
+Wire format is newline-delimited JSON: one encoded payload per line, so
+subscribers can relay the text without decoding it again.
+"""
+
+import json
+import logging
+import os
+import queue
+import select
+import socket
+import threading
+from typing import Set
+
+logger = logging.getLogger("LiveBus")
+
+
+def _parse_address(address: str):
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[len("unix:"):]
+    if address.startswith("tcp://"):
+        host, _, port = address[len("tcp://"):].rpartition(":")
+        return socket.AF_INET, (host or "127.0.0.1", int(port))
+    raise ValueError(f"Unsupported live bus address '{address}' (use unix:/path or tcp://host:port)")
+
+
+def connect_subscriber(address: str) -> socket.socket:
+    """Open a subscriber connection to a running publisher."""
+    family, target = _parse_address(address)
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.connect(target)
+    return sock
+
+
+class _Subscriber:
+    """One connected web worker. Writes happen on its own thread so a stuck
+    worker can never block the publisher or the other subscribers."""
+
+    def __init__(self, conn: socket.socket, max_queue: int):
+        self.conn = conn
+        self.queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self.alive = True
+        self.thread = threading.Thread(target=self._writer, daemon=True)
+        self.thread.start()
+
+    def peer_closed(self) -> bool:
+        """Workers never write to the bus, so a readable socket means EOF (or an error)."""
+        try:
+            readable, _, _ = select.select([self.conn], [], [], 0)
+            return bool(readable) and self.conn.recv(1, socket.MSG_PEEK) == b""
+        except (OSError, ValueError):
+            return True
+
+    def offer(self, data: bytes) -> bool:
+        try:
+            self.queue.put_nowait(data)
+            return True
+        except queue.Full:
+            return False
+
+    def _writer(self):
+        try:
+            while self.alive:
+                data = self.queue.get()
+                if data is None:
+                    break
+                self.conn.sendall(data)
+        except OSError:
+            pass
+        finally:
+            self.alive = False
+            self.conn.close()
+
+    def close(self):
+        self.alive = False
+        try:
+            self.queue.put_nowait(None)
+        except queue.Full:
+            self.conn.close()
+
+
+class LiveBusPublisher:
+    """Accepts subscriber connections and fans published payloads out to them."""
+
+    def __init__(self, address: str, max_queue: int = 1000):
+        self.address = address
+        self.max_queue = max_queue
+        self._subscribers: Set[_Subscriber] = set()
+        self._lock = threading.Lock()
+        self._server = None
+        self._subscribed = threading.Event()
+
+    def start(self):
+        family, target = _parse_address(self.address)
+        if family == socket.AF_UNIX and os.path.exists(target):
+            # Stale socket left behind by a previous ingest process
+            os.remove(target)
+
+        self._server = socket.socket(family, socket.SOCK_STREAM)
+        if family == socket.AF_INET:
+            self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind(target)
+        self._server.listen()
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        logger.info(f"Live bus publishing on {self.address}")
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            with self._lock:
+                self._subscribers.add(_Subscriber(conn, self.max_queue))
+                self._subscribed.set()
+            logger.info(f"Worker subscribed. Total: {len(self._subscribers)}")
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def active_subscribers(self) -> int:
+        """Drop workers that have disconnected, even if nothing was published since, and count the rest."""
+        with self._lock:
+            gone = [s for s in self._subscribers if not s.alive or s.peer_closed()]
+            for sub in gone:
+                self._subscribers.discard(sub)
+                sub.close()
+            if not self._subscribers:
+                self._subscribed.clear()
+            return len(self._subscribers)
+
+    def wait_for_subscriber(self, timeout: float | None = None) -> bool:
+        """Block until at least one worker is subscribed."""
+        return self._subscribed.wait(timeout)
+
+    def publish(self, payload: dict):
+        """Encode once and queue the line for every subscriber.
+        A worker that falls ``max_queue`` messages behind is disconnected;
+        it reconnects and resumes from live data."""
+        data = (json.dumps(payload) + "\n").encode("utf-8")
+        with self._lock:
+            dead = [s for s in self._subscribers if not s.alive or not s.offer(data)]
+            for sub in dead:
+                self._subscribers.discard(sub)
+                sub.close()
+        if dead:
+            logger.warning(f"Dropped {len(dead)} lagging/closed worker(s). Total: {len(self._subscribers)}")
+
+    def close(self):
+        if self._server is not None:
+            self._server.close()
+        with self._lock:
+            for sub in self._subscribers:
+                sub.close()
+            self._subscribers.clear()
+        family, target = _parse_address(self.address)
+        if family == socket.AF_UNIX and os.path.exists(target):
+            os.remove(target)
@@ -0,0 +1,88 @@
+"""
+Classified FastF1 session load failures and the negative cache that remembers them.
+
+A failed load is expensive (schedule lookups, downloads, parsing) and, before
+this, was retried on every request for the same bad (year, round, session).
+Failures are sorted into three kinds, each remembered for its own TTL:
+
+- unsupported:    the session does not exist or has no data (e.g. before 2018,
+                  an unknown round, a session type the weekend did not have)
+- not_available:  the session is in the future or too recent for its data
+                  to be published yet
+- transient:      network errors, rate limiting and anything unexpected
+
+This module has no FastF1/pandas dependency so routers can import it without
+pulling in the analytics stack.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+UNSUPPORTED = "unsupported"
+NOT_AVAILABLE = "not_available"
+TRANSIENT = "transient"
+
+# HTTP status the API answers with for each kind
+HTTP_STATUS = {
+    UNSUPPORTED: 404,
+    NOT_AVAILABLE: 503,
+    TRANSIENT: 503,
+}
+
+
+class SessionUnavailableError(Exception):
+    """A FastF1 session could not be loaded; `kind` says whether and when to retry."""
+
+    def __init__(self, kind: str, message: str, retry_after: Optional[int] = None):
+        super().__init__(message)
+        self.kind = kind
+        self.retry_after = retry_after
+
+    @property
+    def status_code(self) -> int:
+        return HTTP_STATUS.get(self.kind, 503)
+
+
+class NegativeCache:
+    """In-process map of session key -> last failure, until its TTL runs out."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._entries: Dict[tuple, Tuple[str, str, float]] = {}
+        self._lock = threading.Lock()
+        self._clock = clock
+
+    def remember(self, key: tuple, error: SessionUnavailableError, ttl_seconds: int):
+        if ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (error.kind, str(error), self._clock() + ttl_seconds)
+
+    def check(self, key: tuple):
+        """Raise the remembered failure for `key` if it has not expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            kind, message, expires = entry
+            remaining = expires - self._clock()
+            if remaining <= 0:
+                del self._entries[key]
+                return
+        raise SessionUnavailableError(kind, message, retry_after=int(remaining) + 1)
+
+    def clear(self, key: Optional[tuple] = None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        now = self._clock()
+        counts = {UNSUPPORTED: 0, NOT_AVAILABLE: 0, TRANSIENT: 0}
+        with self._lock:
+            for kind, _, expires in self._entries.values():
+                if expires > now:
+                    counts[kind] = counts.get(kind, 0) + 1
+        return counts
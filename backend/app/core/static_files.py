@@ -0,0 +1,29 @@
+"""
+StaticFiles variants with explicit caching headers.
+"""
+
+import os
+import re
+
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """
+    Static files whose names carry a content hash (media_derivatives.py output):
+    a URL always returns the same bytes, so browsers and CDNs may keep it for a year
+    without revalidating. Any other file in the directory is revalidated on every use.
+    """
+
+    CACHE_CONTROL = "public, max-age=31536000, immutable"
+    UNHASHED_CACHE_CONTROL = "no-cache"
+    # name.<10 hex digits>.ext, as written by media_derivatives.py
+    HASHED_NAME = re.compile(r"\.[0-9a-f]{10}\.\w+$")
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        hashed = self.HASHED_NAME.search(os.path.basename(full_path))
+        response.headers["Cache-Control"] = self.CACHE_CONTROL if hashed else self.UNHASHED_CACHE_CONTROL
+        return response
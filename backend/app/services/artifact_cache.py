@@ -0,0 +1,372 @@
+"""
+Computed-artifact cache backed by the Supabase `fastf1_cache` table.
+
+One row per (year, round, session_name, data_type). Besides single reads and
+writes this provides:
+
+- get_cached_many / set_cached_many: several artifacts in one request
+- cache_scope(): within the block, reads of prefetched artifacts are answered
+  from memory and writes are collected and sent as one multi-row upsert when
+  the block exits (used by the session summary)
+- write-behind (FASTF1_CACHE_WRITE_BEHIND): writes are queued and persisted in
+  batches by a background thread, so computing an artifact never waits on
+  Supabase; pending writes stay readable until they are persisted
+- versioning: every artifact type is registered with @versioned_artifact and
+  an explicit version, bumped whenever its output changes; rows written with
+  another version are misses
+- expiry: artifacts of sessions that ended less than
+  FASTF1_CACHE_FRESH_WINDOW_HOURS ago (provisional data) expire after
+  FASTF1_CACHE_FRESH_TTL_SECONDS; older sessions are cached permanently
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import get_settings
+from app.db.supabase_client import get_supabase
+
+logger = logging.getLogger(__name__)
+
+CACHE_TABLE = 'fastf1_cache'
+ON_CONFLICT = 'year, round, session_name, data_type'
+ROW_COLUMNS = 'data_type, data, version, expires_at'
+
+# Write-behind batching: wait this long after the first queued write so
+# artifacts computed together go out in the same upsert
+WRITE_BEHIND_DELAY_SECONDS = 0.5
+# Race dates are re-read after this long, so a rescheduled event gets its new TTL
+EVENT_DATE_TTL_SECONDS = 6 * 3600
+
+
+def clean_data(val):
+    """Recursively clean NaNs/NaTs/Infs from data structures so they can be JSON serialized."""
+    if isinstance(val, dict):
+        return {k: clean_data(v) for k, v in val.items()}
+    elif isinstance(val, list):
+        return [clean_data(v) for v in val]
+    elif pd.isna(val) or val is pd.NaT:
+        return None
+    elif isinstance(val, float) and (np.isinf(val) or np.isnan(val)):
+        return None
+    elif isinstance(val, (pd.Timedelta)):
+        return val.total_seconds()
+    elif isinstance(val, (int, float, str, bool)):
+        return val
+    # Try to convert other formats
+    try:
+        return float(val) if 'float' in str(type(val)) else str(val)
+    except:
+        return str(val)
+
+
+# ── Versions ─────────────────────────────────────────────────
+# data_type prefix ('stints', 'minisectors', 'telemetry', ...) -> artifact version
+ARTIFACT_VERSIONS: Dict[str, str] = {}
+
+
+def versioned_artifact(prefix: str, version: int):
+    """
+    Register the function computing `prefix` artifacts (data types `prefix` and
+    `prefix_<suffix>`). Bump `version` when a change to the function or its
+    helpers changes what it returns; previously cached rows then become misses.
+    """
+    def decorator(func: Callable) -> Callable:
+        ARTIFACT_VERSIONS[prefix] = str(version)
+        return func
+    return decorator
+
+
+def artifact_version(data_type: str) -> Optional[str]:
+    best = None
+    for prefix in ARTIFACT_VERSIONS:
+        if data_type == prefix or data_type.startswith(prefix + '_'):
+            if best is None or len(prefix) > len(best):
+                best = prefix
+    return ARTIFACT_VERSIONS.get(best) if best else None
+
+
+# ── Expiry ───────────────────────────────────────────────────
+# (year, round) -> (race day, monotonic time it was read)
+_EVENT_DATES: Dict[tuple, Tuple[Optional[date], float]] = {}
+
+
+def _event_date(year: int, round: int) -> Optional[date]:
+    """Race day of the weekend (the last session), from the races table."""
+    key = (year, round)
+    cached = _EVENT_DATES.get(key)
+    if cached is None or time.monotonic() - cached[1] > EVENT_DATE_TTL_SECONDS:
+        value = None
+        try:
+            supabase = get_supabase()
+            response = supabase.table('races').select('date').eq('year', year).eq('round', round).limit(1).execute()
+            if response.data and response.data[0].get('date'):
+                value = date.fromisoformat(response.data[0]['date'])
+        except Exception as e:
+            logger.error(f"Race date lookup error: {e}")
+        _EVENT_DATES[key] = (value, time.monotonic())
+    return _EVENT_DATES[key][0]
+
+
+def _expires_at(year: int, round: int) -> Optional[str]:
+    """Short TTL while the weekend's data may still be revised, None (never) after."""
+    settings = get_settings()
+    now = datetime.now(timezone.utc)
+    race_day = _event_date(year, round)
+    if race_day is None:
+        # Unknown calendar entry: only treat the current season as provisional
+        fresh = year >= now.year
+    else:
+        weekend_end = datetime.combine(race_day + timedelta(days=1), datetime.min.time(), timezone.utc)
+        fresh = now < weekend_end + timedelta(hours=settings.FASTF1_CACHE_FRESH_WINDOW_HOURS)
+    if not fresh:
+        return None
+    return (now + timedelta(seconds=settings.FASTF1_CACHE_FRESH_TTL_SECONDS)).isoformat()
+
+
+def _is_valid(row: Dict[str, Any]) -> bool:
+    """A cached row is usable if it was written by the current code and has not expired."""
+    if row.get('version') != artifact_version(row['data_type']):
+        return False
+    expires_at = row.get('expires_at')
+    if expires_at:
+        if datetime.fromisoformat(expires_at.replace('Z', '+00:00')) <= datetime.now(timezone.utc):
+            return False
+    return True
+
+
+def _row(year: int, round: int, session_name: str, data_type: str, data: Any) -> Dict[str, Any]:
+    return {
+        'year': year,
+        'round': round,
+        'session_name': session_name,
+        'data_type': data_type,
+        'data': clean_data(data),
+        'version': artifact_version(data_type),
+        'expires_at': _expires_at(year, round),
+        'updated_at': datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def _row_key(row: Dict[str, Any]) -> tuple:
+    return (row['year'], row['round'], row['session_name'], row['data_type'])
+
+
+def _upsert_rows(rows: List[Dict[str, Any]]):
+    if not rows:
+        return
+    supabase = get_supabase()
+    supabase.table(CACHE_TABLE).upsert(rows, on_conflict=ON_CONFLICT).execute()
+
+
+# ── Write-behind ─────────────────────────────────────────────
+class _WriteBehindQueue:
+    def __init__(self):
+        self._pending: Dict[tuple, Dict[str, Any]] = {}
+        self._inflight: Dict[tuple, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def put(self, row: Dict[str, Any]):
+        with self._lock:
+            self._pending[_row_key(row)] = row
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="fastf1-cache-writer", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def get(self, key: tuple) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._pending.get(key) or self._inflight.get(key)
+
+    def discard(self, match: Callable[[tuple], bool]):
+        with self._lock:
+            for key in [key for key in self._pending if match(key)]:
+                del self._pending[key]
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            time.sleep(WRITE_BEHIND_DELAY_SECONDS)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            self._inflight.update(batch)
+        try:
+            _upsert_rows(list(batch.values()))
+        except Exception as e:
+            logger.error(f"Cache write-behind error ({len(batch)} rows): {e}")
+        finally:
+            with self._lock:
+                for key in batch:
+                    self._inflight.pop(key, None)
+
+
+_write_behind = _WriteBehindQueue()
+
+
+def flush_pending_writes():
+    """Persist queued write-behind rows now (called on shutdown)."""
+    _write_behind.flush()
+
+
+# ── Request-scoped batching ──────────────────────────────────
+_scope = threading.local()
+
+
+@contextmanager
+def cache_scope(year: int, round: int, session_name: str, prefetched: Dict[str, Any], data_types: Iterable[str]):
+    """
+    Within the block, reads of `data_types` for this session come from
+    `prefetched` (absent = not cached) and writes are sent as one upsert on exit.
+    """
+    scope = {
+        "session": (year, round, session_name),
+        "prefetched": dict(prefetched),
+        "known": set(data_types),
+        "writes": [],
+    }
+    previous = getattr(_scope, "current", None)
+    _scope.current = scope
+    try:
+        yield
+    finally:
+        _scope.current = previous
+        _write_rows(scope["writes"])
+
+
+def _current_scope(year: int, round: int, session_name: str) -> Optional[Dict[str, Any]]:
+    scope = getattr(_scope, "current", None)
+    if scope is not None and scope["session"] == (year, round, session_name):
+        return scope
+    return None
+
+
+def _write_rows(rows: List[Dict[str, Any]]):
+    if not rows:
+        return
+    if get_settings().FASTF1_CACHE_WRITE_BEHIND:
+        for row in rows:
+            _write_behind.put(row)
+        return
+    try:
+        _upsert_rows(rows)
+    except Exception as e:
+        logger.error(f"Cache write error: {e}")
+
+
+# ── Public API ───────────────────────────────────────────────
+def get_cached_data(year: int, round: int, session_name: str, data_type: str):
+    scope = _current_scope(year, round, session_name)
+    if scope is not None and data_type in scope["known"]:
+        return scope["prefetched"].get(data_type)
+
+    pending = _write_behind.get((year, round, session_name, data_type))
+    if pending is not None:
+        return pending['data']
+
+    try:
+        supabase = get_supabase()
+        response = supabase.table(CACHE_TABLE).select(ROW_COLUMNS).eq('year', year).eq('round', round).eq('session_name', session_name).eq('data_type', data_type).execute()
+        if response.data and len(response.data) > 0 and _is_valid(response.data[0]):
+            return response.data[0]['data']
+    except Exception as e:
+        logger.error(f"Cache read error: {e}")
+    return None
+
+
+def get_cached_many(year: int, round: int, session_name: str, data_types: List[str]) -> Dict[str, Any]:
+    """Fetch several cached artifacts of one session in a single query; missing ones are absent."""
+    found: Dict[str, Any] = {}
+    for data_type in data_types:
+        pending = _write_behind.get((year, round, session_name, data_type))
+        if pending is not None:
+            found[data_type] = pending['data']
+
+    remaining = [data_type for data_type in data_types if data_type not in found]
+    if not remaining:
+        return found
+    try:
+        supabase = get_supabase()
+        response = supabase.table(CACHE_TABLE).select(ROW_COLUMNS).eq('year', year).eq('round', round).eq('session_name', session_name).in_('data_type', remaining).execute()
+        found.update({row['data_type']: row['data'] for row in response.data or [] if _is_valid(row)})
+    except Exception as e:
+        logger.error(f"Cache read error: {e}")
+    return found
+
+
+def set_cached_data(year: int, round: int, session_name: str, data_type: str, data: Any):
+    row = _row(year, round, session_name, data_type, data)
+    scope = _current_scope(year, round, session_name)
+    if scope is not None:
+        scope["writes"].append(row)
+        scope["prefetched"][data_type] = row['data']
+        scope["known"].add(data_type)
+        return
+    _write_rows([row])
+
+
+def set_cached_many(year: int, round: int, session_name: str, artifacts: Dict[str, Any]):
+    """Upsert several artifacts of one session in a single request."""
+    _write_rows([_row(year, round, session_name, data_type, data) for data_type, data in artifacts.items()])
+
+
+def invalidate_cached(year: Optional[int] = None, round: Optional[int] = None,
+                      session_name: Optional[str] = None, data_type: Optional[str] = None) -> int:
+    """
+    Delete cached artifacts matching every given filter. `data_type` matches the
+    type and its variants ('minisectors' also removes 'minisectors_25').
+    Returns the number of deleted rows.
+    """
+    def match(key: tuple) -> bool:
+        row_year, row_round, row_session, row_type = key
+        return ((year is None or row_year == year)
+                and (round is None or row_round == round)
+                and (session_name is None or row_session == session_name)
+                and (data_type is None or row_type == data_type or row_type.startswith(data_type + '_')))
+
+    _write_behind.discard(match)
+
+    def delete():
+        query = get_supabase().table(CACHE_TABLE).delete()
+        if year is not None:
+            query = query.eq('year', year)
+        else:
+            # Always-true filter: PostgREST runs with pg_safeupdate, which rejects a DELETE without WHERE
+            query = query.gte('year', 0)
+        if round is not None:
+            query = query.eq('round', round)
+        if session_name is not None:
+            query = query.eq('session_name', session_name)
+        return query
+
+    if data_type is None:
+        return len(delete().execute().data or [])
+    exact = delete().eq('data_type', data_type).execute()
+    # `_` and `%` are LIKE wildcards: 'all_laps' must not match 'allXlaps_...'
+    variants = delete().like('data_type', _like_escape(data_type) + '\\_*').execute()
+    return len(exact.data or []) + len(variants.data or [])
+
+
+def _like_escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def purge_expired() -> int:
+    """Delete rows whose TTL has passed. Returns the number of deleted rows."""
+    supabase = get_supabase()
+    now = datetime.now(timezone.utc).isoformat()
+    response = supabase.table(CACHE_TABLE).delete().lt('expires_at', now).execute()
+    return len(response.data or [])
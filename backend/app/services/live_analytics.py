@@ -0,0 +1,291 @@
+"""
+Incremental live timing analytics.
+
+Keeps running per-driver aggregates on top of the live feed so clients do not
+have to derive them from raw TimingData themselves:
+
+- position, gap to leader and interval to the car ahead (milliseconds, or
+  laps behind when lapped)
+- last / best lap (milliseconds, like the session endpoints)
+- sector times and colours, using the same rules as ``get_best_sectors``
+  (2 = purple, session best; 1 = green, personal best; 0 = yellow)
+- current stint, compound and long-run pace, using the same 107% filter and
+  "more than 3 laps" rule as ``get_stints``
+- pit stop count and pit status
+
+Every update costs O(1) per changed field (the stint pace filter is amortised
+O(log n) per lap), and ``update()`` returns only the aggregates that changed so
+the relay can push small ``{"type": "analytics"}`` deltas.
+"""
+
+import heapq
+import threading
+from typing import Any, Dict, List, Optional
+
+# Same tolerance as get_best_sectors for float comparisons
+SECTOR_EPSILON = 0.001
+
+
+def parse_time(value) -> Optional[float]:
+    """'1:32.456' -> 92.456, '31.234' -> 31.234, '+0.512' -> 0.512. Anything else -> None."""
+    if not isinstance(value, str):
+        return None
+    value = value.strip().lstrip("+")
+    if not value:
+        return None
+    try:
+        if ":" in value:
+            minutes, seconds = value.split(":", 1)
+            return int(minutes) * 60 + float(seconds)
+        return float(value)
+    except ValueError:
+        return None
+
+
+def parse_laps_behind(value) -> Optional[int]:
+    """'1L', '2 L', '+1 LAP' -> laps behind; None if the gap is a time."""
+    if not isinstance(value, str) or "L" not in value.upper():
+        return None
+    digits = "".join(ch for ch in value if ch.isdigit())
+    return int(digits) if digits else None
+
+
+def _ms(seconds: Optional[float]) -> Optional[int]:
+    return int(round(seconds * 1000)) if seconds is not None else None
+
+
+def _indexed(entries) -> List[tuple]:
+    """The feed sends a list in the first message and {"index": {...}} deltas after."""
+    if isinstance(entries, list):
+        return list(enumerate(entries))
+    if isinstance(entries, dict):
+        out = []
+        for key, value in entries.items():
+            try:
+                out.append((int(key), value))
+            except (TypeError, ValueError):
+                continue
+        return out
+    return []
+
+
+class StintPace:
+    """
+    Long-run pace of one stint with get_stints' outlier rule: laps slower than
+    107% of the stint's fastest lap are ignored. The threshold only ever goes
+    down, so a lap excluded once stays excluded — a max-heap of included laps
+    lets each lap be removed at most once.
+    """
+
+    def __init__(self):
+        self.min_lap: Optional[float] = None
+        self._included: List[float] = []  # max-heap (negated values)
+        self._sum = 0.0
+
+    def add(self, lap: float):
+        if self.min_lap is None or lap < self.min_lap:
+            self.min_lap = lap
+            threshold = lap * 1.07
+            while self._included and -self._included[0] > threshold:
+                self._sum += heapq.heappop(self._included)
+        if lap <= self.min_lap * 1.07:
+            heapq.heappush(self._included, -lap)
+            self._sum += lap
+
+    @property
+    def pace(self) -> Optional[float]:
+        # Only stints longer than 3 laps count as a long run
+        if len(self._included) > 3:
+            return self._sum / len(self._included)
+        return None
+
+
+class DriverAggregate:
+    def __init__(self):
+        self.values: Dict[str, Any] = {"sectors": [None, None, None], "sector_colors": [0, 0, 0]}
+        self.best_sectors: List[Optional[float]] = [None, None, None]
+        self.best_lap: Optional[float] = None
+        self.stint_number: Optional[int] = None
+        self.stint_pace = StintPace()
+
+
+class LiveAnalytics:
+    """Per-driver live aggregates, updated incrementally from feed items."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clear()
+
+    def reset(self):
+        """Drop every aggregate, e.g. when the feed is stopped while a message is still in flight."""
+        with self._lock:
+            self._clear()
+
+    def _clear(self):
+        self.drivers: Dict[str, DriverAggregate] = {}
+        self.session_path: Optional[str] = None
+        self.session_best_sectors: List[Optional[float]] = [None, None, None]
+        self.session_best_holders: List[Optional[str]] = [None, None, None]
+
+    # ── Public API ────────────────────────────────────────────
+    def update(self, items: list) -> Dict[str, Dict[str, Any]]:
+        """Apply decoded feed items ({method, data}) and return the changed aggregates per driver."""
+        changes: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for item in items:
+                if not isinstance(item, dict):
+                    continue
+                method, data = item.get("method"), item.get("data")
+                if not isinstance(data, dict):
+                    continue
+                if method == "SessionInfo":
+                    self._on_session_info(data)
+                elif method == "TimingData":
+                    for num, line in (data.get("Lines") or {}).items():
+                        if isinstance(line, dict):
+                            self._on_timing_line(str(num), line, changes)
+                elif method == "TimingAppData":
+                    for num, line in (data.get("Lines") or {}).items():
+                        if isinstance(line, dict):
+                            self._on_app_line(str(num), line, changes)
+        return changes
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Full current aggregates, sent to clients when they connect."""
+        with self._lock:
+            return {num: self._public(agg.values) for num, agg in self.drivers.items()}
+
+    def merge(self, changes: Dict[str, Dict[str, Any]]):
+        """Fold deltas computed elsewhere (live bus workers) into this snapshot."""
+        with self._lock:
+            for num, fields in changes.items():
+                self._driver(num).values.update(fields)
+
+    # ── Internals ─────────────────────────────────────────────
+    @staticmethod
+    def _public(values: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: (list(v) if isinstance(v, list) else v) for k, v in values.items()}
+
+    def _driver(self, num: str) -> DriverAggregate:
+        agg = self.drivers.get(num)
+        if agg is None:
+            agg = self.drivers[num] = DriverAggregate()
+        return agg
+
+    def _set(self, num: str, field: str, value, changes: dict):
+        agg = self._driver(num)
+        if agg.values.get(field) != value:
+            agg.values[field] = value
+            changes.setdefault(num, {})[field] = value
+
+    def _on_session_info(self, data: dict):
+        # A new session starts from scratch; the same path arrives repeatedly
+        path = data.get("Path")
+        if path and self.session_path and path != self.session_path:
+            self._clear()
+        if path:
+            self.session_path = path
+
+    def _on_timing_line(self, num: str, line: dict, changes: dict):
+        agg = self._driver(num)
+
+        if "Position" in line:
+            try:
+                self._set(num, "position", int(line["Position"]), changes)
+            except (TypeError, ValueError):
+                pass
+
+        if "GapToLeader" in line:
+            gap = line["GapToLeader"]
+            self._set(num, "gap_to_leader", _ms(parse_time(gap)), changes)
+            self._set(num, "gap_laps", parse_laps_behind(gap), changes)
+
+        interval = line.get("IntervalToPositionAhead")
+        if isinstance(interval, dict) and "Value" in interval:
+            self._set(num, "interval", _ms(parse_time(interval["Value"])), changes)
+            self._set(num, "interval_laps", parse_laps_behind(interval["Value"]), changes)
+
+        if "NumberOfPitStops" in line:
+            self._set(num, "pit_stops", line["NumberOfPitStops"], changes)
+        if "InPit" in line:
+            self._set(num, "in_pit", bool(line["InPit"]), changes)
+
+        for idx, sector in _indexed(line.get("Sectors")):
+            if idx < 3 and isinstance(sector, dict) and "Value" in sector:
+                self._on_sector(num, idx, parse_time(sector["Value"]), changes)
+
+        last_lap = line.get("LastLapTime")
+        if isinstance(last_lap, dict) and last_lap.get("Value"):
+            seconds = parse_time(last_lap["Value"])
+            if seconds is not None and _ms(seconds) != agg.values.get("last_lap"):
+                self._on_lap(num, seconds, changes)
+
+    def _on_sector(self, num: str, idx: int, seconds: Optional[float], changes: dict):
+        agg = self._driver(num)
+        sectors = list(agg.values["sectors"])
+        colors = list(agg.values["sector_colors"])
+        sectors[idx] = _ms(seconds)
+
+        if seconds is None:
+            # Sector cleared at the start of a new lap
+            colors[idx] = 0
+        else:
+            if agg.best_sectors[idx] is None or seconds < agg.best_sectors[idx]:
+                agg.best_sectors[idx] = seconds
+
+            best = self.session_best_sectors[idx]
+            if best is None or seconds < best - SECTOR_EPSILON:
+                previous = self.session_best_holders[idx]
+                self.session_best_sectors[idx] = seconds
+                self.session_best_holders[idx] = num
+                if previous is not None and previous != num:
+                    self._demote_sector(previous, idx, changes)
+                best = seconds
+
+            if seconds <= best + SECTOR_EPSILON:
+                colors[idx] = 2
+            elif seconds <= agg.best_sectors[idx] + SECTOR_EPSILON:
+                colors[idx] = 1
+            else:
+                colors[idx] = 0
+
+        self._set(num, "sectors", sectors, changes)
+        self._set(num, "sector_colors", colors, changes)
+
+    def _demote_sector(self, num: str, idx: int, changes: dict):
+        """The previous session-best holder is no longer purple in that sector."""
+        agg = self._driver(num)
+        if agg.values["sector_colors"][idx] == 2:
+            colors = list(agg.values["sector_colors"])
+            colors[idx] = 1
+            self._set(num, "sector_colors", colors, changes)
+
+    def _on_lap(self, num: str, seconds: float, changes: dict):
+        agg = self._driver(num)
+        self._set(num, "last_lap", _ms(seconds), changes)
+
+        if agg.best_lap is None or seconds < agg.best_lap:
+            agg.best_lap = seconds
+            self._set(num, "best_lap", _ms(seconds), changes)
+
+        agg.stint_pace.add(seconds)
+        self._set(num, "stint_laps", agg.values.get("stint_laps", 0) + 1, changes)
+        self._set(num, "long_run_pace", _ms(agg.stint_pace.pace), changes)
+
+    def _on_app_line(self, num: str, line: dict, changes: dict):
+        agg = self._driver(num)
+        stints = _indexed(line.get("Stints"))
+        if not stints:
+            return
+
+        idx, stint = max(stints, key=lambda s: s[0])
+        if agg.stint_number is None or idx > agg.stint_number:
+            # New stint: restart the long-run pace window
+            agg.stint_number = idx
+            agg.stint_pace = StintPace()
+            self._set(num, "stint", idx + 1, changes)
+            self._set(num, "stint_laps", 0, changes)
+            self._set(num, "long_run_pace", None, changes)
+
+        if idx == agg.stint_number and isinstance(stint, dict) and stint.get("Compound"):
+            self._set(num, "compound", str(stint["Compound"]), changes)
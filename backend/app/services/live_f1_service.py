@@ -1,20 +1,26 @@
 import asyncio
 import json
 import logging
-import os
-from typing import List, Set
+import threading
+import time
+from typing import Set
 from fastapi import WebSocket
-import fastf1.livetiming.client
-import fastf1.internals.f1auth
 from dotenv import load_dotenv
+from app.core.config import get_settings
+from app.services.live_analytics import LiveAnalytics
+from app.services.live_feed_sources import BusFeedSource, ReconnectBackoff, build_feed_payload, create_feed_source_from_settings
 
 load_dotenv()
 
 logger = logging.getLogger("LiveF1Service")
 
+# json.dumps keeps key order, so analytics payloads on the bus start with this
+ANALYTICS_PREFIX = json.dumps({"type": "analytics"})[:-1]
+
+
 class LiveF1Service:
     _instance = None
-    
+
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(LiveF1Service, cls).__new__(cls)
@@ -23,111 +29,230 @@ class LiveF1Service:
 
     def _init_manager(self):
         self.active_connections: Set[WebSocket] = set()
-        self.client = None
-        self.loop = asyncio.get_event_loop()
-        self.is_running = False
-        
+        self.source = None
+        self.loop = None
+        self.analytics = LiveAnalytics()
+
+        # Upstream lifecycle: idle -> running -> (backoff -> running)* -> idle
+        self.state = "idle"
+        self._supervisor_task: asyncio.Task | None = None
+        self._idle_task: asyncio.Task | None = None
+        self.restarts = 0
+        self.last_error: str | None = None
+        self.last_message_at: float | None = None
+        self.connected_since: float | None = None
+        self.next_retry_at: float | None = None
+
         # Use FastF1 standard authentication
         logger.info("Using standard built-in FastF1 authentication flow.")
 
+    @property
+    def is_running(self) -> bool:
+        return self._supervisor_task is not None and not self._supervisor_task.done()
+
     async def connect_client(self, websocket: WebSocket):
         await websocket.accept()
         self.active_connections.add(websocket)
         logger.info(f"New client connected. Total: {len(self.active_connections)}")
-        
+
+        # Late joiners get the current aggregates; afterwards only deltas are pushed
+        snapshot = self.analytics.snapshot()
+        if snapshot:
+            await websocket.send_text(json.dumps({"type": "analytics", "snapshot": True, "data": snapshot}))
+
+        # A viewer came back during the grace period: keep the upstream alive
+        if self._idle_task is not None:
+            self._idle_task.cancel()
+            self._idle_task = None
+
         if not self.is_running:
             await self.start_f1_connection()
 
     def disconnect_client(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+        self.active_connections.discard(websocket)
         logger.info(f"Client disconnected. Total: {len(self.active_connections)}")
-        
-        if len(self.active_connections) == 0:
-            # We could stop the F1 connection here to save resources, 
-            # but maybe we keep it cached for a bit?
-            # For now, let's keep it running during the session.
-            pass
+
+        if len(self.active_connections) == 0 and self.is_running and self._idle_task is None:
+            # Keep the upstream open for a grace period (page reloads, short
+            # network drops), then release the thread and the socket.
+            self._idle_task = asyncio.create_task(self._idle_shutdown())
+
+    async def _idle_shutdown(self):
+        grace = get_settings().LIVE_IDLE_GRACE_SECONDS
+        try:
+            await asyncio.sleep(grace)
+        except asyncio.CancelledError:
+            return
+        self._idle_task = None
+        if not self.active_connections:
+            logger.info(f"No clients for {grace:.0f}s, stopping live feed")
+            await self.stop_f1_connection()
 
     async def broadcast(self, message: dict):
         if not self.active_connections:
             return
-            
+        await self.broadcast_text(json.dumps(message))
+
+    async def broadcast_text(self, msg_str: str):
+        if not self.active_connections:
+            return
+
         disconnected = set()
-        msg_str = json.dumps(message)
-        
         for connection in self.active_connections:
             try:
                 await connection.send_text(msg_str)
             except Exception:
                 disconnected.add(connection)
-                
+
         for connection in disconnected:
             if connection in self.active_connections:
                 self.active_connections.remove(connection)
 
-    def _decode_data(self, data_str: str):
-        try:
-            import base64
-            import zlib
-            decoded = base64.b64decode(data_str)
-            return json.loads(zlib.decompress(decoded, -zlib.MAX_WBITS).decode('utf-8-sig'))
-        except Exception as e:
-            logger.error(f"Decoding failed: {e}")
-            return data_str
-
-    async def start_f1_connection(self):
-        if self.is_running:
+    def _on_feed_message(self, msg):
+        """Called from the feed source thread for every raw message."""
+        if not isinstance(msg, list):
             return
-            
-        self.is_running = True
-        logger.info("Starting F1 SignalR connection...")
-        
-        # Create a custom client that calls our broadcast
-        class RelayClient(fastf1.livetiming.client.SignalRClient):
-            def __init__(self, service_instance, *args, **kwargs):
-                self.service_instance = service_instance
-                super().__init__(*args, **kwargs)
-                
-            def _on_message(self, msg):
-                if isinstance(msg, list):
-                    processed_msg = []
-                    for inner in msg:
-                        # SignalR Core message: [Method, Payload, Timestamp]
-                        if isinstance(inner, list) and len(inner) >= 2:
-                            method = inner[0]
-                            payload = inner[1]
-                            
-                            # Handle compressed payloads
-                            if isinstance(method, str) and method.endswith(".z") and isinstance(payload, str):
-                                payload = self.service_instance._decode_data(payload)
-                            
-                            processed_msg.append({
-                                "method": method,
-                                "data": payload,
-                                "timestamp": inner[2] if len(inner) > 2 else None
-                            })
-                        else:
-                            processed_msg.append(inner)
-
-                    payload = {"type": "feed", "data": processed_msg}
-                    asyncio.run_coroutine_threadsafe(
-                        self.service_instance.broadcast(payload), 
-                        self.service_instance.loop
-                    )
-
-        # We run it in a separate thread because fastf1 SignalRClient is synchronous/blocking start()
-        self.client = RelayClient(self, "live_stream.txt")
-        
+        self.last_message_at = time.time()
+        payload = build_feed_payload(msg)
+        asyncio.run_coroutine_threadsafe(self.broadcast(payload), self.loop)
+
+        changes = self.analytics.update(payload["data"])
+        if changes:
+            asyncio.run_coroutine_threadsafe(self.broadcast({"type": "analytics", "data": changes}), self.loop)
+
+    def _on_bus_message(self, msg_str: str):
+        """Called from the bus subscriber thread with an already-encoded payload."""
+        self.last_message_at = time.time()
+        asyncio.run_coroutine_threadsafe(self.broadcast_text(msg_str), self.loop)
+
+        # live_ingest.py computes the analytics; keep a snapshot for late joiners
+        if msg_str.startswith(ANALYTICS_PREFIX):
+            self.analytics.merge(json.loads(msg_str)["data"])
+
+    def _create_source(self, settings):
+        if settings.LIVE_BUS_ADDRESS:
+            # Multi-worker mode: live_ingest.py owns the upstream connection,
+            # this worker only subscribes to the decoded feed it publishes.
+            logger.info(f"Subscribing to live bus at {settings.LIVE_BUS_ADDRESS}")
+            return BusFeedSource(settings.LIVE_BUS_ADDRESS), self._on_bus_message
+
+        logger.info(f"Starting live feed source: {settings.LIVE_FEED_SOURCE}")
+        return create_feed_source_from_settings(settings), self._on_feed_message
+
+    def _run_source_in_thread(self, source, on_message) -> asyncio.Future:
+        """Every feed source blocks in run(), so it gets its own thread.
+        The returned future resolves when run() returns (or raises)."""
+        future = self.loop.create_future()
+
+        def _set_result(exc):
+            if future.done():
+                return
+            if exc is None:
+                future.set_result(None)
+            else:
+                future.set_exception(exc)
+
         def run_client():
             try:
-                self.client.start()
+                source.run(on_message)
+                exc = None
             except Exception as e:
-                logger.error(f"F1 Client Error: {e}")
-                self.is_running = False
+                exc = e
+            self.loop.call_soon_threadsafe(_set_result, exc)
 
-        import threading
         self.thread = threading.Thread(target=run_client, daemon=True)
         self.thread.start()
+        return future
+
+    async def _supervise(self):
+        """Keep the upstream connected while clients want it, reconnecting with backoff."""
+        settings = get_settings()
+        backoff = ReconnectBackoff(settings.LIVE_RECONNECT_BASE_SECONDS, settings.LIVE_RECONNECT_MAX_SECONDS)
+
+        try:
+            while True:
+                self.source, on_message = self._create_source(settings)
+                self.state = "running"
+                self.connected_since = time.time()
+                self.next_retry_at = None
+
+                try:
+                    await self._run_source_in_thread(self.source, on_message)
+                    if not self.source.restart_on_exit:
+                        # A replay or synthetic feed reached its end
+                        logger.info("Live feed source finished")
+                        return
+                    self.last_error = "Upstream closed the connection"
+                except Exception as e:
+                    self.last_error = str(e)
+                    logger.error(f"F1 Client Error: {e}")
+
+                uptime = time.time() - self.connected_since
+                delay = backoff.next_delay(uptime)
+                self.restarts += 1
+                self.state = "backoff"
+                self.connected_since = None
+                self.next_retry_at = time.time() + delay
+                logger.warning(f"Live feed lost, reconnecting in {delay:.1f}s (attempt {backoff.attempts})")
+                await asyncio.sleep(delay)
+        finally:
+            self.state = "idle"
+            self.connected_since = None
+            self.next_retry_at = None
+
+    async def start_f1_connection(self):
+        if self.is_running:
+            return
+
+        # Feed threads post back onto the loop that serves the WebSockets
+        self.loop = asyncio.get_running_loop()
+        self._supervisor_task = asyncio.create_task(self._supervise())
+
+    async def stop_f1_connection(self):
+        """Stop the upstream feed and wait for the supervisor to exit."""
+        task = self._supervisor_task
+        if task is None or task.done():
+            return
+
+        self.state = "stopping"
+        if self.source is not None:
+            self.source.stop()
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        self._supervisor_task = None
+        # The next viewer may come for another session: don't hand them this one's aggregates
+        self.analytics.reset()
+
+    async def shutdown(self):
+        """Called from the FastAPI lifespan when the app exits."""
+        if self._idle_task is not None:
+            self._idle_task.cancel()
+            self._idle_task = None
+        await self.stop_f1_connection()
+        for connection in list(self.active_connections):
+            try:
+                await connection.close(code=1001)
+            except Exception:
+                pass
+        self.active_connections.clear()
+
+    def health(self) -> dict:
+        """Lifecycle snapshot for the /live/health endpoint."""
+        now = time.time()
+        return {
+            "state": self.state,
+            "source": self.source.name if self.source is not None else None,
+            "clients": len(self.active_connections),
+            "uptime_seconds": round(now - self.connected_since, 1) if self.connected_since else None,
+            "seconds_since_last_message": round(now - self.last_message_at, 1) if self.last_message_at else None,
+            "restarts": self.restarts,
+            "last_error": self.last_error,
+            "next_retry_in_seconds": round(max(0.0, self.next_retry_at - now), 1) if self.next_retry_at else None,
+            "idle_shutdown_pending": self._idle_task is not None,
+        }
 
 # Global instance
 live_f1_manager = LiveF1Service()
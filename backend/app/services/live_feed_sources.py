@@ -0,0 +1,325 @@
+"""
+Feed sources for the live timing relay.
+
+A feed source produces raw SignalR messages (``[topic, payload, timestamp]``
+lists, exactly what the F1 ``feed`` hub method delivers) and hands them to a
+callback. Every source blocks in ``run()``, so the relay starts it in its own
+thread, the same way the FastF1 SignalR client has always been run.
+
+- ``SignalRFeedSource``  — the real F1 live timing stream (default).
+- ``ReplayFeedSource``   — replays a file recorded by the FastF1 client.
+- ``SyntheticFeedSource`` — generates timestamped messages at a fixed rate,
+  used by ``bench_live_ws.py`` to measure relay latency.
+- ``BusFeedSource``      — subscribes to the decoded feed published by
+  ``live_ingest.py`` (multi-worker mode, see ``app.core.live_bus``).
+"""
+
+import ast
+import base64
+import json
+import logging
+import random
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from app.core.live_bus import connect_subscriber
+
+logger = logging.getLogger("LiveF1Service")
+
+OnMessage = Callable[[list], None]
+
+
+def decode_compressed(data_str: str):
+    """Inflate a ``.z`` topic payload (base64 + raw deflate JSON)."""
+    try:
+        decoded = base64.b64decode(data_str)
+        return json.loads(zlib.decompress(decoded, -zlib.MAX_WBITS).decode('utf-8-sig'))
+    except Exception as e:
+        logger.error(f"Decoding failed: {e}")
+        return data_str
+
+
+def build_feed_payload(msg: list) -> dict:
+    """Turn a raw SignalR message into the ``{"type": "feed"}`` payload sent to clients."""
+    # The feed hub delivers a single [Method, Payload, Timestamp] message,
+    # but batches of such messages are handled as well.
+    entries = [msg] if msg and isinstance(msg[0], str) else msg
+
+    processed_msg = []
+    for inner in entries:
+        # SignalR Core message: [Method, Payload, Timestamp]
+        if isinstance(inner, list) and len(inner) >= 2:
+            method = inner[0]
+            payload = inner[1]
+
+            # Handle compressed payloads
+            if isinstance(method, str) and method.endswith(".z") and isinstance(payload, str):
+                payload = decode_compressed(payload)
+
+            processed_msg.append({
+                "method": method,
+                "data": payload,
+                "timestamp": inner[2] if len(inner) > 2 else None
+            })
+        else:
+            processed_msg.append(inner)
+
+    return {"type": "feed", "data": processed_msg}
+
+
+class ReconnectBackoff:
+    """Exponential backoff with jitter for upstream reconnects.
+    The attempt counter resets once a connection has stayed up for ``stable_after`` seconds."""
+
+    def __init__(self, base: float, maximum: float, stable_after: float = 60.0):
+        self.base = base
+        self.maximum = maximum
+        self.stable_after = stable_after
+        self.attempts = 0
+
+    def next_delay(self, uptime: float) -> float:
+        if uptime >= self.stable_after:
+            self.attempts = 0
+        delay = min(self.maximum, self.base * (2 ** self.attempts))
+        self.attempts += 1
+        return delay * random.uniform(0.8, 1.2)
+
+
+class FeedSource:
+    """Base class: ``run()`` blocks until the feed ends or ``stop()`` is called."""
+
+    name = "base"
+    # Whether the relay should reconnect when run() returns on its own
+    restart_on_exit = True
+
+    def __init__(self):
+        self._stop_event = threading.Event()
+
+    def run(self, on_message: OnMessage):
+        raise NotImplementedError
+
+    def stop(self):
+        self._stop_event.set()
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop_event.is_set()
+
+
+class SignalRFeedSource(FeedSource):
+    """Relays the official F1 SignalR stream through FastF1's client."""
+
+    name = "signalr"
+
+    def __init__(self, output_file: str = "live_stream.txt"):
+        super().__init__()
+        self.output_file = output_file
+        self.client = None
+
+    def run(self, on_message: OnMessage):
+        # Imported here: fastf1 pulls in pandas/numpy, which the other sources never need
+        import fastf1.livetiming.client
+
+        source = self
+
+        class RelayClient(fastf1.livetiming.client.SignalRClient):
+            def _on_message(self, msg):
+                # Keep FastF1's raw recording (useful for ReplayFeedSource)
+                super()._on_message(msg)
+                if isinstance(msg, list):
+                    on_message(msg)
+
+            def _supervise(self):
+                # Same as FastF1's loop, but also exits when the relay asks us to stop
+                self._t_last_message = time.time()
+                while not source.stopped:
+                    if (self.timeout != 0
+                            and time.time() - self._t_last_message > self.timeout):
+                        self.logger.warning(f"Timeout - received no data for more than {self.timeout} seconds!")
+                        break
+                    time.sleep(1)
+                self._exit()
+
+        self.client = RelayClient(self.output_file)
+        self.client.start()
+
+
+class ReplayFeedSource(FeedSource):
+    """
+    Replays a recording written by ``fastf1.livetiming.client.SignalRClient``.
+    Each line is either ``str([topic, payload, timestamp])`` or a JSON list.
+    Gaps between message timestamps are honoured, divided by ``speed``
+    (``speed <= 0`` replays as fast as possible).
+    """
+
+    name = "replay"
+    restart_on_exit = False
+
+    def __init__(self, path: str, speed: float = 1.0, loop: bool = False):
+        super().__init__()
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+
+    @staticmethod
+    def _parse_line(line: str) -> Optional[list]:
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            msg = json.loads(line)
+        except ValueError:
+            try:
+                msg = ast.literal_eval(line)
+            except (ValueError, SyntaxError):
+                return None
+        return msg if isinstance(msg, list) else None
+
+    @staticmethod
+    def _parse_timestamp(value) -> Optional[float]:
+        if not isinstance(value, str) or not value:
+            return None
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return None
+
+    def run(self, on_message: OnMessage):
+        while not self.stopped:
+            previous_ts = None
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if self.stopped:
+                        return
+                    msg = self._parse_line(line)
+                    if msg is None:
+                        continue
+
+                    ts = self._parse_timestamp(msg[2]) if len(msg) > 2 else None
+                    if self.speed > 0 and ts is not None and previous_ts is not None:
+                        # Cap long pauses (e.g. red flags) so replays stay usable
+                        delay = min(max(ts - previous_ts, 0.0) / self.speed, 5.0)
+                        if delay and self._stop_event.wait(delay):
+                            return
+                    if ts is not None:
+                        previous_ts = ts
+                    on_message(msg)
+
+            if not self.loop:
+                return
+
+
+class SyntheticFeedSource(FeedSource):
+    """
+    Emits ``rate`` messages per second. Every message carries the wall-clock
+    time it was produced (``Emitted``) so clients can measure end-to-end latency,
+    plus ``payload_bytes`` of padding to mimic real message sizes.
+    Stops after ``duration`` seconds (``0`` = run until stopped).
+    """
+
+    name = "synthetic"
+    restart_on_exit = False
+
+    def __init__(self, rate: float = 10.0, payload_bytes: int = 512, duration: float = 0):
+        super().__init__()
+        self.rate = rate
+        self.payload_bytes = payload_bytes
+        self.duration = duration
+
+    def run(self, on_message: OnMessage):
+        interval = 1.0 / self.rate if self.rate > 0 else 0
+        padding = "x" * self.payload_bytes
+        started = time.time()
+        seq = 0
+        next_at = started
+
+        while not self.stopped:
+            now = time.time()
+            if self.duration and now - started >= self.duration:
+                return
+            seq += 1
+            on_message([
+                "Heartbeat",
+                {"Seq": seq, "Emitted": now, "Padding": padding},
+                datetime.now(timezone.utc).isoformat(),
+            ])
+            next_at += interval
+            delay = next_at - time.time()
+            if delay > 0 and self._stop_event.wait(delay):
+                return
+
+
+class BusFeedSource(FeedSource):
+    """
+    Reads the feed published by ``live_ingest.py`` on the local live bus.
+    Unlike the other sources it hands over already-encoded JSON payloads
+    (one ``str`` per message), so web workers relay them without re-encoding.
+    """
+
+    name = "bus"
+
+    def __init__(self, address: str):
+        super().__init__()
+        self.address = address
+        self._sock = None
+
+    def run(self, on_message: Callable[[str], None]):
+        self._sock = connect_subscriber(self.address)
+        try:
+            with self._sock.makefile("r", encoding="utf-8") as reader:
+                for line in reader:
+                    if self.stopped:
+                        return
+                    line = line.rstrip("\n")
+                    if line:
+                        on_message(line)
+        except OSError:
+            # Socket closed by stop()
+            if not self.stopped:
+                raise
+        finally:
+            self._sock.close()
+
+        if not self.stopped:
+            raise ConnectionError(f"Live bus at {self.address} closed the connection")
+
+    def stop(self):
+        super().stop()
+        if self._sock is not None:
+            try:
+                self._sock.shutdown(2)
+            except OSError:
+                pass
+
+
+def create_feed_source(kind: str, **options) -> FeedSource:
+    """Build the feed source configured by ``LIVE_FEED_SOURCE``."""
+    if kind == "signalr":
+        return SignalRFeedSource(options.get("output_file", "live_stream.txt"))
+    if kind == "replay":
+        return ReplayFeedSource(
+            options["replay_file"],
+            speed=options.get("replay_speed", 1.0),
+            loop=options.get("replay_loop", False),
+        )
+    if kind == "synthetic":
+        return SyntheticFeedSource(
+            rate=options.get("synthetic_rate", 10.0),
+            payload_bytes=options.get("synthetic_payload_bytes", 512),
+        )
+    raise ValueError(f"Unknown live feed source '{kind}'")
+
+
+def create_feed_source_from_settings(settings) -> FeedSource:
+    """Build the upstream feed source described by the ``LIVE_*`` settings."""
+    return create_feed_source(
+        settings.LIVE_FEED_SOURCE,
+        replay_file=settings.LIVE_REPLAY_FILE,
+        replay_speed=settings.LIVE_REPLAY_SPEED,
+        replay_loop=settings.LIVE_REPLAY_LOOP,
+        synthetic_rate=settings.LIVE_SYNTHETIC_RATE,
+        synthetic_payload_bytes=settings.LIVE_SYNTHETIC_PAYLOAD_BYTES,
+    )
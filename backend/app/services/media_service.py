@@ -0,0 +1,100 @@
+"""
+Service layer for the responsive image derivatives.
+
+media_derivatives.py writes WebP/AVIF variants of media/ at fixed widths into
+MEDIA_DERIVED_DIR, and a manifest (MEDIA_DERIVED_MANIFEST) mapping every
+source path to them. This module reads that manifest (reloading it when the file changes) and
+turns it into URLs and ready-made srcset strings for the front end.
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+DERIVED_URL_PREFIX = "/media-derived"
+MEDIA_URL_PREFIX = "/media"
+
+_lock = threading.Lock()
+# (mtime_ns, manifest) of the last manifest read
+_loaded: Tuple[int, Optional[Dict[str, Any]]] = (0, None)
+
+
+def _manifest_path() -> str:
+    return get_settings().MEDIA_DERIVED_MANIFEST
+
+
+def load_manifest() -> Optional[Dict[str, Any]]:
+    """The derivatives manifest, or None if media_derivatives.py has not been run."""
+    global _loaded
+    path = _manifest_path()
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    with _lock:
+        if _loaded[0] != mtime:
+            try:
+                with open(path) as f:
+                    _loaded = (mtime, json.load(f))
+            except (OSError, ValueError) as e:
+                # Keep serving the previous copy while the file is being rewritten
+                logger.warning(f"Could not read media manifest {path}: {e}")
+        return _loaded[1]
+
+
+def manifest_version() -> Optional[str]:
+    """Changes whenever the manifest file does; used as the endpoint's ETag."""
+    load_manifest()
+    return f'"{_loaded[0]:x}"' if _loaded[1] is not None else None
+
+
+def _asset_payload(source: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+    variants = [
+        {**variant, "url": f"{DERIVED_URL_PREFIX}/{variant['path']}"}
+        for variant in entry["variants"]
+    ]
+    candidates: Dict[str, list] = {}
+    for variant in variants:
+        candidates.setdefault(variant["format"], []).append(f"{variant['url']} {variant['width']}w")
+    srcset = {fmt: ", ".join(items) for fmt, items in candidates.items()}
+    return {
+        "source": f"{MEDIA_URL_PREFIX}/{source}",
+        "width": entry["width"],
+        "height": entry["height"],
+        "variants": variants,
+        "srcset": srcset,
+    }
+
+
+def get_manifest(prefix: str = "") -> Optional[Dict[str, Any]]:
+    """Every asset (optionally only those under a path prefix) with its variants."""
+    manifest = load_manifest()
+    if manifest is None:
+        return None
+    prefix = prefix.strip("/")
+    assets = {
+        source: _asset_payload(source, entry)
+        for source, entry in manifest["assets"].items()
+        if not prefix or source.startswith(f"{prefix}/")
+    }
+    return {
+        "widths": manifest.get("widths", []),
+        "formats": manifest.get("formats", []),
+        "total": len(assets),
+        "assets": assets,
+    }
+
+
+def get_asset(path: str) -> Optional[Dict[str, Any]]:
+    """Variants of a single media/ path, or None if it has none."""
+    manifest = load_manifest()
+    path = path.strip("/")
+    if manifest is None or path not in manifest["assets"]:
+        return None
+    return _asset_payload(path, manifest["assets"][path])
@@ -0,0 +1,415 @@
+"""
+In-memory columnar engine over the F1DB race and qualifying results.
+
+Head-to-head, teammate and filter-plus-aggregate questions touch every race a
+driver ever entered, which over the REST API means paging whole result sets
+into Python on each request. Instead, the `data/f1db-*.csv` files are loaded
+once per process into NumPy arrays:
+
+- driver, constructor and race ids are integer-encoded (sorted vocabularies,
+  so an id is found with a binary search)
+- rows are sorted by (driver, race, finishing order), with per-driver offsets,
+  so all results of a driver are one contiguous slice
+- secondary sorted indexes by (race, constructor) and by year answer "who
+  shared this car" and year-range filters with searchsorted
+
+Every query is a handful of vectorized operations over at most a few
+thousand rows, which takes well under a millisecond to a few milliseconds
+(see bench_results_engine.py).
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+RESULTS_CSV = "f1db-races-race-results.csv"
+QUALIFYING_CSV = "f1db-races-qualifying-results.csv"
+
+# Result rows of drivers who entered but never took the start
+NON_STARTS = {"DNQ", "DNPQ", "DNS", "DNP", "EX"}
+# Qualifying time columns, from least to most decisive session
+QUALIFYING_SESSIONS = ["timemillis", "q1millis", "q2millis", "q3millis"]
+
+
+class Vocabulary:
+    """Sorted string ids <-> dense int32 codes."""
+
+    def __init__(self, values):
+        self.ids = np.unique(np.asarray(values, dtype=object).astype(str))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def encode(self, values) -> np.ndarray:
+        return np.searchsorted(self.ids, np.asarray(values, dtype=object).astype(str)).astype(np.int32)
+
+    def code(self, value: str) -> Optional[int]:
+        i = int(np.searchsorted(self.ids, value))
+        return i if i < len(self.ids) and self.ids[i] == value else None
+
+    def decode(self, codes) -> List[str]:
+        return [str(self.ids[c]) for c in codes]
+
+
+def _offsets(sorted_codes: np.ndarray, size: int) -> np.ndarray:
+    """offsets[c]:offsets[c + 1] is the slice of rows with code c."""
+    return np.searchsorted(sorted_codes, np.arange(size + 1)).astype(np.int64)
+
+
+def _int_column(df: pd.DataFrame, column: str, fill: int = 0, dtype=np.int32) -> np.ndarray:
+    return pd.to_numeric(df[column], errors="coerce").fillna(fill).to_numpy(dtype)
+
+
+def _flag(df: pd.DataFrame, column: str) -> np.ndarray:
+    return df[column].astype(str).str.lower().eq("true").to_numpy()
+
+
+class ResultsEngine:
+    """Columnar race and qualifying results; see the module docstring."""
+
+    def __init__(self, data_dir: str):
+        started = time.perf_counter()
+        results = pd.read_csv(os.path.join(data_dir, RESULTS_CSV), low_memory=False)
+        qualifying = pd.read_csv(os.path.join(data_dir, QUALIFYING_CSV), low_memory=False)
+        for df in (results, qualifying):
+            df.columns = [c.lower() for c in df.columns]
+
+        self.drivers = Vocabulary(pd.concat([results["driverid"], qualifying["driverid"]]))
+        self.constructors = Vocabulary(pd.concat([results["constructorid"], qualifying["constructorid"]]))
+
+        # Race ids are already dense integers: the season of a race is one array lookup
+        last_race = max(results["raceid"].max(), qualifying["raceid"].max())
+        self.race_year = np.zeros(last_race + 1, dtype=np.int16)
+        for df in (results, qualifying):
+            self.race_year[df["raceid"].to_numpy()] = df["year"].to_numpy()
+
+        self._load_results(results)
+        self._load_qualifying(qualifying)
+        self.load_seconds = time.perf_counter() - started
+        logger.info(f"Results engine: {len(self.r_race)} results, {len(self.q_race)} qualifying rows "
+                    f"loaded in {self.load_seconds:.2f}s")
+
+    # ── Loading ──────────────────────────────────────────────
+    def _load_results(self, df: pd.DataFrame):
+        driver = self.drivers.encode(df["driverid"])
+        race = df["raceid"].to_numpy(np.int32)
+        order = _int_column(df, "positiondisplayorder", fill=999)
+        # Sorted by driver, race, then finishing order: a driver's first row in a
+        # race is their best one when they shared or swapped cars
+        perm = np.lexsort((order, race, driver))
+
+        self.r_driver = driver[perm]
+        self.r_race = race[perm]
+        self.r_year = self.race_year[self.r_race]
+        self.r_constructor = self.constructors.encode(df["constructorid"])[perm]
+        self.r_order = order[perm]
+        self.r_position = _int_column(df, "positionnumber")[perm]     # 0 = not classified
+        self.r_grid = _int_column(df, "gridpositionnumber")[perm]      # 0 = no grid slot
+        self.r_points = pd.to_numeric(df["points"], errors="coerce").fillna(0).to_numpy(np.float32)[perm]
+        self.r_started = ~df["positiontext"].astype(str).isin(NON_STARTS).to_numpy()[perm]
+        self.r_pole = _flag(df, "poleposition")[perm]
+        self.r_offsets = _offsets(self.r_driver, len(self.drivers))
+
+        # (race, constructor) index: rows that shared a team in a race are adjacent
+        self.r_car_key = self.r_race.astype(np.int64) * len(self.constructors) + self.r_constructor
+        self.r_by_car = np.argsort(self.r_car_key, kind="stable")
+        self.r_car_sorted = self.r_car_key[self.r_by_car]
+
+        # Year index for range filters
+        self.r_by_year = np.argsort(self.r_year, kind="stable")
+        self.r_year_sorted = self.r_year[self.r_by_year]
+
+    def _load_qualifying(self, df: pd.DataFrame):
+        driver = self.drivers.encode(df["driverid"])
+        race = df["raceid"].to_numpy(np.int32)
+        position = _int_column(df, "positionnumber", fill=999)
+        perm = np.lexsort((position, race, driver))
+
+        self.q_driver = driver[perm]
+        self.q_race = race[perm]
+        self.q_year = self.race_year[self.q_race]
+        self.q_constructor = self.constructors.encode(df["constructorid"])[perm]
+        self.q_position = position[perm]
+        # One column per session, 0 = no time set
+        self.q_millis = np.stack([_int_column(df, c) for c in QUALIFYING_SESSIONS], axis=1)[perm]
+        self.q_offsets = _offsets(self.q_driver, len(self.drivers))
+
+        self.q_car_key = self.q_race.astype(np.int64) * len(self.constructors) + self.q_constructor
+        self.q_by_car = np.argsort(self.q_car_key, kind="stable")
+        self.q_car_sorted = self.q_car_key[self.q_by_car]
+
+    # ── Helpers ──────────────────────────────────────────────
+    def driver_code(self, driver_id: str) -> Optional[int]:
+        return self.drivers.code(driver_id)
+
+    @staticmethod
+    def _best_per_race(races: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """First (best) row of each race within one driver's slice."""
+        _, first = np.unique(races, return_index=True)
+        return rows[first]
+
+    def _driver_rows(self, code: int, qualifying: bool = False) -> np.ndarray:
+        offsets, races = (self.q_offsets, self.q_race) if qualifying else (self.r_offsets, self.r_race)
+        rows = np.arange(offsets[code], offsets[code + 1])
+        return self._best_per_race(races[rows], rows)
+
+    def _pair_rows(self, a: int, b: int, teammates_only: bool, qualifying: bool = False):
+        """Row indexes of a and b in the races both entered (same car only when teammates_only)."""
+        rows_a = self._driver_rows(a, qualifying)
+        rows_b = self._driver_rows(b, qualifying)
+        if teammates_only:
+            keys = self.q_car_key if qualifying else self.r_car_key
+        else:
+            keys = self.q_race if qualifying else self.r_race
+        _, ia, ib = np.intersect1d(keys[rows_a], keys[rows_b], return_indices=True)
+        return rows_a[ia], rows_b[ib]
+
+    def _same_car(self, rows: np.ndarray, qualifying: bool = False):
+        """
+        Pair each of a driver's rows with every other row of the same car in the
+        same race. Returns (driver rows, team-mate rows), aligned.
+        """
+        if qualifying:
+            keys, by_car, car_sorted, drivers = self.q_car_key, self.q_by_car, self.q_car_sorted, self.q_driver
+        else:
+            keys, by_car, car_sorted, drivers = self.r_car_key, self.r_by_car, self.r_car_sorted, self.r_driver
+        lo = np.searchsorted(car_sorted, keys[rows], side="left")
+        hi = np.searchsorted(car_sorted, keys[rows], side="right")
+        counts = hi - lo
+        # Expand every [lo, hi) range: position k of range j is lo[j] + k
+        starts = np.cumsum(counts) - counts
+        others = by_car[np.repeat(lo - starts, counts) + np.arange(counts.sum())]
+        mine = np.repeat(rows, counts)
+        keep = drivers[others] != drivers[mine]
+        return mine[keep], others[keep]
+
+    def _gaps(self, rows_a: np.ndarray, rows_b: np.ndarray):
+        """
+        Qualifying gap of b relative to a in the last session both set a time
+        in (ms and %); NaN where they never did.
+        """
+        ta, tb = self.q_millis[rows_a], self.q_millis[rows_b]
+        both = (ta > 0) & (tb > 0)
+        valid = both.any(axis=1)
+        last = both.shape[1] - 1 - np.argmax(both[:, ::-1], axis=1)
+        idx = np.arange(len(rows_a))
+        a_ms = ta[idx, last].astype(np.float64)
+        gap_ms = np.where(valid, tb[idx, last] - a_ms, np.nan)
+        gap_pct = np.where(valid, gap_ms / np.where(a_ms > 0, a_ms, 1) * 100, np.nan)
+        return gap_ms, gap_pct
+
+    @staticmethod
+    def _median(values: np.ndarray) -> Optional[float]:
+        values = values[~np.isnan(values)]
+        return round(float(np.median(values)), 3) if len(values) else None
+
+    # ── Queries ──────────────────────────────────────────────
+    def teammates(self, driver_id: str) -> Optional[List[Dict[str, Any]]]:
+        """Every teammate of a driver: races together and who finished ahead."""
+        code = self.driver_code(driver_id)
+        if code is None:
+            return None
+        mine, others = self._same_car(self._driver_rows(code))
+        # A teammate counts once per race
+        pair = self.r_race[others].astype(np.int64) * len(self.drivers) + self.r_driver[others]
+        _, first = np.unique(pair, return_index=True)
+        mine, others = mine[first], others[first]
+
+        mate = self.r_driver[others]
+        both_started = self.r_started[mine] & self.r_started[others]
+        ahead = both_started & (self.r_order[mine] < self.r_order[others])
+        behind = both_started & (self.r_order[mine] > self.r_order[others])
+        n = len(self.drivers)
+        races = np.bincount(mate, minlength=n)
+        ahead_n = np.bincount(mate, weights=ahead, minlength=n)
+        behind_n = np.bincount(mate, weights=behind, minlength=n)
+        first_year = np.full(n, 9999)
+        last_year = np.zeros(n, dtype=np.int64)
+        np.minimum.at(first_year, mate, self.r_year[others])
+        np.maximum.at(last_year, mate, self.r_year[others])
+
+        found = np.nonzero(races)[0]
+        found = found[np.argsort(-races[found], kind="stable")]
+        return [
+            {
+                "teammate_id": teammate,
+                "races": int(races[m]),
+                "ahead": int(ahead_n[m]),
+                "behind": int(behind_n[m]),
+                "first_year": int(first_year[m]),
+                "last_year": int(last_year[m]),
+            }
+            for m, teammate in zip(found, self.drivers.decode(found))
+        ]
+
+    def head_to_head(self, driver_a: str, driver_b: str, teammates_only: bool = False) -> Optional[Dict[str, Any]]:
+        """Race and qualifying record of two drivers in the races both entered."""
+        a, b = self.driver_code(driver_a), self.driver_code(driver_b)
+        if a is None or b is None:
+            return None
+
+        ra, rb = self._pair_rows(a, b, teammates_only)
+        both_started = self.r_started[ra] & self.r_started[rb]
+        a_ahead = both_started & (self.r_order[ra] < self.r_order[rb])
+        b_ahead = both_started & (self.r_order[rb] < self.r_order[ra])
+
+        qa, qb = self._pair_rows(a, b, teammates_only, qualifying=True)
+        qa_ahead = self.q_position[qa] < self.q_position[qb]
+        qb_ahead = self.q_position[qb] < self.q_position[qa]
+        gap_ms, gap_pct = self._gaps(qa, qb)
+
+        def side(rows: np.ndarray, ahead: np.ndarray, q_ahead: np.ndarray) -> Dict[str, Any]:
+            return {
+                "ahead": int(ahead.sum()),
+                "wins": int((self.r_position[rows] == 1).sum()),
+                "podiums": int(((self.r_position[rows] >= 1) & (self.r_position[rows] <= 3)).sum()),
+                "points": float(self.r_points[rows].sum()),
+                "qualifying_ahead": int(q_ahead.sum()),
+            }
+
+        years = np.union1d(self.r_year[ra], self.q_year[qa])
+        seasons = []
+        for year in years:
+            r_in = self.r_year[ra] == year
+            q_in = self.q_year[qa] == year
+            seasons.append({
+                "year": int(year),
+                "races": int(r_in.sum()),
+                driver_a: {"ahead": int(a_ahead[r_in].sum()), "qualifying_ahead": int(qa_ahead[q_in].sum()),
+                           "points": float(self.r_points[ra][r_in].sum())},
+                driver_b: {"ahead": int(b_ahead[r_in].sum()), "qualifying_ahead": int(qb_ahead[q_in].sum()),
+                           "points": float(self.r_points[rb][r_in].sum())},
+                "median_qualifying_gap_ms": self._median(gap_ms[q_in]),
+            })
+
+        return {
+            "driver_a": driver_a,
+            "driver_b": driver_b,
+            "teammates_only": teammates_only,
+            "races": int(len(ra)),
+            "both_started": int(both_started.sum()),
+            "qualifying_sessions": int(len(qa)),
+            driver_a: side(ra, a_ahead, qa_ahead),
+            driver_b: side(rb, b_ahead, qb_ahead),
+            # Positive: driver_b was slower
+            "median_qualifying_gap_ms": self._median(gap_ms),
+            "median_qualifying_gap_pct": self._median(gap_pct),
+            "seasons": seasons,
+        }
+
+    def qualifying_gap(self, driver_id: str) -> Optional[List[Dict[str, Any]]]:
+        """Qualifying gap to the team-mate(s), season by season (negative = faster)."""
+        code = self.driver_code(driver_id)
+        if code is None:
+            return None
+        mine, others = self._same_car(self._driver_rows(code, qualifying=True), qualifying=True)
+
+        # Gap of the driver relative to the team-mate
+        gap_ms, gap_pct = self._gaps(others, mine)
+        years = self.q_year[mine]
+        seasons = []
+        for year in np.unique(years):
+            sel = years == year
+            mates = np.unique(self.q_driver[others[sel]])
+            seasons.append({
+                "year": int(year),
+                "sessions": int(np.unique(self.q_race[mine[sel]]).size),
+                "ahead": int((self.q_position[mine[sel]] < self.q_position[others[sel]]).sum()),
+                "behind": int((self.q_position[mine[sel]] > self.q_position[others[sel]]).sum()),
+                "median_gap_ms": self._median(gap_ms[sel]),
+                "median_gap_pct": self._median(gap_pct[sel]),
+                "teammates": self.drivers.decode(mates),
+            })
+        return seasons
+
+    def aggregate(self, group_by: str = "driver", year_from: Optional[int] = None, year_to: Optional[int] = None,
+                  driver_id: Optional[str] = None, constructor_id: Optional[str] = None,
+                  grid_min: Optional[int] = None, grid_max: Optional[int] = None,
+                  order_by: str = "wins", limit: int = 20) -> Optional[Dict[str, Any]]:
+        """
+        Filter race results and aggregate them by driver, constructor or year,
+        e.g. "wins from outside the top 10 on the grid since 2000, by driver".
+        Returns None when a driver or constructor filter is unknown.
+        """
+        if driver_id is not None:
+            code = self.driver_code(driver_id)
+            if code is None:
+                return None
+            rows = np.arange(self.r_offsets[code], self.r_offsets[code + 1])
+        else:
+            lo = np.searchsorted(self.r_year_sorted, year_from if year_from is not None else 0, side="left")
+            hi = np.searchsorted(self.r_year_sorted, year_to if year_to is not None else 9999, side="right")
+            rows = self.r_by_year[lo:hi]
+
+        mask = np.ones(len(rows), dtype=bool)
+        if year_from is not None:
+            mask &= self.r_year[rows] >= year_from
+        if year_to is not None:
+            mask &= self.r_year[rows] <= year_to
+        if constructor_id is not None:
+            c = self.constructors.code(constructor_id)
+            if c is None:
+                return None
+            mask &= self.r_constructor[rows] == c
+        if grid_min is not None:
+            mask &= self.r_grid[rows] >= grid_min
+        if grid_max is not None:
+            mask &= (self.r_grid[rows] >= 1) & (self.r_grid[rows] <= grid_max)
+        rows = rows[mask]
+
+        if group_by == "driver":
+            groups, size = self.r_driver[rows], len(self.drivers)
+        elif group_by == "constructor":
+            groups, size = self.r_constructor[rows], len(self.constructors)
+        else:
+            groups, size = self.r_year[rows].astype(np.int64), int(self.race_year.max()) + 1
+
+        position = self.r_position[rows]
+        metrics = {
+            "entries": np.bincount(groups, minlength=size),
+            "starts": np.bincount(groups, weights=self.r_started[rows], minlength=size),
+            "wins": np.bincount(groups, weights=position == 1, minlength=size),
+            "podiums": np.bincount(groups, weights=(position >= 1) & (position <= 3), minlength=size),
+            "points": np.bincount(groups, weights=self.r_points[rows], minlength=size),
+            "poles": np.bincount(groups, weights=self.r_pole[rows], minlength=size),
+        }
+        present = np.nonzero(metrics["entries"])[0]
+        if group_by == "year":
+            top = present
+        else:
+            top = present[np.argsort(-metrics[order_by][present], kind="stable")][:limit]
+        labels = self.drivers.decode(top) if group_by == "driver" else (
+            self.constructors.decode(top) if group_by == "constructor" else [int(y) for y in top])
+
+        return {
+            "group_by": group_by,
+            "matched_results": int(len(rows)),
+            "groups": int(len(present)),
+            "rows": [
+                {group_by: label, **{m: round(float(v[g]), 2) if m == "points" else int(v[g]) for m, v in metrics.items()}}
+                for g, label in zip(top, labels)
+            ],
+        }
+
+
+_engine: Optional[ResultsEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> ResultsEngine:
+    """The process-wide engine, loaded from F1DB_DATA_DIR on first use."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = ResultsEngine(get_settings().F1DB_DATA_DIR)
+    return _engine
@@ -1,61 +1,16 @@
 import pandas as pd
 import numpy as np
 from app.core.fastf1_client import get_fastf1_session
-from typing import List, Dict, Any
+from app.core.session_errors import SessionUnavailableError
+from typing import List, Dict, Any, Optional
 import logging
-from app.db.supabase_client import get_supabase
+from app.services.artifact_cache import cache_scope, clean_data, get_cached_data, get_cached_many, set_cached_data, versioned_artifact
+from app.services.track_geometry_service import distance_to_indices, ensure_track_geometry
 import json
 
 logger = logging.getLogger(__name__)
 
 
-def get_cached_data(year: int, round: int, session_name: str, data_type: str):
-    try:
-        supabase = get_supabase()
-        response = supabase.table('fastf1_cache').select('data').eq('year', year).eq('round', round).eq('session_name', session_name).eq('data_type', data_type).execute()
-        if response.data and len(response.data) > 0:
-            return response.data[0]['data']
-    except Exception as e:
-        logger.error(f"Cache read error: {e}")
-    return None
-
-def set_cached_data(year: int, round: int, session_name: str, data_type: str, data: Any):
-    try:
-        supabase = get_supabase()
-        # Clean data before save
-        clean = clean_data(data)
-        supabase.table('fastf1_cache').upsert({
-            'year': year,
-            'round': round,
-            'session_name': session_name,
-            'data_type': data_type,
-            'data': clean
-        }, on_conflict='year, round, session_name, data_type').execute()
-    except Exception as e:
-        logger.error(f"Cache write error: {e}")
-
-
-def clean_data(val):
-    """Recursively clean NaNs/NaTs/Infs from data structures so they can be JSON serialized."""
-    if isinstance(val, dict):
-        return {k: clean_data(v) for k, v in val.items()}
-    elif isinstance(val, list):
-        return [clean_data(v) for v in val]
-    elif pd.isna(val) or val is pd.NaT:
-        return None
-    elif isinstance(val, float) and (np.isinf(val) or np.isnan(val)):
-        return None
-    elif isinstance(val, (pd.Timedelta)):
-        return val.total_seconds()
-    elif isinstance(val, (int, float, str, bool)):
-        return val
-    # Try to convert other formats
-    try:
-        return float(val) if 'float' in str(type(val)) else str(val)
-    except:
-        return str(val)
-
-
 def _timedelta_to_millis(value):
     if pd.isna(value) or value is pd.NaT:
         return None
@@ -129,6 +84,7 @@ def get_session_results_data(session) -> List[Dict[str, Any]]:
         logger.error(f"Error extracting session results: {e}")
         return []
 
+@versioned_artifact('stints', version=1)
 def get_stints(year: int, round: int, session_name: str, session=None) -> List[Dict[str, Any]]:
     """
     Get all tyre stints for a specific session.
@@ -182,10 +138,14 @@ def get_stints(year: int, round: int, session_name: str, session=None) -> List[D
         clean_res = clean_data(results)
         set_cached_data(year, round, session_name, 'stints', clean_res)
         return clean_res
+    except SessionUnavailableError:
+        # Routes turn this into 404/503; the load failure is already cached
+        raise
     except Exception as e:
         logger.error(f"Error in get_stints for {year} R{round} {session_name}: {e}")
         return []
 
+@versioned_artifact('all_laps', version=1)
 def get_all_laps(year: int, round: int, session_name: str, session=None) -> List[Dict[str, Any]]:
     """
     Get all laps for all drivers to plot on a Scatter chart (LapTime vs LapNumber).
@@ -230,10 +190,13 @@ def get_all_laps(year: int, round: int, session_name: str, session=None) -> List
         clean_res = clean_data(records)
         set_cached_data(year, round, session_name, 'all_laps', clean_res)
         return clean_res
+    except SessionUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error in get_all_laps for {year} R{round} {session_name}: {e}")
         return []
 
+@versioned_artifact('speed_traps', version=1)
 def get_speed_traps(year: int, round: int, session_name: str, session=None) -> List[Dict[str, Any]]:
     """
     Get the top speeds for all drivers in S1, S2, S3, and SpeedTrap.
@@ -279,84 +242,131 @@ def get_speed_traps(year: int, round: int, session_name: str, session=None) -> L
         clean_res = clean_data(results)
         set_cached_data(year, round, session_name, 'speed_traps', clean_res)
         return clean_res
+    except SessionUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error in get_speed_traps for {year} R{round} {session_name}: {e}")
         return []
 
-def get_minisectors(year: int, round: int, session_name: str, num_minisectors: int = 3, session=None) -> List[Dict[str, Any]]:
+def _empty_minisectors() -> Dict[str, Any]:
+    return {"track_layout": None, "segments": []}
+
+
+def _minisector_boundaries(total_distance: float, num_minisectors: int) -> np.ndarray:
+    """Evenly spaced distance boundaries: num_minisectors + 1 edges from 0 to the lap length."""
+    return np.linspace(0.0, total_distance, num_minisectors + 1)
+
+
+@versioned_artifact('minisectors', version=2)
+def get_minisectors(year: int, round: int, session_name: str, num_minisectors: int = 25, session=None) -> Dict[str, Any]:
     """
-    Get the fastest driver for S1, S2, and S3 track segments based on telemetry and best sectors.
-    Returns: list of 3 sectors with X, Y points and fastest driver abbreviation.
+    Split the lap into `num_minisectors` equal-distance segments and find the fastest
+    driver in each one, comparing every driver's fastest lap.
+    Returns: the circuit `track_layout` key and a list of segments with their index
+    range into that layout's shared geometry (see track_geometry_service), the fastest
+    driver, and each driver's time (ms) and average speed in the segment.
     """
-    cached = get_cached_data(year, round, session_name, 'minisectors')
-    if cached is not None:
+    num_minisectors = max(1, int(num_minisectors))
+    data_type = f'minisectors_{num_minisectors}'
+    cached = get_cached_data(year, round, session_name, data_type)
+    # Older entries were a bare list of segments with inline points
+    if isinstance(cached, dict):
         return cached
 
     try:
         session = session or get_fastf1_session(year, round, session_name)
         laps = session.laps
         if laps.empty:
-            return []
+            return _empty_minisectors()
 
-        # Find fastest driver per sector using get_best_sectors
-        best_sectors = get_best_sectors(year, round, session_name, session=session)
-        if not best_sectors:
-            return []
-            
-        valid_s1 = [d for d in best_sectors if d['s1'] is not None]
-        valid_s2 = [d for d in best_sectors if d['s2'] is not None]
-        valid_s3 = [d for d in best_sectors if d['s3'] is not None]
-        
-        fastest_s1 = min(valid_s1, key=lambda x: x['s1'])['driver'] if valid_s1 else 'Unknown'
-        fastest_s2 = min(valid_s2, key=lambda x: x['s2'])['driver'] if valid_s2 else 'Unknown'
-        fastest_s3 = min(valid_s3, key=lambda x: x['s3'])['driver'] if valid_s3 else 'Unknown'
-        
-        fastest_drivers_map = {1: fastest_s1, 2: fastest_s2, 3: fastest_s3}
-        
-        # Get track geometry from absolute fastest lap
+        # Track geometry and lap length come from the absolute fastest lap
         abs_fastest = laps.pick_fastest()
         if abs_fastest is None or pd.isna(abs_fastest.get('LapTime')):
-            return []
-            
+            return _empty_minisectors()
+
         ref_tel = abs_fastest.get_telemetry()
-        
-        s1_time = abs_fastest['Sector1SessionTime']
-        s2_time = abs_fastest['Sector2SessionTime']
-        
-        def assign_sector(t):
-            if pd.isna(s1_time) or t <= s1_time: return 1
-            if pd.isna(s2_time) or t <= s2_time: return 2
-            return 3
-            
-        ref_tel['Minisector'] = ref_tel['SessionTime'].apply(assign_sector)
-        
-        segments = []
-        for sector_id in [1, 2, 3]:
-            fastest_driver = fastest_drivers_map.get(sector_id)
-            if not fastest_driver or fastest_driver == 'Unknown':
+        ref_dist = ref_tel['Distance'].to_numpy(dtype=float)
+        total_distance = float(np.nanmax(ref_dist))
+        if not total_distance > 0:
+            return _empty_minisectors()
+        geometry = ensure_track_geometry(session, ref_tel)
+        boundaries = _minisector_boundaries(total_distance, num_minisectors)
+
+        drivers = []
+        seg_times = []
+        seg_speeds = []
+        for drv in pd.unique(laps['Driver']):
+            fastest_lap = laps.pick_drivers(drv).pick_fastest()
+            if fastest_lap is None or pd.isna(fastest_lap.get('LapTime')):
                 continue
-                
-            ms_tel = ref_tel[ref_tel['Minisector'] == sector_id]
-            if ms_tel.empty:
+            try:
+                tel = fastest_lap.get_telemetry()
+            except Exception as e:
+                logger.warning(f"Could not load telemetry for {drv}: {e}")
                 continue
-                
-            # Convert X,Y to points array
-            points = ms_tel[['X', 'Y']].values.tolist()
-            
+
+            dist = tel['Distance'].to_numpy(dtype=float)
+            time_s = tel['Time'].dt.total_seconds().to_numpy(dtype=float)
+            speed = tel['Speed'].to_numpy(dtype=float)
+            valid = ~(np.isnan(dist) | np.isnan(time_s))
+            if valid.sum() < 2 or not np.nanmax(dist) > 0:
+                continue
+            dist, time_s, speed = dist[valid], time_s[valid], speed[valid]
+
+            # Integrated distance drifts ~1% between drivers; scale onto the reference lap
+            dist = dist * (total_distance / dist.max())
+
+            # Segment time = time at the exit boundary - time at the entry boundary
+            seg_times.append(np.diff(np.interp(boundaries, dist, time_s)))
+
+            # Average speed per segment: bin samples by distance, skipping NaN speeds
+            seg_idx = np.clip(np.digitize(dist, boundaries[1:-1]), 0, num_minisectors - 1)
+            has_speed = ~np.isnan(speed)
+            counts = np.bincount(seg_idx[has_speed], minlength=num_minisectors)
+            sums = np.bincount(seg_idx[has_speed], weights=speed[has_speed], minlength=num_minisectors)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                seg_speeds.append(np.where(counts > 0, sums / counts, np.nan))
+            drivers.append(str(drv))
+
+        if not drivers:
+            return _empty_minisectors()
+
+        times = np.vstack(seg_times)    # drivers x minisectors
+        speeds = np.vstack(seg_speeds)
+        times[times <= 0] = np.nan
+        has_time = ~np.all(np.isnan(times), axis=0)
+        fastest_idx = np.nanargmin(np.where(has_time, times, np.inf), axis=0)
+
+        # Index ranges into the shared layout polyline; segments share their end points
+        cuts = distance_to_indices(geometry, boundaries / total_distance)
+
+        segments = []
+        for k in range(num_minisectors):
+            if not has_time[k]:
+                continue
+
             segments.append({
-                "minisector": int(sector_id),
-                "fastest_driver": str(fastest_driver),
-                "points": points
+                "minisector": k + 1,
+                "start_distance": float(boundaries[k]),
+                "end_distance": float(boundaries[k + 1]),
+                "start_index": int(cuts[k]),
+                "end_index": int(cuts[k + 1]),
+                "fastest_driver": drivers[fastest_idx[k]],
+                "times": {drv: (int(np.rint(times[i, k] * 1000)) if not np.isnan(times[i, k]) else None) for i, drv in enumerate(drivers)},
+                "avg_speeds": {drv: (float(speeds[i, k]) if not np.isnan(speeds[i, k]) else None) for i, drv in enumerate(drivers)},
             })
-            
-        clean_res = clean_data(segments)
-        set_cached_data(year, round, session_name, 'minisectors', clean_res)
+
+        clean_res = clean_data({"track_layout": geometry["layout"], "segments": segments})
+        set_cached_data(year, round, session_name, data_type, clean_res)
         return clean_res
-        
+
+    except SessionUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error in get_minisectors for {year} R{round} {session_name}: {e}")
-        return []
+        return _empty_minisectors()
 
+@versioned_artifact('best_sectors', version=1)
 def get_best_sectors(year: int, round_num: int, session_name: str, session=None) -> List[Dict[str, Any]]:
     """
     Get the fastest driver for each sector and judge personal performance.
@@ -418,49 +428,222 @@ def get_best_sectors(year: int, round_num: int, session_name: str, session=None)
         clean_res = clean_data(results)
         set_cached_data(year, round_num, session_name, 'best_sectors', clean_res)
         return clean_res
+    except SessionUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error in get_best_sectors for {year} R{round_num} {session_name}: {e}")
         return []
 
-def get_fastf1_summary_data(year: int, round_num: int, session_name: str) -> Dict[str, Any]:
+# FastF1 track status codes (session.track_status['Status'])
+TRACK_STATUS_LABELS = {
+    "1": "green",
+    "2": "yellow",
+    "4": "safety_car",
+    "5": "red_flag",
+    "6": "vsc",
+    "7": "vsc_ending",
+}
+# Statuses that neutralise the session, reported as safety car periods
+NEUTRALISED_STATUSES = {"4": "SC", "5": "RED", "6": "VSC", "7": "VSC"}
+
+WEATHER_CHANNELS = ['AirTemp', 'TrackTemp', 'Humidity', 'Pressure', 'WindSpeed', 'WindDirection']
+
+
+def _resample_weather(weather: pd.DataFrame, interval_s: int) -> Dict[str, List]:
+    """Resample the (roughly once a minute) weather feed onto a fixed interval, in session seconds."""
+    if weather is None or weather.empty:
+        return {"time": []}
+
+    frame = weather.set_index('Time')
+    channels = [c for c in WEATHER_CHANNELS if c in frame]
+    resampled = frame[channels].astype(float).resample(f"{interval_s}s").mean()
+    if 'Rainfall' in frame:
+        # Any rain within the interval counts
+        resampled['Rainfall'] = frame['Rainfall'].astype(bool).resample(f"{interval_s}s").max()
+    resampled = resampled.dropna(how='all')
+
+    series = {"time": resampled.index.total_seconds().tolist()}
+    for column in resampled.columns:
+        series[column] = resampled[column].round(2).tolist()
+    return series
+
+
+def _status_intervals(track_status: pd.DataFrame, session_end: Optional[float]) -> List[Dict[str, Any]]:
+    """Turn track status changes into [start, end) intervals in session seconds."""
+    if track_status is None or track_status.empty:
+        return []
+
+    starts = track_status['Time'].dt.total_seconds().tolist()
+    ends = starts[1:] + [session_end]
+    intervals = []
+    for (_, row), start, end in zip(track_status.iterrows(), starts, ends):
+        status = str(row['Status'])
+        intervals.append({
+            "status": status,
+            "label": TRACK_STATUS_LABELS.get(status, "unknown"),
+            "message": row.get('Message'),
+            "start": start,
+            "end": end,
+        })
+    return intervals
+
+
+def _safety_car_periods(intervals: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Merge consecutive neutralised intervals of the same kind (e.g. VSC -> VSC ending)."""
+    periods = []
+    for interval in intervals:
+        kind = NEUTRALISED_STATUSES.get(interval["status"])
+        if kind is None:
+            continue
+        if periods and periods[-1]["type"] == kind and periods[-1]["end"] == interval["start"]:
+            periods[-1]["end"] = interval["end"]
+        else:
+            periods.append({"type": kind, "start": interval["start"], "end": interval["end"]})
+    return periods
+
+
+def _race_control_messages(session) -> List[Dict[str, Any]]:
+    messages = getattr(session, 'race_control_messages', None)
+    if messages is None or messages.empty:
+        return []
+
+    t0 = getattr(session, 't0_date', None)
+    result = []
+    for _, msg in messages.iterrows():
+        utc = msg.get('Time')
+        result.append({
+            "utc": utc.isoformat() if pd.notna(utc) else None,
+            "session_time": (utc - t0).total_seconds() if pd.notna(utc) and t0 is not None and pd.notna(t0) else None,
+            "lap": msg.get('Lap'),
+            "category": msg.get('Category'),
+            "flag": msg.get('Flag'),
+            "scope": msg.get('Scope'),
+            "sector": msg.get('Sector'),
+            "driver_number": msg.get('RacingNumber'),
+            "message": msg.get('Message'),
+        })
+    return result
+
+
+@versioned_artifact('conditions', version=1)
+def get_conditions(year: int, round_num: int, session_name: str, interval_s: int = 60, session=None) -> Dict[str, Any]:
     """
-    Unified method to load FastF1 session ONCE, and calculate all 4 widget data sets.
+    Weather, track status and race control for a session.
+    - weather: channels resampled to `interval_s` (times in session seconds)
+    - track_status: every status change as an interval
+    - safety_car: SC / VSC / red flag periods
+    - race_control: race control messages
     """
+    data_type = 'conditions' if interval_s == 60 else f'conditions_{interval_s}'
+    cached = get_cached_data(year, round_num, session_name, data_type)
+    if cached is not None:
+        return cached
+
     try:
-        # Load exactly once
-        session = get_fastf1_session(year, round_num, session_name)
-        
-        # Calculate with the same session
-        laps = get_all_laps(year, round_num, session_name, session=session)
-        stints = get_stints(year, round_num, session_name, session=session)
-        speeds = get_speed_traps(year, round_num, session_name, session=session)
-        minis = get_minisectors(year, round_num, session_name, session=session)
-        best = get_best_sectors(year, round_num, session_name, session=session)
-        session_info = get_session_info(session, year, round_num, session_name)
-        results = get_session_results_data(session)
-
-        return {
-            "session_info": session_info,
-            "results": results,
-            "laps": laps,
-            "stints": stints,
-            "speed_traps": speeds,
-            "minisectors": minis,
-            "best_sectors": best
-        }
+        session = session or get_fastf1_session(year, round_num, session_name)
+
+        weather = getattr(session, 'weather_data', None)
+        # The last status interval runs until the end of the recorded data
+        ends = []
+        if not session.laps.empty and session.laps['Time'].notna().any():
+            ends.append(session.laps['Time'].max().total_seconds())
+        if weather is not None and not weather.empty:
+            ends.append(weather['Time'].max().total_seconds())
+        session_end = max(ends) if ends else None
+
+        intervals = _status_intervals(getattr(session, 'track_status', None), session_end)
+
+        clean_res = clean_data({
+            "interval_s": interval_s,
+            "weather": _resample_weather(weather, interval_s),
+            "track_status": intervals,
+            "safety_car": _safety_car_periods(intervals),
+            "race_control": _race_control_messages(session),
+        })
+        set_cached_data(year, round_num, session_name, data_type, clean_res)
+        return clean_res
+    except SessionUnavailableError:
+        raise
     except Exception as e:
-        logger.error(f"Error generating fastf1 summary for {year} R{round_num} {session_name}: {e}")
-        return {
-            "session_info": {
-                "year": year,
-                "round": round_num,
-                "session_name": session_name,
-            },
-            "results": [],
-            "laps": [],
-            "stints": [],
-            "speed_traps": [],
-            "minisectors": [],
-            "best_sectors": []
-        }
+        logger.error(f"Error in get_conditions for {year} R{round_num} {session_name}: {e}")
+        return _empty_conditions(interval_s)
+
+
+def _empty_conditions(interval_s: int = 60) -> Dict[str, Any]:
+    return {"interval_s": interval_s, "weather": {"time": []}, "track_status": [], "safety_car": [], "race_control": []}
+
+@versioned_artifact('session_info', version=1)
+def _session_info_artifact(year: int, round_num: int, session_name: str, session) -> Dict[str, Any]:
+    info = clean_data(get_session_info(session, year, round_num, session_name))
+    set_cached_data(year, round_num, session_name, 'session_info', info)
+    return info
+
 
+@versioned_artifact('session_results', version=1)
+def _session_results_artifact(year: int, round_num: int, session_name: str, session) -> List[Dict[str, Any]]:
+    results = clean_data(get_session_results_data(session))
+    set_cached_data(year, round_num, session_name, 'session_results', results)
+    return results
+
+
+# Summary key -> (fastf1_cache data_type, compute from a loaded session, empty value)
+_SUMMARY_ARTIFACTS = {
+    "session_info": ('session_info', _session_info_artifact, dict),
+    "results": ('session_results', _session_results_artifact, list),
+    "laps": ('all_laps', lambda y, r, s, session: get_all_laps(y, r, s, session=session), list),
+    "stints": ('stints', lambda y, r, s, session: get_stints(y, r, s, session=session), list),
+    "speed_traps": ('speed_traps', lambda y, r, s, session: get_speed_traps(y, r, s, session=session), list),
+    "minisectors": ('minisectors_25', lambda y, r, s, session: get_minisectors(y, r, s, 25, session=session), _empty_minisectors),
+    "best_sectors": ('best_sectors', lambda y, r, s, session: get_best_sectors(y, r, s, session=session), list),
+    "conditions": ('conditions', lambda y, r, s, session: get_conditions(y, r, s, session=session), _empty_conditions),
+}
+
+
+def get_fastf1_summary_data(year: int, round_num: int, session_name: str) -> Dict[str, Any]:
+    """
+    All widget data sets of a session (session info, results, laps, stints, speed
+    traps, minisectors, best sectors and conditions) in one response.
+
+    Every artifact is looked up in fastf1_cache with a single query. The FastF1
+    session is only loaded when at least one is missing, and then only the
+    missing artifacts are computed (and cached) from it.
+    """
+    data_types = [data_type for data_type, _, _ in _SUMMARY_ARTIFACTS.values()]
+    cached = get_cached_many(year, round_num, session_name, data_types)
+
+    artifacts: Dict[str, Any] = {}
+    for key, (data_type, _, _) in _SUMMARY_ARTIFACTS.items():
+        value = cached.get(data_type)
+        # Older minisector entries were a bare list of segments with inline points
+        if value is not None and not (key == "minisectors" and not isinstance(value, dict)):
+            artifacts[key] = value
+
+    missing = [key for key in _SUMMARY_ARTIFACTS if key not in artifacts]
+    if missing:
+        logger.info(f"Summary {year} R{round_num} {session_name}: computing {', '.join(missing)}")
+        try:
+            # Load exactly once for everything that is missing. Inside the scope the
+            # widget functions see the lookup above instead of querying again, and
+            # their results are written back in a single upsert.
+            session = get_fastf1_session(year, round_num, session_name)
+            with cache_scope(year, round_num, session_name, cached, data_types):
+                for key in missing:
+                    _, compute, _ = _SUMMARY_ARTIFACTS[key]
+                    artifacts[key] = compute(year, round_num, session_name, session)
+        except SessionUnavailableError:
+            if not artifacts:
+                raise
+            logger.warning(f"Summary {year} R{round_num} {session_name}: session unavailable, serving cached artifacts only")
+            for key in missing:
+                artifacts.setdefault(key, _SUMMARY_ARTIFACTS[key][2]())
+        except Exception as e:
+            logger.error(f"Error generating fastf1 summary for {year} R{round_num} {session_name}: {e}")
+            for key in missing:
+                artifacts.setdefault(key, _SUMMARY_ARTIFACTS[key][2]())
+            if not artifacts["session_info"]:
+                artifacts["session_info"] = {"year": year, "round": round_num, "session_name": session_name}
+
+    minis = artifacts.pop("minisectors")
+    artifacts["minisectors"] = minis["segments"]
+    artifacts["track_layout"] = minis["track_layout"]
+    return artifacts
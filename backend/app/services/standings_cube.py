@@ -0,0 +1,163 @@
+"""
+Precomputed championship standings after every round of every season.
+
+`driver_standings` / `constructor_standings` hold one row per (race, driver or
+constructor); a progression chart would need one query per round. Instead the
+F1DB CSVs they are loaded from are turned, once per process, into a cube per
+championship:
+
+- one season is a dense (rounds x entries) block of float32 points and int16
+  positions (0 = not classified yet), entries ordered by final position
+- all blocks live back to back in two flat arrays, with per-season offsets,
+  so serving a season is a reshape of a slice
+
+Points of a round where an entry is not listed carry over from the previous
+round (F1DB only lists entries that have scored).
+"""
+
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+STANDINGS_CSV = {
+    "drivers": ("f1db-races-driver-standings.csv", "driverid"),
+    "constructors": ("f1db-races-constructor-standings.csv", "constructorid"),
+}
+RACES_CSV = "f1db-races.csv"
+
+
+class _Championship:
+    """Every season of one championship, stored as flat arrays with offsets."""
+
+    def __init__(self, df: pd.DataFrame, id_column: str, grand_prix: Dict[int, str]):
+        df = df.sort_values(["year", "round"])
+        self.ids = np.unique(df[id_column].astype(str))
+        codes = np.searchsorted(self.ids, df[id_column].astype(str)).astype(np.int32)
+        years = df["year"].to_numpy()
+        rounds = df["round"].to_numpy()
+        race_ids = df["raceid"].to_numpy()
+        positions = pd.to_numeric(df["positionnumber"], errors="coerce").fillna(0).to_numpy(np.int16)
+        points = pd.to_numeric(df["points"], errors="coerce").fillna(0).to_numpy(np.float32)
+
+        self.years = np.unique(years).astype(np.int16)
+        bounds = np.searchsorted(years, np.r_[self.years, self.years[-1] + 1])
+
+        season_rounds, season_gps, season_entries, cell_points, cell_positions = [], [], [], [], []
+        self.round_offsets = np.zeros(len(self.years) + 1, dtype=np.int64)
+        self.entry_offsets = np.zeros(len(self.years) + 1, dtype=np.int64)
+        self.cell_offsets = np.zeros(len(self.years) + 1, dtype=np.int64)
+
+        for s in range(len(self.years)):
+            rows = slice(bounds[s], bounds[s + 1])
+            round_values, round_idx = np.unique(rounds[rows], return_inverse=True)
+            entries, entry_idx = np.unique(codes[rows], return_inverse=True)
+            n_rounds, n_entries = len(round_values), len(entries)
+
+            # Several rows per entry and round (constructors with more than one
+            # engine): keep the best place, add up the points
+            cell = (round_idx, entry_idx)
+            listed = np.zeros((n_rounds, n_entries), dtype=bool)
+            listed[cell] = True
+            pts = np.zeros((n_rounds, n_entries), dtype=np.float32)
+            np.add.at(pts, cell, points[rows])
+            unranked = np.iinfo(np.int16).max
+            pos = np.full((n_rounds, n_entries), unranked, dtype=np.int16)
+            np.minimum.at(pos, cell, np.where(positions[rows] > 0, positions[rows], unranked))
+            pos[pos == unranked] = 0
+
+            # Carry points forward over rounds where an entry is not listed
+            last_listed = np.maximum.accumulate(np.where(listed, np.arange(n_rounds)[:, None], -1), axis=0)
+            pts = np.where(last_listed >= 0, pts[np.maximum(last_listed, 0), np.arange(n_entries)], 0)
+
+            # Entries ordered by final position, unclassified ones last
+            final = pos[-1].astype(np.int32)
+            order = np.lexsort((-pts[-1], np.where(final > 0, final, np.iinfo(np.int32).max)))
+
+            season_race_ids = np.zeros(n_rounds, dtype=np.int64)
+            season_race_ids[round_idx] = race_ids[rows]
+            season_rounds.append(round_values.astype(np.int16))
+            season_gps.extend(grand_prix.get(int(r)) for r in season_race_ids)
+            season_entries.append(entries[order])
+            cell_points.append(pts[:, order].astype(np.float32).ravel())
+            cell_positions.append(pos[:, order].ravel())
+            self.round_offsets[s + 1] = self.round_offsets[s] + n_rounds
+            self.entry_offsets[s + 1] = self.entry_offsets[s] + n_entries
+            self.cell_offsets[s + 1] = self.cell_offsets[s] + n_rounds * n_entries
+
+        self.rounds = np.concatenate(season_rounds)
+        self.grand_prix_ids = season_gps
+        self.entries = np.concatenate(season_entries).astype(np.int32)
+        self.points = np.concatenate(cell_points)
+        self.positions = np.concatenate(cell_positions)
+
+    def season(self, year: int) -> Optional[Dict[str, Any]]:
+        s = int(np.searchsorted(self.years, year))
+        if s >= len(self.years) or self.years[s] != year:
+            return None
+        r0, r1 = self.round_offsets[s], self.round_offsets[s + 1]
+        e0, e1 = self.entry_offsets[s], self.entry_offsets[s + 1]
+        c0, c1 = self.cell_offsets[s], self.cell_offsets[s + 1]
+        n_rounds, n_entries = r1 - r0, e1 - e0
+        # Stored (rounds x entries); served as one series per entry
+        points = self.points[c0:c1].reshape(n_rounds, n_entries).T.astype(np.float64).round(2)
+        positions = self.positions[c0:c1].reshape(n_rounds, n_entries).T
+        return {
+            "rounds": self.rounds[r0:r1].tolist(),
+            "grand_prix_ids": self.grand_prix_ids[r0:r1],
+            "ids": self.ids[self.entries[e0:e1]].tolist(),
+            "points": points.tolist(),
+            "positions": [[p or None for p in series] for series in positions.tolist()],
+        }
+
+
+class StandingsCube:
+    """Driver and constructor championship progressions for every season."""
+
+    def __init__(self, data_dir: str):
+        races = pd.read_csv(os.path.join(data_dir, RACES_CSV), usecols=["id", "year", "grandPrixId"])
+        grand_prix = dict(zip(races["id"].astype(int), races["grandPrixId"].astype(str)))
+        self.scheduled_rounds = races.groupby("year").size().to_dict()
+
+        self.championships: Dict[str, _Championship] = {}
+        for kind, (csv_file, id_column) in STANDINGS_CSV.items():
+            df = pd.read_csv(os.path.join(data_dir, csv_file), low_memory=False)
+            df.columns = [c.lower() for c in df.columns]
+            self.championships[kind] = _Championship(df, id_column, grand_prix)
+        logger.info("Standings cube: " + ", ".join(
+            f"{kind} {len(c.years)} seasons / {c.points.nbytes + c.positions.nbytes} bytes"
+            for kind, c in self.championships.items()
+        ))
+
+    def progression(self, year: int, kind: str = "drivers") -> Optional[Dict[str, Any]]:
+        """Standings after every completed round of a season, or None if there are none."""
+        season = self.championships[kind].season(year)
+        if season is None:
+            return None
+        return {
+            "year": year,
+            "type": kind,
+            "scheduled_rounds": int(self.scheduled_rounds.get(year, len(season["rounds"]))),
+            **season,
+        }
+
+
+_cube: Optional[StandingsCube] = None
+_cube_lock = threading.Lock()
+
+
+def get_cube() -> StandingsCube:
+    """The process-wide cube, built from F1DB_DATA_DIR on first use."""
+    global _cube
+    if _cube is None:
+        with _cube_lock:
+            if _cube is None:
+                _cube = StandingsCube(get_settings().F1DB_DATA_DIR)
+    return _cube
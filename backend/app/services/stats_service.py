@@ -0,0 +1,45 @@
+"""
+Service layer for career and season statistics.
+Reads the summary tables written by materialize_stats.py
+(sql_scripts/08_career_stats.sql): every request is a primary-key lookup,
+however many races the driver or constructor took part in.
+"""
+
+from app.db.supabase_client import get_supabase
+
+_TABLES = {
+    "driver": ("driver_career_stats", "driver_season_stats", "driver_id"),
+    "constructor": ("constructor_career_stats", "constructor_season_stats", "constructor_id"),
+}
+
+
+def _get_stats(entity: str, entity_id: str, year: int | None) -> dict | None:
+    career_table, season_table, id_column = _TABLES[entity]
+    sb = get_supabase()
+
+    career = (
+        sb.table(career_table)
+        .select("*")
+        .eq(id_column, entity_id)
+        .limit(1)
+        .execute()
+    )
+    if not career.data:
+        return None
+
+    query = sb.table(season_table).select("*").eq(id_column, entity_id)
+    if year:
+        query = query.eq("year", year)
+    seasons = query.order("year").execute()
+
+    return {id_column: entity_id, "career": career.data[0], "seasons": seasons.data}
+
+
+def get_driver_stats(driver_id: str, year: int | None = None) -> dict | None:
+    """Career totals and per-season statistics of a driver, or None if none were materialized."""
+    return _get_stats("driver", driver_id, year)
+
+
+def get_constructor_stats(constructor_id: str, year: int | None = None) -> dict | None:
+    """Career totals and per-season statistics of a constructor, or None if none were materialized."""
+    return _get_stats("constructor", constructor_id, year)
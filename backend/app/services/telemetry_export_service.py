@@ -0,0 +1,186 @@
+"""
+Streaming export of a whole session's telemetry, all laps of all drivers.
+
+Drivers are merged one at a time (see telemetry_index.build_driver_telemetry)
+and written out as soon as they are ready, so memory stays bounded by a single
+driver's telemetry regardless of session length. Two formats are supported:
+
+- csv.gz: one gzip stream, CSV header written once
+- parquet: one row group per driver (requires the optional `pyarrow` package)
+"""
+
+import logging
+import zlib
+from typing import Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.core.fastf1_client import get_fastf1_session
+from app.services.telemetry_index import build_driver_telemetry
+
+logger = logging.getLogger(__name__)
+
+# Always present in every row
+KEY_COLUMNS = ["Driver", "LapNumber", "SessionTime"]
+# Selectable with channels=
+EXPORT_CHANNELS = ["Distance", "Speed", "RPM", "Gear", "Throttle", "Brake", "X", "Y", "Z"]
+EXPORT_FORMATS = ("parquet", "csv.gz")
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def parse_selection(value: Optional[str], allowed: Optional[List[str]] = None) -> Optional[List[str]]:
+    """'VER, LEC' -> ['VER', 'LEC']; None/empty -> None (everything)."""
+    if not value:
+        return None
+    selected = list(dict.fromkeys(v.strip() for v in value.split(",") if v.strip()))
+    if allowed is not None:
+        unknown = [v for v in selected if v not in allowed]
+        if unknown:
+            raise ValueError(f"Unknown channels: {', '.join(unknown)}. Available: {', '.join(allowed)}")
+    return selected or None
+
+
+def _driver_frame(session, driver_id: str, channels: List[str]) -> Optional[pd.DataFrame]:
+    entry = build_driver_telemetry(session, driver_id)
+    if entry is None:
+        return None
+
+    columns = entry["columns"]
+    n = len(columns["Time"])
+    # Lap of every sample; laps are contiguous in the merged telemetry
+    lap_pos = np.clip(np.searchsorted(entry["starts"], np.arange(n), side="right") - 1, 0, None)
+
+    frame = pd.DataFrame({
+        "Driver": driver_id,
+        "LapNumber": entry["lap_numbers"][lap_pos],
+        "SessionTime": columns["Time"],
+    })
+    for name in channels:
+        values = columns[name]
+        if name == "Distance":
+            # Lap-relative, like the lap telemetry endpoint
+            values = values - values[entry["starts"][lap_pos].clip(max=n - 1)]
+        frame[name] = values
+    return frame
+
+
+def _frames(session, drivers: List[str], channels: List[str]) -> Iterator[pd.DataFrame]:
+    for driver_id in drivers:
+        try:
+            frame = _driver_frame(session, driver_id, channels)
+        except Exception as e:
+            logger.error(f"Telemetry export failed for {driver_id}: {e}")
+            continue
+        if frame is not None and not frame.empty:
+            yield frame
+
+
+def _stream_csv_gz(frames: Iterator[pd.DataFrame], columns: List[str]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    header = True
+    for frame in frames:
+        chunk = compressor.compress(frame.to_csv(index=False, header=header).encode())
+        header = False
+        if chunk:
+            yield chunk
+    if header:
+        # No driver produced telemetry: still a valid CSV, header only
+        yield compressor.compress((",".join(columns) + "\n").encode())
+    yield compressor.flush()
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to the generator."""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _parquet_schema(columns: List[str]):
+    """Column types of _driver_frame: integer lap numbers, float time and channels."""
+    import pyarrow as pa
+
+    types = {"Driver": pa.string(), "LapNumber": pa.int64()}
+    return pa.schema([pa.field(c, types.get(c, pa.float64())) for c in columns])
+
+
+def _stream_parquet(frames: Iterator[pd.DataFrame], columns: List[str]) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # One schema for every row group and for the empty file
+    schema = _parquet_schema(columns)
+    sink = _ChunkSink()
+    writer = None
+    for frame in frames:
+        table = pa.Table.from_pandas(frame, schema=schema, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(sink, table.schema, compression="zstd")
+        writer.write_table(table)
+        data = sink.drain()
+        if data:
+            yield data
+    if writer is None:
+        # No driver produced telemetry: write a valid file with no rows
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+        writer.write_table(schema.empty_table())
+    writer.close()
+    yield sink.drain()
+
+
+def export_session_telemetry(year: int, round: int, session_name: str, fmt: str,
+                             drivers: Optional[List[str]] = None,
+                             channels: Optional[List[str]] = None) -> Iterator[bytes]:
+    """
+    Load the session and return a generator of encoded chunks.
+    Loading happens here, before the first chunk, so failures surface as normal
+    errors rather than a truncated download. Raises LookupError when none of the
+    requested drivers took part in the session.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format {fmt}")
+    if fmt == "parquet" and not parquet_available():
+        raise RuntimeError("Parquet export requires pyarrow; use telemetry.csv.gz instead")
+
+    session = get_fastf1_session(year, round, session_name)
+    available = [str(d) for d in pd.unique(session.laps['Driver'])]
+    if drivers:
+        drivers = [d for d in drivers if d in available]
+        if not drivers:
+            raise LookupError("None of the requested drivers took part in this session")
+    else:
+        drivers = available
+    channels = channels or EXPORT_CHANNELS
+
+    frames = _frames(session, drivers, channels)
+    columns = KEY_COLUMNS + channels
+    return _stream_parquet(frames, columns) if fmt == "parquet" else _stream_csv_gz(frames, columns)
@@ -0,0 +1,145 @@
+"""
+Per-session telemetry index.
+
+FastF1 merges car and position data every time `Lap.get_telemetry()` is called.
+The index does that merge once per driver, over all of the driver's laps, and
+keeps the result as contiguous NumPy columns together with the start/stop
+offset of every lap. Fetching the telemetry of any lap (or lap range) is then a
+slice of those columns.
+
+An index is attached to the loaded session it was built from (weakly, so it
+is dropped together with the session when fastf1_client evicts it) and is
+filled lazily, one driver at a time, the first time that driver is requested.
+"""
+
+import logging
+import threading
+import weakref
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Channels stored per driver, in response order (Time and Distance are made lap-relative when sliced)
+INDEX_CHANNELS = ["Time", "Distance", "Speed", "RPM", "Gear", "Throttle", "Brake", "X", "Y", "Z"]
+
+
+def _seconds(series: pd.Series) -> np.ndarray:
+    return series.dt.total_seconds().to_numpy(dtype=float)
+
+
+def build_driver_telemetry(session, driver_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Merge the telemetry of all of a driver's laps once.
+    Returns the columns, the lap numbers and each lap's [start, stop) row offsets.
+    """
+    driver_laps = session.laps.pick_drivers(driver_id)
+    driver_laps = driver_laps[driver_laps['LapStartTime'].notna() & driver_laps['Time'].notna()]
+    if driver_laps.empty:
+        return None
+
+    telemetry = driver_laps.get_telemetry()
+    gear_col = 'nGear' if 'nGear' in telemetry else 'Gear'
+
+    session_time = _seconds(telemetry['SessionTime'])
+    columns = {
+        "Time": session_time,
+        "Distance": telemetry['Distance'].to_numpy(dtype=float),
+        "Gear": telemetry[gear_col].to_numpy(dtype=float),
+        "Brake": telemetry['Brake'].to_numpy(dtype=float),
+    }
+    for name in ("Speed", "RPM", "Throttle", "X", "Y", "Z"):
+        columns[name] = telemetry[name].to_numpy(dtype=float)
+
+    # Laps are sorted in time, so their boundaries are two binary searches
+    lap_start = _seconds(driver_laps['LapStartTime'])
+    lap_end = _seconds(driver_laps['Time'])
+    starts = np.searchsorted(session_time, lap_start, side="left")
+    stops = np.searchsorted(session_time, lap_end, side="right")
+
+    return {
+        "columns": columns,
+        "lap_numbers": driver_laps['LapNumber'].to_numpy(dtype=int),
+        "lap_start": lap_start,
+        "starts": starts,
+        "stops": stops,
+        "laps": driver_laps,
+    }
+
+
+class SessionTelemetryIndex:
+    """Lazily built per-driver telemetry columns of one loaded session."""
+
+    def __init__(self, session):
+        # Weak: the index must not keep an evicted session in memory
+        self._session = weakref.ref(session)
+        self._drivers: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._building: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        session = self._session()
+        if session is None:
+            raise RuntimeError("The indexed session is no longer loaded")
+        return session
+
+    def driver(self, driver_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if driver_id in self._drivers:
+                return self._drivers[driver_id]
+            build_lock = self._building.setdefault(driver_id, threading.Lock())
+
+        # One build per driver; requests for other drivers are not held up
+        with build_lock:
+            with self._lock:
+                if driver_id in self._drivers:
+                    return self._drivers[driver_id]
+            try:
+                logger.info(f"Indexing telemetry for {driver_id}")
+                entry = build_driver_telemetry(self.session, driver_id)
+                with self._lock:
+                    self._drivers[driver_id] = entry
+                return entry
+            finally:
+                with self._lock:
+                    self._building.pop(driver_id, None)
+
+    def lap_range(self, driver_id: str, start: int, end: int) -> List[Dict[str, Any]]:
+        """Telemetry of laps start..end (inclusive) of a driver, one entry per lap."""
+        entry = self.driver(driver_id)
+        if entry is None:
+            return []
+
+        positions = np.flatnonzero((entry["lap_numbers"] >= start) & (entry["lap_numbers"] <= end))
+        columns = entry["columns"]
+        result = []
+        for pos in positions:
+            lo, hi = entry["starts"][pos], entry["stops"][pos]
+            telemetry = {name: columns[name][lo:hi] for name in INDEX_CHANNELS}
+            # Lap-relative time and distance, like Lap.get_telemetry()
+            telemetry["Time"] = telemetry["Time"] - entry["lap_start"][pos]
+            if hi > lo:
+                telemetry["Distance"] = telemetry["Distance"] - telemetry["Distance"][0]
+            result.append({
+                "lap_number": int(entry["lap_numbers"][pos]),
+                "lap": entry["laps"].iloc[pos],
+                "telemetry": telemetry,
+            })
+        return result
+
+
+# One index per loaded session, living exactly as long as the session itself
+_INDEXES: "weakref.WeakKeyDictionary[Any, SessionTelemetryIndex]" = weakref.WeakKeyDictionary()
+_INDEXES_LOCK = threading.Lock()
+
+
+def get_session_index(session) -> SessionTelemetryIndex:
+    """The telemetry index of a loaded session (from get_fastf1_session); keep the session referenced while using it."""
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(session)
+        if index is None:
+            index = _INDEXES[session] = SessionTelemetryIndex(session)
+        return index
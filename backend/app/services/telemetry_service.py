@@ -1,40 +1,136 @@
 import pandas as pd
 import numpy as np
 from app.core.fastf1_client import get_fastf1_session
-from app.services.session_service import clean_data
-from typing import List, Dict, Any
+from app.core.session_errors import SessionUnavailableError
+from app.services.artifact_cache import clean_data, get_cached_data, set_cached_data, versioned_artifact
+from app.services.telemetry_index import get_session_index
+from typing import List, Dict, Any, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
-def get_driver_telemetry(year: int, round: int, session_name: str, driver_id: str) -> Dict[str, Any]:
+# Spacing of the common distance grid used for comparisons (metres)
+COMPARE_STEP_M = 5.0
+
+# Channels resampled onto the comparison grid. Continuous channels are linearly
+# interpolated; discrete ones take the last sample at or before each grid point
+# so gear changes and brake application stay sharp.
+CONTINUOUS_CHANNELS = ["Speed", "RPM", "Throttle", "X", "Y"]
+DISCRETE_CHANNELS = ["Gear", "Brake"]
+
+# Downsampling levels of detail. Requested point counts are rounded up to one of
+# these, so arbitrary `points` values share a few cached variants per driver.
+LOD_LEVELS = [250, 500, 1000, 2000]
+
+
+def snap_points(points: Optional[int]) -> Optional[int]:
+    """The smallest level of detail holding `points`; None (full lap) above the top level."""
+    if not points:
+        return None
+    for level in LOD_LEVELS:
+        if points <= level:
+            return level
+    return None
+
+
+def downsample_indices(speed: np.ndarray, brake: np.ndarray, points: int) -> np.ndarray:
+    """
+    Pick about `points` sample indices of a lap for overview charts.
+
+    Min/max per bucket: the lap is split into points/2 equal buckets and the
+    slowest and fastest sample of each bucket are kept, so corner minimums and
+    straight-line maximums survive. Brake onsets (the first braking sample of
+    each braking zone) and the first/last samples are always kept, so the
+    result can be slightly larger than `points`.
+    """
+    n = len(speed)
+    if points >= n:
+        return np.arange(n)
+
+    buckets = max(1, points // 2)
+    size = int(np.ceil(n / buckets))
+    # Pad with the last value so the array reshapes into equal buckets;
+    # indices that land in the padding are clipped back to the last sample
+    padded = np.pad(np.nan_to_num(speed), (0, buckets * size - n), mode="edge").reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    lows = offsets + np.argmin(padded, axis=1)
+    highs = offsets + np.argmax(padded, axis=1)
+
+    braking = np.asarray(brake, dtype=bool)
+    onsets = np.flatnonzero(braking[1:] & ~braking[:-1]) + 1
+
+    keep = np.concatenate(([0, n - 1], lows, highs, onsets))
+    return np.unique(np.clip(keep, 0, n - 1))
+
+
+def _fastest_lap(session, driver_id: str):
+    laps = session.laps
+    if laps.empty:
+        return None
+
+    driver_laps = laps.pick_drivers(driver_id)
+    if driver_laps.empty:
+        return None
+
+    fastest_lap = driver_laps.pick_fastest()
+    if fastest_lap is None or pd.isna(fastest_lap.get('LapTime')):
+        return None
+    return fastest_lap
+
+
+def _lap_info(driver_id: str, lap) -> Dict[str, Any]:
+    return {
+        "Driver": driver_id,
+        "LapTime": lap['LapTime'].total_seconds(),
+        "Compound": lap['Compound'],
+        "TyreLife": lap['TyreLife'],
+        "Sector1Time": lap['Sector1Time'].total_seconds() if not pd.isna(lap['Sector1Time']) else None,
+        "Sector2Time": lap['Sector2Time'].total_seconds() if not pd.isna(lap['Sector2Time']) else None,
+        "Sector3Time": lap['Sector3Time'].total_seconds() if not pd.isna(lap['Sector3Time']) else None,
+    }
+
+
+@versioned_artifact('telemetry', version=1)
+def get_driver_telemetry(year: int, round: int, session_name: str, driver_id: str,
+                         points: Optional[int] = None, session=None) -> Dict[str, Any]:
     """
     Get telemetry for a driver's fastest lap in a session.
     Returns: Lap details + telemetry array (Time, Distance, Speed, RPM, Gear, Throttle, Brake, X, Y, Z)
+
+    With `points`, the trace is reduced to about that many samples (see
+    downsample_indices), rounded up to a level of detail (see snap_points);
+    each level is cached per session and driver.
     """
+    points = snap_points(points)
+    cache_key = f"telemetry_{driver_id}_{points}"
+    if points:
+        cached = get_cached_data(year, round, session_name, cache_key)
+        if cached:
+            return cached
+
     try:
-        session = get_fastf1_session(year, round, session_name)
-        laps = session.laps
-        
-        if laps.empty:
-            return {}
-            
-        driver_laps = laps.pick_drivers(driver_id)
-        if driver_laps.empty:
-            return {}
-            
-        fastest_lap = driver_laps.pick_fastest()
-        if fastest_lap is None or pd.isna(fastest_lap.get('LapTime')):
+        session = session or get_fastf1_session(year, round, session_name)
+
+        fastest_lap = _fastest_lap(session, driver_id)
+        if fastest_lap is None:
             return {}
-            
+
         telemetry = fastest_lap.get_telemetry()
-        
+
+        if points:
+            idx = downsample_indices(
+                telemetry['Speed'].to_numpy(dtype=float),
+                telemetry['Brake'].to_numpy(dtype=bool),
+                points,
+            )
+            telemetry = telemetry.iloc[idx]
+
         # Convert Timedelta to seconds for Time
         time_seconds = telemetry['Time'].dt.total_seconds().tolist()
-        
+
         # FastF1 uses 'nGear' instead of 'Gear' in newer versions
         gear_col = 'nGear' if 'nGear' in telemetry else 'Gear'
-        
+
         # Build the response dict
         telemetry_data = {
             "Time": time_seconds,
@@ -48,35 +144,144 @@ def get_driver_telemetry(year: int, round: int, session_name: str, driver_id: st
             "Y": telemetry['Y'].tolist(),
             "Z": telemetry['Z'].tolist(),
         }
-        
-        lap_info = {
-            "Driver": driver_id,
-            "LapTime": fastest_lap['LapTime'].total_seconds(),
-            "Compound": fastest_lap['Compound'],
-            "TyreLife": fastest_lap['TyreLife'],
-            "Sector1Time": fastest_lap['Sector1Time'].total_seconds() if not pd.isna(fastest_lap['Sector1Time']) else None,
-            "Sector2Time": fastest_lap['Sector2Time'].total_seconds() if not pd.isna(fastest_lap['Sector2Time']) else None,
-            "Sector3Time": fastest_lap['Sector3Time'].total_seconds() if not pd.isna(fastest_lap['Sector3Time']) else None,
-        }
-        
-        return clean_data({
-            "lap_info": lap_info,
+
+        result = clean_data({
+            "lap_info": _lap_info(driver_id, fastest_lap),
             "telemetry": telemetry_data
         })
-        
+        if points:
+            set_cached_data(year, round, session_name, cache_key, result)
+        return result
+
+    except SessionUnavailableError:
+        # Routes turn this into 404/503; the load failure is already cached
+        raise
     except Exception as e:
         logger.error(f"Error in get_driver_telemetry for {driver_id} at {year} R{round} {session_name}: {e}")
         return {}
 
 
-def compare_telemetry(year: int, round: int, session_name: str, driver_1: str, driver_2: str) -> Dict[str, Any]:
+def get_lap_telemetry(year: int, round: int, session_name: str, driver_id: str,
+                      start: int, end: Optional[int] = None, points: Optional[int] = None) -> Dict[str, Any]:
     """
-    Compare telemetry between two drivers' fastest laps.
+    Telemetry of any lap, or lap range start..end (inclusive), of a driver.
+    Served from the per-session telemetry index, so after the first request for
+    a driver every lap is a slice rather than a new FastF1 merge.
     """
-    t1 = get_driver_telemetry(year, round, session_name, driver_1)
-    t2 = get_driver_telemetry(year, round, session_name, driver_2)
-    
-    return {
-        driver_1: t1,
-        driver_2: t2
+    end = start if end is None else end
+    points = snap_points(points)
+    try:
+        session = get_fastf1_session(year, round, session_name)
+        index = get_session_index(session)
+        laps = []
+        for entry in index.lap_range(driver_id, start, end):
+            telemetry = entry["telemetry"]
+            if points:
+                idx = downsample_indices(telemetry["Speed"], telemetry["Brake"], points)
+                telemetry = {name: values[idx] for name, values in telemetry.items()}
+
+            laps.append({
+                "lap_number": entry["lap_number"],
+                "lap_info": _lap_info(driver_id, entry["lap"]),
+                "telemetry": {name: values.tolist() for name, values in telemetry.items()},
+            })
+
+        if not laps:
+            return {}
+        return clean_data({"driver": driver_id, "laps": laps})
+
+    except SessionUnavailableError:
+        raise
+    except Exception as e:
+        logger.error(f"Error in get_lap_telemetry for {driver_id} laps {start}-{end} at {year} R{round} {session_name}: {e}")
+        return {}
+
+
+def _lap_channels(lap) -> Dict[str, np.ndarray]:
+    """Raw channels of a lap as float arrays, with Distance forced to be non-decreasing."""
+    telemetry = lap.get_telemetry()
+    gear_col = 'nGear' if 'nGear' in telemetry else 'Gear'
+
+    channels = {
+        "Distance": np.maximum.accumulate(telemetry['Distance'].to_numpy(dtype=float)),
+        "Time": telemetry['Time'].dt.total_seconds().to_numpy(dtype=float),
+        "Gear": telemetry[gear_col].to_numpy(dtype=float),
+        "Brake": telemetry['Brake'].to_numpy(dtype=float),
     }
+    for name in CONTINUOUS_CHANNELS:
+        channels[name] = telemetry[name].to_numpy(dtype=float)
+    return channels
+
+
+def _resample(channels: Dict[str, np.ndarray], grid: np.ndarray) -> Dict[str, np.ndarray]:
+    """Resample one lap's channels onto the common distance grid."""
+    distance = channels["Distance"]
+    aligned = {"Time": np.interp(grid, distance, channels["Time"])}
+    for name in CONTINUOUS_CHANNELS:
+        aligned[name] = np.interp(grid, distance, channels[name])
+
+    previous = np.clip(np.searchsorted(distance, grid, side="right") - 1, 0, len(distance) - 1)
+    for name in DISCRETE_CHANNELS:
+        aligned[name] = channels[name][previous]
+    return aligned
+
+
+def compare_telemetry(year: int, round: int, session_name: str, drivers: List[str],
+                      reference: Optional[str] = None, step: float = COMPARE_STEP_M) -> Dict[str, Any]:
+    """
+    Compare the fastest laps of several drivers on a common distance grid.
+
+    The session is loaded once; every lap is resampled onto the same distance
+    points, and `delta` is the cumulative time difference to the reference
+    driver at each point (positive = behind the reference). The reference
+    defaults to the driver with the fastest lap.
+    """
+    try:
+        session = get_fastf1_session(year, round, session_name)
+
+        laps = {}
+        for driver_id in drivers:
+            lap = _fastest_lap(session, driver_id)
+            if lap is None:
+                logger.warning(f"No fastest lap for {driver_id} at {year} R{round} {session_name}")
+                continue
+            laps[driver_id] = lap
+
+        if not laps:
+            return {}
+
+        if reference not in laps:
+            reference = min(laps, key=lambda d: laps[d]['LapTime'])
+
+        channels = {driver_id: _lap_channels(lap) for driver_id, lap in laps.items()}
+
+        # Integrated distance drifts ~1% between drivers; scale every lap onto the
+        # reference lap (as get_minisectors does) so the delta ends at the lap time gap
+        lap_length = channels[reference]["Distance"][-1]
+        for c in channels.values():
+            if c["Distance"][-1] > 0:
+                c["Distance"] = c["Distance"] * (lap_length / c["Distance"][-1])
+        grid = np.append(np.arange(0.0, lap_length, step), lap_length)
+
+        aligned = {driver_id: _resample(c, grid) for driver_id, c in channels.items()}
+        ref_time = aligned[reference]["Time"]
+
+        result = {}
+        for driver_id, data in aligned.items():
+            result[driver_id] = {
+                "lap_info": _lap_info(driver_id, laps[driver_id]),
+                "telemetry": {name: np.round(values, 3).tolist() for name, values in data.items()},
+                "delta": np.round(data["Time"] - ref_time, 3).tolist(),
+            }
+
+        return clean_data({
+            "reference": reference,
+            "distance": grid.tolist(),
+            "drivers": result,
+        })
+
+    except SessionUnavailableError:
+        raise
+    except Exception as e:
+        logger.error(f"Error in compare_telemetry for {drivers} at {year} R{round} {session_name}: {e}")
+        return {}
@@ -0,0 +1,236 @@
+"""
+Service layer for circuit track geometry.
+
+The track outline is the same for every session held on a given layout, so it is
+computed once per circuit layout (from a fastest-lap X/Y trace), simplified with
+Douglas-Peucker at several zoom levels, and stored in the `track_geometry` table.
+Minisector responses then only carry index ranges into this shared polyline.
+"""
+
+import logging
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import get_settings
+from app.db.supabase_client import get_supabase
+
+logger = logging.getLogger(__name__)
+
+# Zoom levels: Douglas-Peucker tolerance in FastF1 position units (1/10 m).
+# Level 0 keeps every point of the reference lap.
+GEOMETRY_LEVELS = [0, 10, 50, 200]
+
+RACES_CSV = "f1db-races.csv"
+
+# Fallback for events missing from F1DB: telemetry lap lengths are rounded to
+# this many metres to tell layouts apart
+LAYOUT_LENGTH_STEP_M = 50
+
+# (year, round) -> (F1DB circuit id, official course length in metres)
+_RACE_LAYOUTS: Optional[Dict[Tuple[int, int], Tuple[str, int]]] = None
+_race_layouts_lock = threading.Lock()
+
+# Geometry is immutable per layout key, so one copy per process is enough
+_GEOMETRY_CACHE: Dict[str, Dict[str, Any]] = {}
+
+
+def douglas_peucker(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Return the indices of `points` (N x 2) kept by Douglas-Peucker simplification.
+    Iterative, with the perpendicular distances of each span computed in one NumPy pass.
+    """
+    n = len(points)
+    if n < 3 or tolerance <= 0:
+        return np.arange(n)
+
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+
+        a = points[start]
+        ab = points[end] - a
+        inner = points[start + 1:end] - a
+        length = np.hypot(ab[0], ab[1])
+        if length == 0:
+            # Closed lap: first and last point coincide
+            dists = np.hypot(inner[:, 0], inner[:, 1])
+        else:
+            dists = np.abs(ab[0] * inner[:, 1] - ab[1] * inner[:, 0]) / length
+
+        i = int(np.argmax(dists))
+        if dists[i] > tolerance:
+            mid = start + 1 + i
+            keep[mid] = True
+            stack.append((start, mid))
+            stack.append((mid, end))
+
+    return np.flatnonzero(keep)
+
+
+def _slugify(value: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", str(value).lower()).strip("-") or "unknown"
+
+
+def _load_race_layouts(data_dir: str) -> Dict[Tuple[int, int], Tuple[str, int]]:
+    try:
+        races = pd.read_csv(os.path.join(data_dir, RACES_CSV),
+                            usecols=["year", "round", "circuitId", "courseLength"])
+    except (OSError, ValueError) as e:
+        logger.warning(f"F1DB races not available for layout keys: {e}")
+        return {}
+    races = races.dropna()
+    return {
+        (int(r.year), int(r.round)): (r.circuitId, int(round(r.courseLength * 1000)))
+        for r in races.itertuples(index=False)
+    }
+
+
+def _get_race_layouts() -> Dict[Tuple[int, int], Tuple[str, int]]:
+    global _RACE_LAYOUTS
+    if _RACE_LAYOUTS is None:
+        with _race_layouts_lock:
+            if _RACE_LAYOUTS is None:
+                _RACE_LAYOUTS = _load_race_layouts(get_settings().F1DB_DATA_DIR)
+    return _RACE_LAYOUTS
+
+
+def _event_field(event, name: str):
+    try:
+        value = event.get(name) if hasattr(event, "get") else event[name]
+    except Exception:
+        return None
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None
+    return value
+
+
+def get_layout_key(session, lap_length_m: float) -> str:
+    """
+    Key a circuit layout by F1DB circuit id and official course length (m), e.g.
+    'monza-5793'. Layout changes (new chicanes, reprofiled corners) change the
+    official length and therefore get their own geometry, while every session on
+    one layout shares a key whatever its telemetry distance integrates to.
+    Events missing from F1DB fall back to the venue and the rounded `lap_length_m`.
+    """
+    event = getattr(session, "event", None)
+    year = getattr(event, "year", None)
+    if year is None:
+        event_date = _event_field(event, "EventDate")
+        year = pd.Timestamp(event_date).year if event_date is not None else None
+    round_number = _event_field(event, "RoundNumber")
+    if year is not None and round_number is not None:
+        layout = _get_race_layouts().get((int(year), int(round_number)))
+        if layout is not None:
+            circuit, length = layout
+            return f"{_slugify(circuit)}-{length}"
+
+    location = _event_field(event, "Location") or "unknown"
+    length = int(round(lap_length_m / LAYOUT_LENGTH_STEP_M) * LAYOUT_LENGTH_STEP_M)
+    return f"{_slugify(location)}-{length}"
+
+
+def build_track_geometry(layout_key: str, ref_tel: pd.DataFrame) -> Dict[str, Any]:
+    """Build the multi-level geometry of a layout from a reference lap's telemetry."""
+    xy = ref_tel[['X', 'Y']].to_numpy(dtype=float)
+    distance = ref_tel['Distance'].to_numpy(dtype=float)
+
+    levels = []
+    for tolerance in GEOMETRY_LEVELS:
+        idx = douglas_peucker(xy, tolerance)
+        levels.append({
+            "tolerance": tolerance,
+            "indices": idx.tolist(),
+            "points": np.round(xy[idx], 1).tolist(),
+        })
+
+    return {
+        "layout": layout_key,
+        "length": float(np.nanmax(distance)),
+        "num_points": len(xy),
+        # Per-point lap distance (m), used to map distance ranges onto indices
+        "distance": np.round(distance, 1).tolist(),
+        "levels": levels,
+    }
+
+
+def get_track_geometry(layout_key: str) -> Optional[Dict[str, Any]]:
+    """Return a stored layout geometry, or None if it has never been built."""
+    if layout_key in _GEOMETRY_CACHE:
+        return _GEOMETRY_CACHE[layout_key]
+    try:
+        sb = get_supabase()
+        response = (
+            sb.table("track_geometry")
+            .select("data")
+            .eq("layout_key", layout_key)
+            .limit(1)
+            .execute()
+        )
+        if response.data:
+            _GEOMETRY_CACHE[layout_key] = response.data[0]["data"]
+            return _GEOMETRY_CACHE[layout_key]
+    except Exception as e:
+        logger.error(f"Track geometry read error: {e}")
+    return None
+
+
+def _store_track_geometry(layout_key: str, circuit: str, geometry: Dict[str, Any]):
+    _GEOMETRY_CACHE[layout_key] = geometry
+    try:
+        sb = get_supabase()
+        sb.table("track_geometry").upsert({
+            "layout_key": layout_key,
+            "circuit": circuit,
+            "data": geometry,
+        }, on_conflict="layout_key").execute()
+    except Exception as e:
+        logger.error(f"Track geometry write error: {e}")
+
+
+def ensure_track_geometry(session, ref_tel: pd.DataFrame) -> Dict[str, Any]:
+    """Return this session's layout geometry, building and storing it if needed."""
+    distance = ref_tel['Distance'].to_numpy(dtype=float)
+    layout_key = get_layout_key(session, float(np.nanmax(distance)))
+    geometry = get_track_geometry(layout_key)
+    if geometry is None:
+        geometry = build_track_geometry(layout_key, ref_tel)
+        _store_track_geometry(layout_key, layout_key.rsplit("-", 1)[0], geometry)
+    return geometry
+
+
+def distance_to_indices(geometry: Dict[str, Any], fractions: np.ndarray) -> np.ndarray:
+    """
+    Map positions along the lap (0 = start line, 1 = finish) onto point indices of the
+    layout polyline. Works for any session on the layout, not only the reference lap.
+    """
+    distance = np.asarray(geometry["distance"], dtype=float)
+    idx = np.searchsorted(distance, np.asarray(fractions) * geometry["length"])
+    return np.minimum(idx, len(distance) - 1)
+
+
+def get_track_geometry_level(layout_key: str, level: int) -> Optional[Dict[str, Any]]:
+    """One zoom level of a layout, as served to clients."""
+    geometry = get_track_geometry(layout_key)
+    if geometry is None:
+        return None
+    levels: List[Dict[str, Any]] = geometry["levels"]
+    level = max(0, min(level, len(levels) - 1))
+    return {
+        "layout": geometry["layout"],
+        "length": geometry["length"],
+        "num_points": geometry["num_points"],
+        "level": level,
+        "tolerance": levels[level]["tolerance"],
+        "indices": levels[level]["indices"],
+        "points": levels[level]["points"],
+    }
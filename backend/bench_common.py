@@ -0,0 +1,76 @@
+"""
+Helpers shared by the bench_*.py scripts: the git-tagged JSON reports written to
+bench_results/, the side-by-side comparison of saved reports, and process RSS.
+"""
+
+import json
+import os
+import subprocess
+import time
+from datetime import datetime, timezone
+
+RESULTS_DIR = "./bench_results"
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def rss_bytes(pid: int | None) -> int | None:
+    """Resident set size of a process, read from /proc (Linux only)."""
+    if pid is None:
+        return None
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def load_reports(paths: list[str]) -> list[dict]:
+    reports = []
+    for path in paths:
+        with open(path) as f:
+            reports.append(json.load(f))
+    return reports
+
+
+def print_comparison(reports: list[dict], rows: list, label_width: int = 28, precision: int = 3):
+    """
+    Print one column per report (headed by its commit) and one line per
+    (label, getter) row; getters take a report's "results" and may return None.
+    """
+    print(f"{'':{label_width}}" + "".join(f"{r['commit']:>14}" for r in reports))
+    for label, getter in rows:
+        values = []
+        for r in reports:
+            value = getter(r["results"])
+            values.append(f"{value:>14.{precision}f}" if isinstance(value, (int, float)) else f"{'-':>14}")
+        print(f"{label:{label_width}}" + "".join(values))
+
+
+def write_report(benchmark: str, args, results: dict) -> str:
+    """Save `results` with the commit, time and CLI config under RESULTS_DIR, print them and return the path."""
+    commit = git_commit()
+    report = {
+        "benchmark": benchmark,
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "config": {k: v for k, v in vars(args).items() if k != "compare"},
+        "results": results,
+    }
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    out_path = os.path.join(RESULTS_DIR, f"{benchmark}-{commit}-{int(time.time())}.json")
+    with open(out_path, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(json.dumps(results, indent=2))
+    print(f"Report saved to {out_path}")
+    return out_path
@@ -0,0 +1,228 @@
+"""
+Load test for the live timing WebSocket relay (/api/v1/live/ws).
+
+Starts the API with a synthetic (or recorded) feed source, opens N WebSocket
+clients — a fraction of them deliberately slow — and measures:
+
+- end-to-end latency percentiles (feed source -> client), synthetic feed only
+- delivered throughput (messages/s and bytes/s)
+- server memory per connection (RSS delta, Linux only)
+- dropped clients (connect failures and connections closed by the server)
+
+The report is written as JSON to bench_results/ tagged with the current git
+commit, so runs can be compared across commits:
+
+    python bench_live_ws.py --clients 200 --slow-fraction 0.1 --duration 20
+    python bench_live_ws.py --source replay --replay-file live_stream.txt
+    python bench_live_ws.py --workers 4    # live_ingest.py + live bus fan-out
+    python bench_live_ws.py --compare bench_results/live_ws-abc1234-*.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+import websockets
+
+from bench_common import load_reports, print_comparison, rss_bytes, write_report
+
+
+def percentile(sorted_values: list[float], pct: float) -> float | None:
+    if not sorted_values:
+        return None
+    k = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * (len(sorted_values) - 1)))))
+    return sorted_values[k]
+
+
+def start_server(args) -> list[subprocess.Popen]:
+    """Start the API (and, with --workers > 1, the live_ingest.py publisher).
+    The API process is always the last one in the returned list."""
+    env = dict(os.environ)
+    env.update({
+        "LIVE_FEED_SOURCE": args.source,
+        "LIVE_SYNTHETIC_RATE": str(args.rate),
+        "LIVE_SYNTHETIC_PAYLOAD_BYTES": str(args.payload_bytes),
+        "LIVE_REPLAY_FILE": args.replay_file,
+        "LIVE_REPLAY_SPEED": str(args.replay_speed),
+        "LIVE_REPLAY_LOOP": "true",
+    })
+    # The live relay never touches Supabase, but Settings requires the keys
+    env.setdefault("SUPABASE_URL", "http://localhost")
+    env.setdefault("SUPABASE_KEY", "bench")
+
+    procs = []
+    if args.workers > 1:
+        env["LIVE_BUS_ADDRESS"] = f"tcp://127.0.0.1:{args.port + 1}"
+        procs.append(subprocess.Popen([sys.executable, "live_ingest.py"], env=env))
+
+    procs.append(subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+         "--port", str(args.port), "--workers", str(args.workers), "--log-level", "warning"],
+        env=env,
+    ))
+
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{args.port}/", timeout=1)
+            return procs
+        except Exception:
+            time.sleep(0.2)
+    stop_server(procs)
+    raise RuntimeError("API did not start within 60 seconds")
+
+
+def stop_server(procs: list[subprocess.Popen]):
+    for proc in procs:
+        proc.terminate()
+    for proc in procs:
+        proc.wait(timeout=10)
+
+
+class ClientStats:
+    def __init__(self, slow: bool):
+        self.slow = slow
+        self.connected = False
+        self.dropped = False
+        self.messages = 0
+        self.bytes = 0
+        self.latencies: list[float] = []
+
+
+async def run_client(uri: str, stats: ClientStats, args, stop_at: float, measure_from: float):
+    try:
+        async with websockets.connect(uri, max_size=None) as ws:
+            stats.connected = True
+            while True:
+                remaining = stop_at - time.time()
+                if remaining <= 0:
+                    return
+                try:
+                    raw = await asyncio.wait_for(ws.recv(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    return
+
+                received = time.time()
+                if received >= measure_from:
+                    stats.messages += 1
+                    stats.bytes += len(raw)
+                    message = json.loads(raw)
+                    for item in message.get("data", []):
+                        data = item.get("data") if isinstance(item, dict) else None
+                        if isinstance(data, dict) and "Emitted" in data:
+                            stats.latencies.append((received - data["Emitted"]) * 1000)
+
+                if stats.slow:
+                    await asyncio.sleep(args.slow_delay)
+    except websockets.ConnectionClosed:
+        stats.dropped = True
+    except OSError:
+        # Connection refused / reset while connecting
+        pass
+
+
+async def run_load(args, server_pid: int | None) -> dict:
+    uri = f"ws://127.0.0.1:{args.port}/api/v1/live/ws"
+    n_slow = int(args.clients * args.slow_fraction)
+    clients = [ClientStats(slow=i < n_slow) for i in range(args.clients)]
+
+    rss_before = rss_bytes(server_pid)
+    started = time.time()
+    measure_from = started + args.warmup
+    stop_at = measure_from + args.duration
+
+    tasks = [asyncio.create_task(run_client(uri, c, args, stop_at, measure_from)) for c in clients]
+
+    # Sample memory once every client has had time to connect
+    await asyncio.sleep(min(args.warmup, stop_at - time.time()))
+    rss_after = rss_bytes(server_pid)
+
+    await asyncio.gather(*tasks)
+
+    latencies = sorted(l for c in clients for l in c.latencies)
+    fast_latencies = sorted(l for c in clients if not c.slow for l in c.latencies)
+    total_messages = sum(c.messages for c in clients)
+    total_bytes = sum(c.bytes for c in clients)
+    connected = sum(1 for c in clients if c.connected)
+
+    def latency_summary(values):
+        return {
+            "samples": len(values),
+            "p50": percentile(values, 50),
+            "p90": percentile(values, 90),
+            "p99": percentile(values, 99),
+            "max": values[-1] if values else None,
+        }
+
+    mem_per_conn = None
+    if rss_before is not None and rss_after is not None and connected:
+        mem_per_conn = (rss_after - rss_before) / connected
+
+    return {
+        "connected_clients": connected,
+        "connect_failures": args.clients - connected,
+        "dropped_clients": sum(1 for c in clients if c.dropped),
+        "latency_ms": latency_summary(latencies),
+        "latency_ms_fast_clients": latency_summary(fast_latencies),
+        "throughput_msgs_per_s": total_messages / args.duration,
+        "throughput_bytes_per_s": total_bytes / args.duration,
+        "server_rss_before_bytes": rss_before,
+        "server_rss_loaded_bytes": rss_after,
+        "memory_per_connection_bytes": mem_per_conn,
+    }
+
+
+def compare(paths: list[str]):
+    """Print the headline numbers of several reports side by side."""
+    rows = [
+        ("p50 latency (ms)", lambda r: r["latency_ms"]["p50"]),
+        ("p99 latency (ms)", lambda r: r["latency_ms"]["p99"]),
+        ("p99 fast clients (ms)", lambda r: r["latency_ms_fast_clients"]["p99"]),
+        ("msgs/s", lambda r: r["throughput_msgs_per_s"]),
+        ("mem/conn (KiB)", lambda r: (r["memory_per_connection_bytes"] or 0) / 1024),
+        ("dropped", lambda r: r["dropped_clients"]),
+    ]
+    print_comparison(load_reports(paths), rows, label_width=24, precision=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the live timing WebSocket relay")
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--slow-fraction", type=float, default=0.0, help="Fraction of clients that read slowly")
+    parser.add_argument("--slow-delay", type=float, default=0.05, help="Seconds a slow client waits per message")
+    parser.add_argument("--duration", type=float, default=15.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Seconds to connect clients before measuring")
+    parser.add_argument("--source", choices=["synthetic", "replay"], default="synthetic")
+    parser.add_argument("--rate", type=float, default=20.0, help="Synthetic messages per second")
+    parser.add_argument("--payload-bytes", type=int, default=512)
+    parser.add_argument("--replay-file", default="live_stream.txt")
+    parser.add_argument("--replay-speed", type=float, default=1.0)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="uvicorn workers; > 1 relays through live_ingest.py and the live bus")
+    parser.add_argument("--compare", nargs="+", metavar="REPORT", help="Compare existing reports and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(args.compare)
+        return
+
+    procs = start_server(args)
+    try:
+        # With several workers the API pid is only the uvicorn supervisor,
+        # so memory per connection is not reported
+        server_pid = procs[-1].pid if args.workers == 1 else None
+        results = asyncio.run(run_load(args, server_pid))
+    finally:
+        stop_server(procs)
+
+    write_report("live_ws", args, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Benchmark for the columnar results engine (app/services/results_engine.py).
+
+Loads the engine from the F1DB CSVs and times each query type over a fixed,
+seeded sample of drivers:
+
+- teammates, head-to-head (any race / teammates only), qualifying gap
+- filter-plus-aggregate queries with different filters and groupings
+- the same head-to-head done the straightforward way (filter a pandas frame
+  of all results per request), as the baseline the engine replaces
+
+The report is written as JSON to bench_results/ tagged with the current git
+commit, like bench_startup.py:
+
+    python bench_results_engine.py --queries 200
+    python bench_results_engine.py --compare bench_results/results_engine-*.json
+"""
+
+import argparse
+import os
+import random
+import statistics
+import time
+
+from bench_common import load_reports, print_comparison, write_report
+
+
+def percentiles(values_ms: list[float]) -> dict:
+    ordered = sorted(values_ms)
+    return {
+        "runs": len(ordered),
+        "p50_ms": round(statistics.median(ordered), 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+def timed(func, args_list) -> dict:
+    samples = []
+    for args in args_list:
+        started = time.perf_counter()
+        func(*args)
+        samples.append((time.perf_counter() - started) * 1000)
+    return percentiles(samples)
+
+
+def pandas_head_to_head(results, driver_a: str, driver_b: str) -> dict:
+    """Baseline: what a request does without the engine, on an already loaded frame."""
+    a = results[results["driverid"] == driver_a].drop_duplicates("raceid")
+    b = results[results["driverid"] == driver_b].drop_duplicates("raceid")
+    both = a.merge(b, on="raceid", suffixes=("_a", "_b"))
+    return {
+        "races": len(both),
+        "a_ahead": int((both["positiondisplayorder_a"] < both["positiondisplayorder_b"]).sum()),
+        "b_ahead": int((both["positiondisplayorder_b"] < both["positiondisplayorder_a"]).sum()),
+    }
+
+
+def compare(paths: list[str]):
+    """Print the p50 of each query type for several reports side by side."""
+    reports = load_reports(paths)
+    rows = [("load (s)", lambda r: r["load_seconds"])]
+    for name in reports[0]["results"]["queries"]:
+        rows.append((name + " p50 (ms)", lambda r, name=name: r["queries"].get(name, {}).get("p50_ms")))
+    print_comparison(reports, rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the in-memory results engine")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per query type")
+    parser.add_argument("--data-dir", default="./data")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--compare", nargs="+", metavar="REPORT", help="Compare existing reports and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(args.compare)
+        return
+
+    from app.services.results_engine import ResultsEngine
+
+    started = time.perf_counter()
+    engine = ResultsEngine(args.data_dir)
+    load_seconds = time.perf_counter() - started
+
+    # Drivers weighted towards long careers, where the queries do the most work
+    rng = random.Random(args.seed)
+    drivers = list(engine.drivers.ids)
+    entries = engine.r_offsets[1:] - engine.r_offsets[:-1]
+    veterans = [d for d, n in zip(drivers, entries) if n >= 100]
+    singles = [(rng.choice(veterans),) for _ in range(args.queries)]
+    pairs = [tuple(rng.sample(veterans, 2)) for _ in range(args.queries)]
+    teammate_pairs = []
+    for (driver,) in singles:
+        mates = engine.teammates(driver)
+        teammate_pairs.append((driver, mates[0]["teammate_id"]) if mates else (driver, driver))
+
+    years = [(rng.randint(1950, 2020),) for _ in range(args.queries)]
+    queries = {
+        "teammates": timed(engine.teammates, singles),
+        "head_to_head": timed(engine.head_to_head, pairs),
+        "head_to_head_teammates": timed(lambda a, b: engine.head_to_head(a, b, True), teammate_pairs),
+        "qualifying_gap": timed(engine.qualifying_gap, singles),
+        "aggregate_by_driver": timed(
+            lambda y: engine.aggregate("driver", year_from=y, grid_min=11, order_by="wins"), years),
+        "aggregate_by_constructor": timed(
+            lambda y: engine.aggregate("constructor", year_from=y, year_to=y + 10, order_by="points"), years),
+        "aggregate_driver_by_year": timed(lambda d: engine.aggregate("year", driver_id=d), singles),
+    }
+
+    import pandas as pd
+    frame = pd.read_csv(os.path.join(args.data_dir, "f1db-races-race-results.csv"), low_memory=False)
+    frame.columns = [c.lower() for c in frame.columns]
+    queries["head_to_head_pandas_baseline"] = timed(lambda a, b: pandas_head_to_head(frame, a, b), pairs)
+
+    results = {
+        "load_seconds": round(load_seconds, 3),
+        "rows": {"results": int(len(engine.r_race)), "qualifying": int(len(engine.q_race))},
+        "queries": queries,
+        "head_to_head_speedup_vs_pandas": round(
+            queries["head_to_head_pandas_baseline"]["p50_ms"] / max(queries["head_to_head"]["p50_ms"], 1e-6), 1),
+    }
+
+    write_report("results_engine", args, results)
+
+
+if __name__ == "__main__":
+    main()
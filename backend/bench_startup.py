@@ -0,0 +1,133 @@
+"""
+Cold-start benchmark for the API.
+
+Measures, over several fresh processes:
+
+- import time of main.py (what every worker pays before serving anything)
+- time from spawning uvicorn to the first successful response on /
+- peak RSS of the server process right after it starts answering (Linux only)
+- which heavy modules (pandas, numpy, fastf1) are already imported after `import main`
+
+The report is written as JSON to bench_results/ tagged with the current git
+commit, like bench_live_ws.py:
+
+    python bench_startup.py --runs 5
+    python bench_startup.py --compare bench_results/startup-*.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+from bench_common import load_reports, print_comparison, rss_bytes, write_report
+
+HEAVY_MODULES = ["pandas", "numpy", "fastf1"]
+
+IMPORT_PROBE = f"""
+import json, sys, time
+started = time.perf_counter()
+import main
+elapsed = time.perf_counter() - started
+print(json.dumps({{"import_seconds": elapsed, "loaded": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def bench_env(args) -> dict:
+    env = dict(os.environ)
+    # Startup never talks to Supabase, but Settings requires the keys
+    env.setdefault("SUPABASE_URL", "http://localhost")
+    env.setdefault("SUPABASE_KEY", "bench")
+    if args.no_warmup:
+        env["WARM_ANALYTICS_ON_STARTUP"] = "false"
+    return env
+
+
+def measure_import(env: dict) -> dict:
+    out = subprocess.check_output([sys.executable, "-c", IMPORT_PROBE], env=env, text=True)
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def measure_first_response(env: dict, port: int) -> dict:
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        deadline = time.time() + 60
+        while time.time() < deadline:
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1)
+                return {
+                    "first_response_seconds": time.perf_counter() - started,
+                    "rss_bytes": rss_bytes(proc.pid),
+                }
+            except Exception:
+                time.sleep(0.02)
+        raise RuntimeError("API did not start within 60 seconds")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def summary(values: list[float]) -> dict:
+    return {
+        "runs": len(values),
+        "min": min(values),
+        "median": statistics.median(values),
+        "max": max(values),
+    }
+
+
+def compare(paths: list[str]):
+    """Print the headline numbers of several reports side by side."""
+    rows = [
+        ("import median (s)", lambda r: r["import_seconds"]["median"]),
+        ("first response median (s)", lambda r: r["first_response_seconds"]["median"]),
+        ("RSS at start (MiB)", lambda r: (r["rss_bytes_median"] or 0) / 2**20),
+    ]
+    print_comparison(load_reports(paths), rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure API cold-start time")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--no-warmup", action="store_true", help="Disable the background analytics warm-up")
+    parser.add_argument("--compare", nargs="+", metavar="REPORT", help="Compare existing reports and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(args.compare)
+        return
+
+    env = bench_env(args)
+    imports, responses, rss = [], [], []
+    loaded = []
+    for _ in range(args.runs):
+        probe = measure_import(env)
+        imports.append(probe["import_seconds"])
+        loaded = probe["loaded"]
+
+        first = measure_first_response(env, args.port)
+        responses.append(first["first_response_seconds"])
+        if first["rss_bytes"] is not None:
+            rss.append(first["rss_bytes"])
+
+    results = {
+        "import_seconds": summary(imports),
+        "first_response_seconds": summary(responses),
+        "rss_bytes_median": statistics.median(rss) if rss else None,
+        "heavy_modules_after_import": loaded,
+    }
+
+    write_report("startup", args, results)
+
+
+if __name__ == "__main__":
+    main()
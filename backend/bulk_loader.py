@@ -0,0 +1,437 @@
+"""
+Bulk loader for the F1DB CSVs, shared by seed.py and seed_all_missing.py.
+
+- CSVs are streamed in chunks with the csv module instead of being read whole
+  into pandas. Values are sent as the CSV text (empty = NULL) and Postgres
+  parses them into the column types, the same way COPY does, so there is no
+  dtype inference and integers never turn into floats.
+- Tables are grouped into dependency levels (see FK_PARENTS). Tables of the
+  same level are loaded concurrently, and a level only starts once every
+  table it references has finished.
+- F1DB repeats some primary keys (shared cars in results, constructors with
+  several engines in the standings). The last row of a key wins, as in
+  f1db_sync.diff_table; earlier ones are dropped before upserting, since
+  Postgres rejects an upsert that touches the same row twice.
+- Upserts go through a bounded pool: at most `concurrency` requests in flight
+  and a few chunks queued per worker, each retried with exponential backoff.
+- With DATABASE_URL set (a direct Postgres connection string) and psycopg
+  installed, each table is loaded with COPY into a temporary table followed
+  by one INSERT ... ON CONFLICT DO UPDATE, which is much faster than the REST API.
+
+Rows per second are reported per table and for the whole run:
+
+    python bulk_loader.py                          # TABLES_ORDER from seed.py
+    python bulk_loader.py --tables-file tables_list_reseed.json --concurrency 8
+    python bulk_loader.py --only races results --chunk-size 2000
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+
+DATA_DIR = "./data"
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RETRIES = 5
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 30.0
+
+# Referenced tables of each table (F1DB foreign keys, see sql_scripts/)
+FK_PARENTS = {
+    "races": ["seasons", "circuits", "grands_prix"],
+    "countries": ["continents"],
+    "circuits": ["countries"],
+    "drivers": ["countries"],
+    "constructors": ["countries"],
+    "chassis": ["constructors"],
+    "engines": ["engine_manufacturers"],
+    "entrants": ["countries"],
+    "grands_prix": ["countries"],
+}
+# Child tables named after their parent (races_*, seasons_*, ...) reference it
+# and the drivers/constructors it lists
+PREFIX_PARENTS = {
+    "races_": ["races", "drivers", "constructors"],
+    "seasons_": ["seasons", "drivers", "constructors", "entrants"],
+    "drivers_": ["drivers"],
+    "constructors_": ["constructors"],
+}
+# Primary key constraints (sql_scripts/01, 02 and 03_telemetry)
+PRIMARY_KEYS = {
+    "circuits": ["id"],
+    "constructors": ["id"],
+    "drivers": ["id"],
+    "seasons": ["year"],
+    "races": ["id"],
+    "qualifying": ["raceid", "driverid"],
+    "results": ["raceid", "driverid"],
+    "sprint_results": ["raceid", "driverid"],
+    "constructor_standings": ["raceid", "constructorid"],
+    "driver_standings": ["raceid", "driverid"],
+    "lap_times": ["raceid", "driverid", "lap"],
+    "pit_stops": ["raceid", "driverid", "stop"],
+}
+# The original seed names for race-level tables
+LEGACY_RACE_TABLES = {
+    "qualifying", "results", "sprint_results", "constructor_standings",
+    "driver_standings", "lap_times", "pit_stops",
+}
+
+
+def table_parents(table: str) -> List[str]:
+    if table in FK_PARENTS:
+        return FK_PARENTS[table]
+    if table in LEGACY_RACE_TABLES:
+        return PREFIX_PARENTS["races_"]
+    for prefix, parents in PREFIX_PARENTS.items():
+        if table.startswith(prefix):
+            return parents
+    return []
+
+
+def dependency_levels(items: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """
+    Group tables so that each one comes after every table it references.
+    Only references to tables that are part of this load are considered;
+    within a level the input order is kept.
+    """
+    names = {item["table"] for item in items}
+    level_of: Dict[str, int] = {}
+
+    def level(table: str, visiting: frozenset = frozenset()) -> int:
+        if table in level_of:
+            return level_of[table]
+        parents = [p for p in table_parents(table) if p in names and p != table and p not in visiting]
+        value = 1 + max((level(p, visiting | {table}) for p in parents), default=-1)
+        level_of[table] = value
+        return value
+
+    levels: Dict[int, List[Dict[str, Any]]] = {}
+    for item in items:
+        levels.setdefault(level(item["table"]), []).append(item)
+    return [levels[key] for key in sorted(levels)]
+
+
+def iter_csv_chunks(path: str, chunk_size: int, skip: Optional[Set[int]] = None) -> Iterator[List[Dict[str, Optional[str]]]]:
+    """
+    Yield lists of up to `chunk_size` records; columns are lowercased, empty
+    fields are None. Row numbers (0-based, header excluded) in `skip` are left out.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        # PostgreSQL folds unquoted column names to lowercase
+        columns = [name.lower() for name in next(reader)]
+        chunk = []
+        for number, values in enumerate(reader):
+            if skip and number in skip:
+                continue
+            chunk.append({col: (value if value != "" else None) for col, value in zip(columns, values)})
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def count_csv_rows(path: str) -> int:
+    with open(path, newline="", encoding="utf-8") as f:
+        return max(0, sum(1 for _ in csv.reader(f)) - 1)
+
+
+def superseded_rows(path: str, key: List[str]) -> Set[int]:
+    """Row numbers of rows whose key appears again further down the file (the last one wins)."""
+    last: Dict[tuple, int] = {}
+    superseded = set()
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        columns = [name.lower() for name in next(reader)]
+        positions = [columns.index(c) for c in key]
+        for number, values in enumerate(reader):
+            k = tuple(values[i] for i in positions)
+            if k in last:
+                superseded.add(last[k])
+            last[k] = number
+    return superseded
+
+
+class LoadStats:
+    def __init__(self):
+        self.tables: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def start(self, table: str):
+        with self._lock:
+            self.tables[table] = {"rows": 0, "failed_rows": 0, "duplicate_rows": 0,
+                                  "started": time.perf_counter(), "seconds": None}
+
+    def add(self, table: str, rows: int, failed: bool = False):
+        with self._lock:
+            self.tables[table]["failed_rows" if failed else "rows"] += rows
+
+    def duplicates(self, table: str, rows: int):
+        with self._lock:
+            self.tables[table]["duplicate_rows"] += rows
+
+    def finish(self, table: str):
+        with self._lock:
+            entry = self.tables[table]
+            entry["seconds"] = time.perf_counter() - entry["started"]
+        rate = entry["rows"] / entry["seconds"] if entry["seconds"] else 0.0
+        failed = f", {entry['failed_rows']} failed" if entry["failed_rows"] else ""
+        if entry["duplicate_rows"]:
+            failed += f", {entry['duplicate_rows']} repeated keys skipped"
+        print(f"✅ {table}: {entry['rows']} rows in {entry['seconds']:.1f}s ({rate:,.0f} rows/s{failed})")
+
+    def report(self, seconds: float) -> Dict[str, Any]:
+        rows = sum(entry["rows"] for entry in self.tables.values())
+        failed = sum(entry["failed_rows"] for entry in self.tables.values())
+        return {
+            "tables": len(self.tables),
+            "rows": rows,
+            "failed_rows": failed,
+            "seconds": round(seconds, 2),
+            "rows_per_second": round(rows / seconds, 1) if seconds else None,
+            # Tables loaded without a single failed row (safe to baseline / build on)
+            "complete_tables": [table for table, entry in self.tables.items() if not entry["failed_rows"]],
+            "failed_tables": [table for table, entry in self.tables.items() if entry["failed_rows"]],
+        }
+
+
+def _with_retry(func, retries: int, description: str):
+    attempt = 0
+    while True:
+        try:
+            return func()
+        except Exception as e:
+            attempt += 1
+            if attempt > retries:
+                raise
+            delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** (attempt - 1))
+            delay *= random.uniform(0.5, 1.0)
+            print(f"   ⚠️ {description} failed ({e}); retry {attempt}/{retries} in {delay:.1f}s")
+            time.sleep(delay)
+
+
+# ── REST (Supabase upsert) path ──────────────────────────────
+class UpsertPool:
+    """Runs upserts on `concurrency` threads with a bounded queue of pending chunks."""
+
+    def __init__(self, supabase, stats: LoadStats, concurrency: int, retries: int):
+        self.supabase = supabase
+        self.stats = stats
+        self.retries = retries
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="upsert")
+        # Readers block here instead of buffering a whole CSV in memory
+        self.slots = threading.BoundedSemaphore(concurrency * 2)
+
+    def submit(self, table: str, offset: int, chunk: List[Dict[str, Any]]):
+        self.slots.acquire()
+        try:
+            return self.executor.submit(self._upsert, table, offset, chunk)
+        except Exception:
+            self.slots.release()
+            raise
+
+    def _upsert(self, table: str, offset: int, chunk: List[Dict[str, Any]]):
+        try:
+            _with_retry(
+                lambda: self.supabase.table(table).upsert(chunk).execute(),
+                self.retries,
+                f"{table} rows {offset}-{offset + len(chunk)}",
+            )
+            self.stats.add(table, len(chunk))
+        except Exception as e:
+            print(f"   ❌ {table} rows {offset}-{offset + len(chunk)}: {e}")
+            self.stats.add(table, len(chunk), failed=True)
+        finally:
+            self.slots.release()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+
+def _load_table_rest(pool: UpsertPool, item: Dict[str, Any], data_dir: str, chunk_size: int):
+    table = item["table"]
+    path = os.path.join(data_dir, item["csv"])
+    pool.stats.start(table)
+    skip = superseded_rows(path, PRIMARY_KEYS[table]) if table in PRIMARY_KEYS else set()
+    pool.stats.duplicates(table, len(skip))
+    futures = []
+    offset = 0
+    for chunk in iter_csv_chunks(path, chunk_size, skip):
+        futures.append(pool.submit(table, offset, chunk))
+        offset += len(chunk)
+    for future in futures:
+        future.result()
+    pool.stats.finish(table)
+
+
+# ── COPY path (direct Postgres connection) ───────────────────
+def copy_available(database_url: Optional[str]) -> bool:
+    if not database_url:
+        return False
+    try:
+        import psycopg  # noqa: F401
+    except ImportError:
+        print("⚠️ DATABASE_URL is set but psycopg is not installed; using the REST API")
+        return False
+    return True
+
+
+def _primary_key(cur, table: str) -> List[str]:
+    cur.execute(
+        """
+        SELECT a.attname
+        FROM pg_index i
+        JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+        WHERE i.indrelid = %s::regclass AND i.indisprimary
+        """,
+        (f"public.{table}",),
+    )
+    return [row[0] for row in cur.fetchall()]
+
+
+def _load_table_copy(database_url: str, item: Dict[str, Any], data_dir: str, stats: LoadStats, retries: int):
+    import psycopg
+    from psycopg import sql
+
+    table = item["table"]
+    path = os.path.join(data_dir, item["csv"])
+    with open(path, newline="", encoding="utf-8") as f:
+        columns = [name.lower() for name in next(csv.reader(f))]
+
+    def run() -> Tuple[int, int]:
+        with psycopg.connect(database_url) as conn, conn.cursor() as cur:
+            staging = sql.Identifier(f"_load_{table}")
+            target = sql.Identifier("public", table)
+            cols = sql.SQL(", ").join(sql.Identifier(c) for c in columns)
+            cur.execute(sql.SQL("CREATE TEMP TABLE {} (LIKE {} INCLUDING DEFAULTS) ON COMMIT DROP").format(staging, target))
+            # File order of the staged rows, to keep the last row of a repeated key
+            cur.execute(sql.SQL("ALTER TABLE {} ADD COLUMN _load_ordinal bigint GENERATED ALWAYS AS IDENTITY").format(staging))
+
+            copy_stmt = sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv, HEADER true)").format(staging, cols)
+            with open(path, "rb") as f, cur.copy(copy_stmt) as copy:
+                while block := f.read(1 << 20):
+                    copy.write(block)
+
+            pk = _primary_key(cur, table)
+            source = sql.SQL("SELECT {} FROM {}").format(cols, staging)
+            if pk:
+                pk_cols = sql.SQL(", ").join(sql.Identifier(c) for c in pk)
+                source = sql.SQL("SELECT DISTINCT ON ({}) {} FROM {} ORDER BY {}, _load_ordinal DESC").format(
+                    pk_cols, cols, staging, pk_cols)
+                updates = [c for c in columns if c not in pk]
+                conflict = sql.SQL("ON CONFLICT ({}) DO {}").format(
+                    pk_cols,
+                    sql.SQL("UPDATE SET {}").format(sql.SQL(", ").join(
+                        sql.SQL("{} = EXCLUDED.{}").format(sql.Identifier(c), sql.Identifier(c)) for c in updates
+                    )) if updates else sql.SQL("NOTHING"),
+                )
+            else:
+                conflict = sql.SQL("")
+            cur.execute(sql.SQL("INSERT INTO {} ({}) {} {}").format(target, cols, source, conflict))
+            inserted = cur.rowcount
+            cur.execute(sql.SQL("SELECT count(*) FROM {}").format(staging))
+            return inserted, cur.fetchone()[0]
+
+    stats.start(table)
+    try:
+        # One transaction per table, so a retry never leaves a partial load behind
+        inserted, staged = _with_retry(run, retries, f"COPY {table}")
+        stats.add(table, inserted)
+        stats.duplicates(table, staged - inserted)
+    except Exception as e:
+        print(f"   ❌ {table}: {e}")
+        # The transaction was rolled back: none of the table's rows are in
+        stats.add(table, count_csv_rows(path), failed=True)
+    stats.finish(table)
+
+
+# ── Entry point ──────────────────────────────────────────────
+def load_tables(items: List[Dict[str, Any]], supabase=None, data_dir: str = DATA_DIR,
+                chunk_size: int = DEFAULT_CHUNK_SIZE, concurrency: int = DEFAULT_CONCURRENCY,
+                retries: int = DEFAULT_RETRIES, database_url: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Load every {"csv", "table"} item, level by level. Uses COPY when
+    `database_url` is given (and psycopg is installed), otherwise upserts
+    through `supabase`. Returns the run summary.
+    """
+    present = []
+    for item in items:
+        if os.path.exists(os.path.join(data_dir, item["csv"])):
+            present.append(item)
+        else:
+            print(f"⚠️ {item['csv']} not found, skipping {item['table']}")
+
+    use_copy = copy_available(database_url)
+    if not use_copy and supabase is None:
+        raise ValueError("A Supabase client is required when COPY is not available")
+
+    stats = LoadStats()
+    started = time.perf_counter()
+    pool = None if use_copy else UpsertPool(supabase, stats, concurrency, retries)
+    try:
+        for number, level in enumerate(dependency_levels(present)):
+            print(f"🚀 Level {number}: {', '.join(item['table'] for item in level)}")
+            with ThreadPoolExecutor(max_workers=max(1, min(len(level), concurrency)), thread_name_prefix="table") as tables:
+                if use_copy:
+                    jobs = [tables.submit(_load_table_copy, database_url, item, data_dir, stats, retries) for item in level]
+                else:
+                    jobs = [tables.submit(_load_table_rest, pool, item, data_dir, chunk_size) for item in level]
+                for job in jobs:
+                    job.result()
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    summary = stats.report(time.perf_counter() - started)
+    summary["method"] = "copy" if use_copy else "rest"
+    print(f"🏁 {summary['rows']} rows in {summary['seconds']}s ({summary['rows_per_second']} rows/s) via {summary['method']}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load F1DB CSVs into Supabase")
+    parser.add_argument("--tables-file", help="JSON list of {csv, table} (default: TABLES_ORDER from seed.py)")
+    parser.add_argument("--only", nargs="+", metavar="TABLE", help="Load only these tables")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES)
+    parser.add_argument("--no-copy", action="store_true", help="Use the REST API even if DATABASE_URL is set")
+    args = parser.parse_args()
+
+    load_dotenv()
+    if args.tables_file:
+        with open(args.tables_file) as f:
+            items = json.load(f)
+    else:
+        from seed import TABLES_ORDER
+        items = TABLES_ORDER
+    if args.only:
+        items = [item for item in items if item["table"] in args.only]
+
+    database_url = None if args.no_copy else os.getenv("DATABASE_URL")
+    supabase = None
+    if not copy_available(database_url):
+        from seed import init_supabase
+        supabase = init_supabase()
+        database_url = None
+
+    summary = load_tables(
+        items, supabase, data_dir=args.data_dir, chunk_size=args.chunk_size,
+        concurrency=args.concurrency, retries=args.retries, database_url=database_url,
+    )
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+"""
+Incremental F1DB sync: send only the rows that changed since the last sync.
+
+A manifest (f1db_sync_manifest.json) records, per table, the SHA-256 of the
+CSV last synced and a short hash of every row keyed by its primary (or
+natural) key. A sync:
+
+1. skips tables whose CSV is byte-for-byte the one in the manifest
+2. streams the other CSVs, hashes each row and diffs against the manifest
+   into inserted, changed and deleted keys
+3. deletes removed rows (children first), then upserts inserted and changed
+   rows (parents first, using the bulk_loader dependency levels)
+4. updates the manifest table by table, only after its changes succeeded
+
+So a new F1DB release costs one local pass over the CSVs plus requests
+proportional to the number of changed rows, instead of a full reseed.
+
+Tables without a primary key constraint in Postgres (sql_scripts/03_extended_schema.sql)
+cannot be upserted; their changed rows are deleted by natural key and re-inserted.
+
+    python f1db_sync.py --baseline           # record the current CSVs (DB already seeded)
+    python f1db_sync.py                      # sync TABLES_ORDER from seed.py
+    python f1db_sync.py --tables-file tables_list.json --dry-run
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from bulk_loader import DATA_DIR, DEFAULT_RETRIES, PRIMARY_KEYS, _with_retry, dependency_levels, iter_csv_chunks
+
+MANIFEST_PATH = "./f1db_sync_manifest.json"
+WRITE_CHUNK_SIZE = 500
+DELETE_CHUNK_SIZE = 200
+
+# Unique columns of tables created without a primary key
+NATURAL_KEYS = {
+    "constructors_chronology": ["parentconstructorid", "positiondisplayorder"],
+    "drivers_family_relationships": ["parentdriverid", "positiondisplayorder"],
+    "seasons_constructor_standings": ["year", "positiondisplayorder"],
+    "seasons_driver_standings": ["year", "positiondisplayorder"],
+    "seasons_constructors": ["year", "constructorid"],
+    "seasons_drivers": ["year", "driverid"],
+    "seasons_engine_manufacturers": ["year", "enginemanufacturerid"],
+    "seasons_tyre_manufacturers": ["year", "tyremanufacturerid"],
+    "seasons_entrants": ["year", "entrantid"],
+    "seasons_entrants_constructors": ["year", "entrantid", "constructorid", "enginemanufacturerid"],
+    "seasons_entrants_chassis": ["year", "entrantid", "constructorid", "enginemanufacturerid", "chassisid"],
+    "seasons_entrants_engines": ["year", "entrantid", "constructorid", "enginemanufacturerid", "engineid"],
+    "seasons_entrants_tyre_manufacturers": ["year", "entrantid", "constructorid", "enginemanufacturerid", "tyremanufacturerid"],
+    "seasons_entrants_drivers": ["year", "entrantid", "constructorid", "enginemanufacturerid", "driverid"],
+}
+
+_SEPARATOR = "\x1f"
+_NULL = "\x00"
+
+
+def table_key(table: str, columns: List[str]) -> List[str]:
+    if table in PRIMARY_KEYS:
+        return PRIMARY_KEYS[table]
+    if table in NATURAL_KEYS:
+        return NATURAL_KEYS[table]
+    if "id" in columns:
+        return ["id"]
+    if table.startswith("races_"):
+        return ["raceid", "positiondisplayorder"]
+    # No known key: the whole row identifies itself (changes become delete + insert)
+    return columns
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(1 << 20):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def row_digest(row: Dict[str, Optional[str]], columns: List[str]) -> str:
+    text = _SEPARATOR.join(_NULL if row[c] is None else row[c] for c in columns)
+    return hashlib.blake2b(text.encode(), digest_size=8).hexdigest()
+
+
+def key_string(row: Dict[str, Optional[str]], key: List[str]) -> str:
+    return _SEPARATOR.join(_NULL if row[c] is None else row[c] for c in key)
+
+
+def key_values(key_str: str, key: List[str]) -> Dict[str, Optional[str]]:
+    return {c: (None if v == _NULL else v) for c, v in zip(key, key_str.split(_SEPARATOR))}
+
+
+def table_checksum(row_hashes: Dict[str, str]) -> str:
+    """Order-independent checksum of a table, from its manifest entry."""
+    digest = hashlib.sha256()
+    for key in sorted(row_hashes):
+        digest.update(f"{key}{_SEPARATOR}{row_hashes[key]}\n".encode())
+    return digest.hexdigest()
+
+
+def iter_rows(path: str) -> Iterator[Dict[str, Optional[str]]]:
+    for chunk in iter_csv_chunks(path, 5000):
+        yield from chunk
+
+
+def csv_columns(path: str) -> List[str]:
+    for chunk in iter_csv_chunks(path, 1):
+        return list(chunk[0])
+    return []
+
+
+# ── Manifest ─────────────────────────────────────────────────
+def load_manifest(path: str = MANIFEST_PATH) -> Dict[str, Any]:
+    if not os.path.exists(path):
+        return {"tables": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_manifest(manifest: Dict[str, Any], path: str = MANIFEST_PATH):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def snapshot_table(item: Dict[str, Any], data_dir: str) -> Dict[str, Any]:
+    """Manifest entry for the current CSV of a table."""
+    entry, _ = diff_table(item, {}, data_dir)
+    return entry
+
+
+def record_baseline(items: List[Dict[str, Any]], data_dir: str = DATA_DIR, manifest_path: str = MANIFEST_PATH):
+    """Record the CSVs as synced (after a full seed, or when the DB is known to match)."""
+    manifest = load_manifest(manifest_path)
+    for item in items:
+        if os.path.exists(os.path.join(data_dir, item["csv"])):
+            manifest["tables"][item["table"]] = snapshot_table(item, data_dir)
+    save_manifest(manifest, manifest_path)
+    print(f"📝 Baseline recorded for {len(items)} tables in {manifest_path}")
+
+
+def forget_tables(tables: List[str], manifest_path: str = MANIFEST_PATH):
+    """Drop tables from the manifest, so the next sync loads them in full (e.g. after a failed load)."""
+    manifest = load_manifest(manifest_path)
+    dropped = [table for table in tables if manifest["tables"].pop(table, None) is not None]
+    if dropped:
+        save_manifest(manifest, manifest_path)
+        print(f"📝 {', '.join(dropped)} removed from {manifest_path}; the next sync loads them in full")
+
+
+# ── Diff ─────────────────────────────────────────────────────
+def diff_table(item: Dict[str, Any], previous: Dict[str, Any], data_dir: str) -> Tuple[Dict[str, Any], Dict[str, List]]:
+    """
+    Compare the CSV of a table with its manifest entry.
+    Returns the new manifest entry and {"upsert": [rows], "changed": [keys], "delete": [keys]}.
+    """
+    path = os.path.join(data_dir, item["csv"])
+    columns = csv_columns(path)
+    key = table_key(item["table"], columns)
+    old_rows = previous.get("rows", {})
+    if old_rows and (previous.get("key") != key or previous.get("columns") != columns):
+        print(f"⚠️ {item['table']}: CSV columns changed since the last sync; every row is resent "
+              f"(reseed tables without a primary key to avoid duplicates)")
+        old_rows = {}
+
+    # F1DB repeats some keys (e.g. shared cars in results); the last row wins,
+    # as it does when the rows are upserted in file order
+    latest: Dict[str, Dict[str, Optional[str]]] = {}
+    for row in iter_rows(path):
+        latest[key_string(row, key)] = row
+
+    rows: Dict[str, str] = {}
+    upserts, changed = [], []
+    for k, row in latest.items():
+        h = rows[k] = row_digest(row, columns)
+        old = old_rows.get(k)
+        if old != h:
+            upserts.append(row)
+            if old is not None:
+                changed.append(k)
+    deleted = [k for k in old_rows if k not in rows]
+
+    entry = {
+        "csv": item["csv"],
+        "csv_sha256": file_digest(path),
+        "columns": columns,
+        "key": key,
+        "row_count": len(rows),
+        "checksum": table_checksum(rows),
+        "rows": rows,
+        "synced_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+    return entry, {"upsert": upserts, "changed": changed, "delete": deleted}
+
+
+# ── Apply ────────────────────────────────────────────────────
+def _delete_query(supabase, table: str, columns: List[str], values: tuple):
+    query = supabase.table(table).delete()
+    for column, value in zip(columns, values):
+        query = query.is_(column, "null") if value is None else query.eq(column, value)
+    return query
+
+
+def delete_keys(supabase, table: str, key: List[str], keys: List[str], retries: int):
+    """Delete rows by key: group on all but the last key column and use IN for the last one."""
+    groups: Dict[tuple, List[Optional[str]]] = defaultdict(list)
+    for k in keys:
+        values = key_values(k, key)
+        groups[tuple(values[c] for c in key[:-1])].append(values[key[-1]])
+
+    for prefix, last_values in groups.items():
+        for i in range(0, len(last_values), DELETE_CHUNK_SIZE):
+            batch = last_values[i:i + DELETE_CHUNK_SIZE]
+
+            def run():
+                non_null = [v for v in batch if v is not None]
+                if non_null:
+                    _delete_query(supabase, table, key[:-1], prefix).in_(key[-1], non_null).execute()
+                if len(non_null) < len(batch):
+                    _delete_query(supabase, table, key, prefix + (None,)).execute()
+
+            _with_retry(run, retries, f"delete from {table}")
+
+
+def write_rows(supabase, table: str, rows: List[Dict[str, Any]], upsert: bool, retries: int):
+    for i in range(0, len(rows), WRITE_CHUNK_SIZE):
+        chunk = rows[i:i + WRITE_CHUNK_SIZE]
+        if upsert:
+            _with_retry(lambda: supabase.table(table).upsert(chunk).execute(), retries, f"upsert into {table}")
+        else:
+            _with_retry(lambda: supabase.table(table).insert(chunk).execute(), retries, f"insert into {table}")
+
+
+def sync_tables(items: List[Dict[str, Any]], supabase, data_dir: str = DATA_DIR,
+                manifest_path: str = MANIFEST_PATH, retries: int = DEFAULT_RETRIES,
+                dry_run: bool = False) -> Dict[str, Any]:
+    """
+    Apply the difference between the CSVs and the manifest to the database.
+    Tables missing from the manifest are fully loaded (use --baseline first if
+    the database already holds them). Returns per-table change counts.
+    """
+    started = time.perf_counter()
+    manifest = load_manifest(manifest_path)
+    present = [item for item in items if os.path.exists(os.path.join(data_dir, item["csv"]))]
+
+    plans: Dict[str, Tuple[Dict[str, Any], Dict[str, Any], Dict[str, List]]] = {}
+    report: Dict[str, Any] = {}
+    for item in present:
+        table = item["table"]
+        previous = manifest["tables"].get(table, {})
+        if previous.get("csv_sha256") and previous["csv_sha256"] == file_digest(os.path.join(data_dir, item["csv"])):
+            report[table] = {"status": "unchanged"}
+            continue
+        entry, changes = diff_table(item, previous, data_dir)
+        plans[table] = (item, entry, changes)
+        report[table] = {
+            "status": "changed",
+            "inserted": len(changes["upsert"]) - len(changes["changed"]),
+            "updated": len(changes["changed"]),
+            "deleted": len(changes["delete"]),
+        }
+        print(f"🔎 {table}: +{report[table]['inserted']} ~{report[table]['updated']} -{report[table]['deleted']}")
+
+    if not dry_run and plans:
+        levels = dependency_levels([plans[t][0] for t in plans])
+        failed = set()
+
+        # Deletes first, children before parents
+        for level in reversed(levels):
+            for item in level:
+                table = item["table"]
+                _, entry, changes = plans[table]
+                has_pk = table in PRIMARY_KEYS
+                # Tables without a primary key are updated by delete + insert
+                to_delete = changes["delete"] + ([] if has_pk else changes["changed"])
+                try:
+                    if to_delete:
+                        delete_keys(supabase, table, entry["key"], to_delete, retries)
+                except Exception as e:
+                    print(f"   ❌ {table}: delete failed: {e}")
+                    failed.add(table)
+
+        # Then inserts/updates, parents before children
+        for level in levels:
+            for item in level:
+                table = item["table"]
+                if table in failed:
+                    continue
+                _, entry, changes = plans[table]
+                try:
+                    if changes["upsert"]:
+                        write_rows(supabase, table, changes["upsert"], table in PRIMARY_KEYS, retries)
+                except Exception as e:
+                    print(f"   ❌ {table}: write failed: {e}")
+                    failed.add(table)
+                    continue
+                manifest["tables"][table] = entry
+                save_manifest(manifest, manifest_path)
+
+        for table in failed:
+            report[table]["status"] = "failed"
+
+    seconds = time.perf_counter() - started
+    changed_rows = sum(r.get("inserted", 0) + r.get("updated", 0) + r.get("deleted", 0) for r in report.values())
+    print(f"🏁 {len(plans)} of {len(present)} tables changed, {changed_rows} rows in {seconds:.1f}s"
+          + (" (dry run)" if dry_run else ""))
+    return {"tables": report, "changed_rows": changed_rows, "seconds": round(seconds, 2), "dry_run": dry_run}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally sync F1DB CSVs into Supabase")
+    parser.add_argument("--tables-file", help="JSON list of {csv, table} (default: TABLES_ORDER from seed.py)")
+    parser.add_argument("--only", nargs="+", metavar="TABLE", help="Sync only these tables")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--manifest", default=MANIFEST_PATH)
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES)
+    parser.add_argument("--baseline", action="store_true", help="Record the current CSVs as synced and exit")
+    parser.add_argument("--dry-run", action="store_true", help="Only print the changes")
+    args = parser.parse_args()
+
+    load_dotenv()
+    if args.tables_file:
+        with open(args.tables_file) as f:
+            items = json.load(f)
+    else:
+        from seed import TABLES_ORDER
+        items = TABLES_ORDER
+    if args.only:
+        items = [item for item in items if item["table"] in args.only]
+
+    if args.baseline:
+        record_baseline(items, args.data_dir, args.manifest)
+        return
+
+    supabase = None
+    if not args.dry_run:
+        from seed import init_supabase
+        supabase = init_supabase()
+    report = sync_tables(items, supabase, args.data_dir, args.manifest, args.retries, args.dry_run)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Live timing ingest process.
+
+Owns the single upstream live feed connection (LIVE_FEED_SOURCE) and publishes
+the decoded payloads, plus the incremental analytics deltas computed from them,
+on the local live bus (LIVE_BUS_ADDRESS). Run it once,
+next to any number of uvicorn workers started with the same LIVE_BUS_ADDRESS:
+
+    LIVE_BUS_ADDRESS=unix:/tmp/motorsportp1-live.sock python live_ingest.py
+    LIVE_BUS_ADDRESS=unix:/tmp/motorsportp1-live.sock uvicorn main:app --workers 4
+
+Like a single worker, it only holds the upstream connection while someone is
+watching: web workers subscribe to the bus while they have WebSocket clients,
+and once no worker has been subscribed for LIVE_IDLE_GRACE_SECONDS the
+upstream is stopped (and the analytics reset) until the next one subscribes.
+"""
+
+import logging
+import threading
+import time
+
+from app.core.config import get_settings
+from app.core.live_bus import LiveBusPublisher
+from app.services.live_analytics import LiveAnalytics
+from app.services.live_feed_sources import ReconnectBackoff, build_feed_payload, create_feed_source_from_settings
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s: %(message)s")
+logger = logging.getLogger("LiveIngest")
+
+# How often the idle watchdog checks for subscribers
+IDLE_POLL_SECONDS = 1.0
+
+
+def stop_when_idle(publisher: LiveBusPublisher, source, grace: float):
+    """Stop `source` once no worker has been subscribed for `grace` seconds."""
+    idle_since = None
+    while not source.stopped:
+        if publisher.active_subscribers():
+            idle_since = None
+        elif idle_since is None:
+            idle_since = time.time()
+        elif time.time() - idle_since >= grace:
+            logger.info(f"No subscribers for {grace:.0f}s, stopping live feed")
+            source.stop()
+            return
+        time.sleep(IDLE_POLL_SECONDS)
+
+
+def main():
+    settings = get_settings()
+    if not settings.LIVE_BUS_ADDRESS:
+        raise SystemExit("LIVE_BUS_ADDRESS is not set")
+
+    publisher = LiveBusPublisher(settings.LIVE_BUS_ADDRESS)
+    publisher.start()
+
+    analytics = LiveAnalytics()
+
+    def on_message(msg):
+        if isinstance(msg, list):
+            payload = build_feed_payload(msg)
+            publisher.publish(payload)
+            changes = analytics.update(payload["data"])
+            if changes:
+                publisher.publish({"type": "analytics", "data": changes})
+
+    backoff = ReconnectBackoff(settings.LIVE_RECONNECT_BASE_SECONDS, settings.LIVE_RECONNECT_MAX_SECONDS)
+    try:
+        while True:
+            if not publisher.active_subscribers():
+                logger.info("Waiting for a web worker to subscribe")
+                publisher.wait_for_subscriber()
+
+            source = create_feed_source_from_settings(settings)
+            logger.info(f"Starting live feed source: {source.name}")
+            threading.Thread(
+                target=stop_when_idle, args=(publisher, source, settings.LIVE_IDLE_GRACE_SECONDS), daemon=True,
+            ).start()
+            started = time.time()
+            try:
+                source.run(on_message)
+                logger.info("Live feed source finished")
+            except Exception as e:
+                logger.error(f"Live feed source failed: {e}")
+            if source.stopped:
+                # Idle: the next subscriber may be watching another session
+                analytics.reset()
+                backoff = ReconnectBackoff(settings.LIVE_RECONNECT_BASE_SECONDS, settings.LIVE_RECONNECT_MAX_SECONDS)
+                continue
+            source.stop()  # ends this source's watchdog
+            delay = backoff.next_delay(time.time() - started)
+            logger.info(f"Restarting live feed source in {delay:.1f}s")
+            time.sleep(delay)
+    except KeyboardInterrupt:
+        logger.info("Exiting...")
+    finally:
+        publisher.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,62 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
+import asyncio
+import logging
 import os
+import sys
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+
+def _warm_analytics_stack():
+    """Import the FastF1/pandas services and enable the FastF1 cache ahead of the first request."""
+    try:
+        import app.services.session_service  # noqa: F401
+        import app.services.telemetry_service  # noqa: F401
+        from app.core.fastf1_client import ensure_cache
+        ensure_cache()
+    except Exception as e:
+        logger.error(f"Analytics warm-up failed: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    from app.core.config import get_settings
+
+    # Routers import the analytics stack lazily so the server accepts requests
+    # quickly after a cold start; warm it in a thread once we are up.
+    warmup = None
+    if get_settings().WARM_ANALYTICS_ON_STARTUP:
+        warmup = asyncio.create_task(asyncio.to_thread(_warm_analytics_stack))
+
+    yield
+
+    if warmup is not None:
+        await warmup
+
+    # Persist artifacts still queued by the cache write-behind
+    if "app.services.artifact_cache" in sys.modules:
+        from app.services.artifact_cache import flush_pending_writes
+        await asyncio.to_thread(flush_pending_writes)
+
+    # Close the upstream live feed and any open WebSockets on shutdown
+    # (only if live timing was ever used in this worker)
+    if "app.services.live_f1_service" in sys.modules:
+        from app.services.live_f1_service import live_f1_manager
+        await live_f1_manager.shutdown()
+
+
 app = FastAPI(
     title="Motorsport P1 — F1 Data API",
     description="REST API serving historical F1 data from Supabase (F1DB 1950–2025).",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS configuration
@@ -24,6 +71,21 @@ app.add_middleware(
 )
 
 
+# ── FastF1 session errors ────────────────────────────────────
+from app.core.session_errors import SessionUnavailableError  # noqa: E402
+
+
+@app.exception_handler(SessionUnavailableError)
+async def session_unavailable_handler(request: Request, exc: SessionUnavailableError):
+    """404 for sessions without data, 503 + Retry-After for ones worth retrying later."""
+    headers = {"Retry-After": str(exc.retry_after)} if exc.retry_after and exc.status_code == 503 else None
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": str(exc), "reason": exc.kind},
+        headers=headers,
+    )
+
+
 # ── Health check ──────────────────────────────────────────────
 @app.get("/", tags=["Health"])
 def read_root():
@@ -41,6 +103,14 @@ app.include_router(v1_router, prefix="/api/v1")
 if os.path.exists("media"):
     app.mount("/media", StaticFiles(directory="media"), name="media")
 
+# Resized WebP/AVIF variants built by media_derivatives.py; their file names
+# carry a content hash, so they are cached as immutable
+from app.core.config import get_settings  # noqa: E402
+from app.core.static_files import ImmutableStaticFiles  # noqa: E402
+
+if os.path.exists(get_settings().MEDIA_DERIVED_DIR):
+    app.mount("/media-derived", ImmutableStaticFiles(directory=get_settings().MEDIA_DERIVED_DIR), name="media-derived")
+
 
 if __name__ == "__main__":
     import uvicorn
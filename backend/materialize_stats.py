@@ -0,0 +1,281 @@
+"""
+Materialize career and per-season statistics for drivers and constructors.
+
+Run after seeding: seed.py calls it after a full load, or an incremental
+sync that changed one of the SOURCE_TABLES, as long as none of those failed
+to load. The aggregates are computed from the same F1DB CSVs the `results`,
+`qualifying`, `sprint_results`, `driver_standings` and
+`constructor_standings` tables are loaded from, and written to the summary
+tables of sql_scripts/08_career_stats.sql:
+
+- driver_season_stats / constructor_season_stats: one row per (id, year)
+- driver_career_stats / constructor_career_stats: one row per id
+
+The API (app/services/stats_service.py) then answers /drivers/{id}/stats and
+/constructors/{id}/stats with primary-key lookups instead of aggregating
+thousands of result rows per request.
+
+    python materialize_stats.py
+    python materialize_stats.py --dry-run     # compute and print a sample, write nothing
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+import pandas as pd
+from dotenv import load_dotenv
+
+DATA_DIR = "./data"
+DEFAULT_RETRIES = 4
+
+CSV_FILES = {
+    "results": "f1db-races-race-results.csv",
+    "sprint_results": "f1db-races-sprint-race-results.csv",
+    "qualifying": "f1db-races-qualifying-results.csv",
+    "driver_standings": "f1db-races-driver-standings.csv",
+    "constructor_standings": "f1db-races-constructor-standings.csv",
+}
+
+# Tables the statistics are computed from (the keys of CSV_FILES)
+SOURCE_TABLES = set(CSV_FILES)
+
+# Result rows of drivers who entered but never took the start
+NON_STARTS = {"DNQ", "DNPQ", "DNS", "DNP", "EX"}
+RETIREMENTS = {"DNF"}
+
+STATS_TABLES = {
+    ("driver", "season"): "driver_season_stats",
+    ("driver", "career"): "driver_career_stats",
+    ("constructor", "season"): "constructor_season_stats",
+    ("constructor", "career"): "constructor_career_stats",
+}
+ENTITY_COLUMNS = {"driver": "driverid", "constructor": "constructorid"}
+# Zero rather than NULL when there was nothing to count (e.g. no sprints)
+COUNT_COLUMNS = [
+    "entries", "starts", "race_wins", "one_twos", "podiums", "poles", "fastest_laps", "grand_slams",
+    "retirements", "laps", "race_points", "sprint_starts", "sprint_wins", "sprint_points", "championships",
+]
+
+
+def init_supabase():
+    from supabase import create_client
+    load_dotenv()
+    return create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+
+
+def _truthy(series: pd.Series) -> pd.Series:
+    return series.astype(str).str.lower().eq("true")
+
+
+def load_frames(data_dir: str = DATA_DIR) -> Dict[str, pd.DataFrame]:
+    """The five source CSVs with lowercased columns (as in the database) and derived flags."""
+    frames = {}
+    for name, csv_file in CSV_FILES.items():
+        df = pd.read_csv(os.path.join(data_dir, csv_file), low_memory=False)
+        df.columns = [c.lower() for c in df.columns]
+        frames[name] = df
+
+    for name in ("results", "sprint_results"):
+        df = frames[name]
+        text = df["positiontext"].astype(str)
+        df["started"] = ~text.isin(NON_STARTS)
+        df["retired"] = text.isin(RETIREMENTS)
+        df["win"] = df["positionnumber"].eq(1)
+        df["podium"] = df["positionnumber"].le(3)
+        for flag in ("poleposition", "fastestlap", "grandslam"):
+            df[flag] = _truthy(df[flag])
+        df["points"] = df["points"].fillna(0.0)
+        df["laps"] = df["laps"].fillna(0)
+
+    for name in ("driver_standings", "constructor_standings"):
+        df = frames[name]
+        df["championshipwon"] = _truthy(df["championshipwon"])
+    return frames
+
+
+# ── Aggregation ──────────────────────────────────────────────
+def _race_counts(results: pd.DataFrame, keys: List[str], entity: str) -> pd.DataFrame:
+    """Per-race counts; a race counts once per key even with shared cars or several entries."""
+    races = results.groupby(keys + ["raceid"]).agg(
+        started=("started", "any"),
+        win=("win", "any"),
+        two=("positionnumber", lambda s: bool((s == 2).any())),
+        pole=("poleposition", "any"),
+        fastest_lap=("fastestlap", "any"),
+        grand_slam=("grandslam", "any"),
+    )
+    races["one_two"] = races["win"] & races["two"]
+    counts = races.groupby(keys).agg(
+        entries=("started", "size"),
+        starts=("started", "sum"),
+        race_wins=("win", "sum"),
+        one_twos=("one_two", "sum"),
+        poles=("pole", "sum"),
+        fastest_laps=("fastest_lap", "sum"),
+        grand_slams=("grand_slam", "sum"),
+    )
+    # A driver's podium counts once per race, even when sharing cars; a
+    # constructor's once per podium place (shared cars share the place)
+    place = ["raceid"] if entity == "driver" else ["raceid", "positionnumber"]
+    podiums = results[results["podium"]].drop_duplicates(keys + place).groupby(keys).size()
+    counts["podiums"] = podiums.reindex(counts.index, fill_value=0)
+    if entity == "driver":
+        counts = counts.drop(columns="one_twos")
+    else:
+        # Shared fastest laps count for every car that set them
+        counts["fastest_laps"] = results.groupby(keys)["fastestlap"].sum()
+    return counts
+
+
+def _row_counts(results: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+    classified = results["positionnumber"].notna()
+    return results.assign(
+        finish=results["positionnumber"].where(classified),
+        grid=results["gridpositionnumber"],
+    ).groupby(keys).agg(
+        retirements=("retired", "sum"),
+        laps=("laps", "sum"),
+        race_points=("points", "sum"),
+        best_finish=("finish", "min"),
+        avg_finish=("finish", "mean"),
+        best_grid=("grid", "min"),
+    )
+
+
+def _sprint_counts(sprints: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+    sprint_starts = sprints[sprints["started"]].groupby(keys)["raceid"].nunique()
+    return sprints.groupby(keys).agg(
+        sprint_wins=("win", "sum"),
+        sprint_points=("points", "sum"),
+    ).join(sprint_starts.rename("sprint_starts"))
+
+
+def _qualifying_counts(qualifying: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+    return qualifying.groupby(keys).agg(
+        best_qualifying=("positionnumber", "min"),
+        avg_qualifying=("positionnumber", "mean"),
+    )
+
+
+def _final_standings(standings: pd.DataFrame, entity_col: str) -> pd.DataFrame:
+    """Standings after the last round of each season, one row per (entity, year)."""
+    last_round = standings.groupby("year")["round"].transform("max")
+    final = standings[standings["round"] == last_round]
+    # Constructors that scored with several engines in a season have one row per
+    # engine: keep the best place and add up the points
+    return final.groupby([entity_col, "year"]).agg(
+        championship_position=("positionnumber", "min"),
+        championship_points=("points", "sum"),
+        championship_won=("championshipwon", "any"),
+    )
+
+
+def aggregate(frames: Dict[str, pd.DataFrame], entity: str, scope: str) -> pd.DataFrame:
+    """Statistics of every driver or constructor, per season or over the whole career."""
+    entity_col = ENTITY_COLUMNS[entity]
+    keys = [entity_col, "year"] if scope == "season" else [entity_col]
+    results = frames["results"]
+
+    stats = _race_counts(results, keys, entity).join([
+        _row_counts(results, keys),
+        _sprint_counts(frames["sprint_results"], keys),
+        _qualifying_counts(frames["qualifying"], keys),
+    ], how="outer")
+
+    # Who they raced with: constructors of a driver, drivers of a constructor
+    other = "constructorid" if entity == "driver" else "driverid"
+    stats[f"{other[:-2]}_ids"] = results.groupby(keys)[other].agg(lambda s: sorted(s.dropna().unique()))
+
+    standings = _final_standings(frames[f"{entity}_standings"], entity_col)
+    if scope == "season":
+        stats = stats.join(standings, how="outer")
+    else:
+        by_entity = standings.reset_index().groupby(entity_col)
+        stats = stats.join(pd.DataFrame({
+            "seasons": results.groupby(entity_col)["year"].nunique(),
+            "first_year": results.groupby(entity_col)["year"].min(),
+            "last_year": results.groupby(entity_col)["year"].max(),
+            "championships": by_entity["championship_won"].sum(),
+            "best_championship_position": by_entity["championship_position"].min(),
+            "championship_points": by_entity["championship_points"].sum(),
+        }), how="outer")
+
+    counts = [c for c in COUNT_COLUMNS if c in stats.columns]
+    stats[counts] = stats[counts].fillna(0)
+    stats["points"] = stats["race_points"] + stats["sprint_points"]
+    for column in ("avg_finish", "avg_qualifying"):
+        stats[column] = stats[column].round(2)
+    stats = stats.reset_index().rename(columns={entity_col: f"{entity}_id"})
+    return stats
+
+
+# ── Output ───────────────────────────────────────────────────
+def _json_value(value: Any) -> Any:
+    if isinstance(value, list):
+        return value
+    if value is None or (isinstance(value, float) and math.isnan(value)) or value is pd.NA:
+        return None
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and value.is_integer():
+        return int(value) if abs(value) < 2 ** 31 else value
+    return value
+
+
+FLOAT_COLUMNS = {"race_points", "sprint_points", "points", "championship_points", "avg_finish", "avg_qualifying"}
+
+
+def to_rows(stats: pd.DataFrame, updated_at: str) -> List[Dict[str, Any]]:
+    rows = []
+    for record in stats.to_dict("records"):
+        row = {}
+        for column, value in record.items():
+            value = _json_value(value)
+            if column in FLOAT_COLUMNS and value is not None:
+                value = float(value)
+            row[column] = value
+        row["updated_at"] = updated_at
+        rows.append(row)
+    return rows
+
+
+def materialize(data_dir: str = DATA_DIR, supabase=None, dry_run: bool = False,
+                retries: int = DEFAULT_RETRIES) -> Dict[str, int]:
+    """Recompute every summary table and upsert it. Returns the row count per table."""
+    from f1db_sync import write_rows
+
+    started = time.perf_counter()
+    frames = load_frames(data_dir)
+    updated_at = datetime.now(timezone.utc).isoformat()
+    if not dry_run:
+        supabase = supabase or init_supabase()
+
+    summary = {}
+    for (entity, scope), table in STATS_TABLES.items():
+        rows = to_rows(aggregate(frames, entity, scope), updated_at)
+        summary[table] = len(rows)
+        if dry_run:
+            print(f"📊 {table}: {len(rows)} rows, e.g. {json.dumps(rows[-1])}")
+            continue
+        write_rows(supabase, table, rows, True, retries)
+        print(f"✅ {table}: {len(rows)} rows")
+
+    print(f"🏁 Estatísticas materializadas em {time.perf_counter() - started:.1f}s")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Materialize driver/constructor career and season statistics")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--dry-run", action="store_true", help="Compute only, print a sample row per table")
+    args = parser.parse_args()
+    materialize(args.data_dir, dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+Responsive derivatives of the local media/ tree.
+
+Every raster image under media/ (SVGs are left alone) is resized to the fixed
+WIDTHS and encoded as WebP and, when Pillow was built with it, AVIF:
+
+    media/drivers/lewis-hamilton/2025.png
+    => media_derived/drivers/lewis-hamilton/2025-640w.3f9a2c71be.webp
+
+- the hash in the file name is taken from the encoded bytes, so a derivative
+  URL never changes content and main.py serves media_derived/ at
+  /media-derived with a one-year immutable Cache-Control
+- images are never upscaled: widths above the original collapse into one
+  variant at the original width
+- media_derived_manifest.json maps every source path to its variants and is
+  what GET /api/v1/media/manifest returns. It changes on every run, so it is
+  kept next to media_derived/ rather than in it, where it would be served as
+  immutable too
+- sources whose SHA-256 and encoding settings match the manifest are skipped,
+  so re-running after adding a few photos only encodes those; derivatives no
+  longer referenced by the manifest are deleted
+
+    python media_derivatives.py
+    python media_derivatives.py --force            # re-encode everything
+    python media_derivatives.py --formats webp     # skip AVIF (much slower to encode)
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from media_sync import IMAGE_EXTENSIONS, file_sha256
+
+MEDIA_DIR = "./media"
+DERIVED_DIR = "./media_derived"
+MANIFEST_PATH = "./media_derived_manifest.json"
+# Where the manifest used to be written, inside DERIVED_DIR
+LEGACY_MANIFEST_NAME = "manifest.json"
+
+WIDTHS = (320, 640, 1280)
+FORMATS = ("avif", "webp")
+# Encoder quality per format; AVIF reaches WebP's visual quality at a lower setting
+QUALITY = {"webp": 80, "avif": 60}
+
+
+def available_formats(requested) -> List[str]:
+    from PIL import features
+
+    formats = []
+    for fmt in requested:
+        if features.check(fmt):
+            formats.append(fmt)
+        else:
+            print(f"⚠️ Pillow was built without {fmt.upper()} support, skipping it")
+    return formats
+
+
+def encoding_key(widths, formats) -> str:
+    """Identifies the settings a manifest entry was produced with."""
+    params = {"widths": sorted(widths), "formats": sorted(formats), "quality": {f: QUALITY[f] for f in formats}}
+    return hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()[:10]
+
+
+def target_widths(width: int, widths) -> List[int]:
+    return sorted({min(w, width) for w in widths})
+
+
+# ── Encoding (runs in worker processes) ──────────────────────
+def _open_image(path: str):
+    from PIL import Image, ImageOps
+
+    image = Image.open(path)
+    image.seek(0)
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ("P", "LA", "PA") or (image.mode == "RGB" and "transparency" in image.info):
+        image = image.convert("RGBA")
+    elif image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGB")
+    return image
+
+
+def _encode(image, fmt: str) -> bytes:
+    import io
+
+    buffer = io.BytesIO()
+    if fmt == "webp":
+        image.save(buffer, "WEBP", quality=QUALITY[fmt], method=6)
+    else:
+        image.save(buffer, "AVIF", quality=QUALITY[fmt])
+    return buffer.getvalue()
+
+
+def derive_asset(media_dir: str, derived_dir: str, rel: str, widths, formats) -> Dict[str, Any]:
+    """Write every variant of one source image and return its manifest entry."""
+    from PIL import Image
+
+    image = _open_image(os.path.join(media_dir, rel))
+    width, height = image.size
+    stem, _ = os.path.splitext(rel)
+    variants = []
+    for target in target_widths(width, widths):
+        if target == width:
+            resized = image
+        else:
+            resized = image.resize((target, max(1, round(height * target / width))), Image.LANCZOS)
+        for fmt in formats:
+            data = _encode(resized, fmt)
+            digest = hashlib.sha256(data).hexdigest()[:10]
+            path = f"{stem}-{target}w.{digest}.{fmt}"
+            full_path = os.path.join(derived_dir, path)
+            if not os.path.exists(full_path):
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                tmp = f"{full_path}.tmp"
+                with open(tmp, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, full_path)
+            variants.append({
+                "path": path,
+                "format": fmt,
+                "width": target,
+                "height": resized.size[1],
+                "bytes": len(data),
+            })
+    return {"width": width, "height": height, "variants": variants}
+
+
+# ── Manifest ─────────────────────────────────────────────────
+def load_manifest(path: str = MANIFEST_PATH, derived_dir: str = DERIVED_DIR) -> Dict[str, Any]:
+    if not os.path.exists(path):
+        # Manifests written before it moved out of derived_dir (pruned on the next run)
+        path = os.path.join(derived_dir, LEGACY_MANIFEST_NAME)
+        if not os.path.exists(path):
+            return {"assets": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_manifest(manifest: Dict[str, Any], path: str = MANIFEST_PATH):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def scan_sources(media_dir: str) -> Dict[str, Tuple[str, int]]:
+    """Raster images under media_dir as {relative path: (local path, size)}."""
+    sources = {}
+    for root, _, names in os.walk(media_dir):
+        for name in names:
+            lower = name.lower()
+            if not lower.endswith(IMAGE_EXTENSIONS) or lower.endswith(".svg"):
+                continue
+            local_path = os.path.join(root, name)
+            rel = os.path.relpath(local_path, media_dir).replace("\\", "/")
+            sources[rel] = (local_path, os.path.getsize(local_path))
+    return sources
+
+
+def prune_derived(derived_dir: str, assets: Dict[str, Dict[str, Any]]) -> int:
+    """Delete derivative files no manifest entry points to."""
+    keep = {v["path"] for entry in assets.values() for v in entry["variants"]}
+    removed = 0
+    for root, _, names in os.walk(derived_dir):
+        for name in names:
+            rel = os.path.relpath(os.path.join(root, name), derived_dir).replace("\\", "/")
+            if rel not in keep:
+                os.remove(os.path.join(root, name))
+                removed += 1
+    return removed
+
+
+def build_derivatives(media_dir: str = MEDIA_DIR, derived_dir: str = DERIVED_DIR, widths=WIDTHS,
+                      formats=FORMATS, force: bool = False, workers: Optional[int] = None,
+                      manifest_path: str = MANIFEST_PATH) -> Dict[str, Any]:
+    started = time.perf_counter()
+    if not os.path.exists(media_dir):
+        print(f"Pasta '{media_dir}' nao encontrada.")
+        return {}
+
+    formats = available_formats(formats)
+    key = encoding_key(widths, formats)
+    manifest = load_manifest(manifest_path, derived_dir)
+    previous = manifest.get("assets", {})
+
+    assets: Dict[str, Dict[str, Any]] = {}
+    pending: Dict[str, str] = {}
+    sources = scan_sources(media_dir)
+    for rel, (local_path, _) in sorted(sources.items()):
+        sha = file_sha256(local_path)
+        known = previous.get(rel)
+        if (not force and known and known["sha256"] == sha and known.get("encoding") == key
+                and all(os.path.exists(os.path.join(derived_dir, v["path"])) for v in known["variants"])):
+            assets[rel] = known
+        else:
+            pending[rel] = sha
+    print(f"🔎 {len(assets) + len(pending)} images: {len(pending)} to encode, {len(assets)} up to date")
+
+    failed: List[str] = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            rel: pool.submit(derive_asset, media_dir, derived_dir, rel, widths, formats)
+            for rel in pending
+        }
+        for rel, future in futures.items():
+            try:
+                entry = future.result()
+            except Exception as e:
+                print(f"❌ {rel}: {e}")
+                failed.append(rel)
+                # Keep the previous variants (if any) until the source can be read again
+                if rel in previous:
+                    assets[rel] = previous[rel]
+                continue
+            entry.update({"sha256": pending[rel], "encoding": key})
+            assets[rel] = entry
+            print(f"✅ {rel} -> {len(entry['variants'])} variants")
+
+    manifest = {"widths": sorted(widths), "formats": formats, "assets": assets}
+    os.makedirs(derived_dir, exist_ok=True)
+    save_manifest(manifest, manifest_path)
+    removed = prune_derived(derived_dir, assets)
+
+    source_bytes = sum(size for rel, (_, size) in sources.items() if rel in assets)
+    largest = sum(
+        max((v["bytes"] for v in entry["variants"] if v["format"] == "webp"), default=0)
+        for entry in assets.values()
+    )
+    seconds = time.perf_counter() - started
+    summary = {
+        "images": len(assets),
+        "encoded": len(pending) - len(failed),
+        "failed": len(failed),
+        "stale_removed": removed,
+        "source_mb": round(source_bytes / 1e6, 1),
+        "largest_webp_mb": round(largest / 1e6, 1),
+        "seconds": round(seconds, 2),
+    }
+    print(f"🏁 Finalizado em {seconds:.1f}s: {json.dumps(summary)}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=f"Build WebP/AVIF derivatives of {MEDIA_DIR}")
+    parser.add_argument("--media-dir", default=MEDIA_DIR)
+    parser.add_argument("--derived-dir", default=DERIVED_DIR)
+    parser.add_argument("--manifest", default=MANIFEST_PATH)
+    parser.add_argument("--widths", type=int, nargs="+", default=list(WIDTHS))
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--force", action="store_true", help="Re-encode every image")
+    parser.add_argument("--workers", type=int, default=None, help="Encoder processes (default: CPU count)")
+    args = parser.parse_args()
+
+    build_derivatives(args.media_dir, args.derived_dir, args.widths, args.formats, args.force, args.workers,
+                      args.manifest)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""
+Incremental sync of the local media/ tree to the Supabase Storage bucket.
+
+- media_sync_manifest.json records the SHA-256, size and mtime of every file
+  as last uploaded; files whose size and mtime are unchanged are not even
+  re-hashed, so an up-to-date tree costs one directory walk
+- the bucket is listed (folders concurrently) to find objects that are
+  missing, have a different size or the wrong content type
+- new, changed or mistyped files are uploaded on a bounded thread pool with
+  retries; the content type comes from the file extension
+- remote objects whose local file was deleted since the last sync are
+  removed; --prune also removes any other object that has no local file
+
+    python media_sync.py                 # sync
+    python media_sync.py --dry-run       # show what would change
+    python media_sync.py --force         # re-upload everything
+    python media_sync.py --prune         # also delete objects never synced from here
+    python media_sync.py --no-remote     # trust the manifest, skip listing the bucket
+"""
+
+import argparse
+import hashlib
+import json
+import mimetypes
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from bulk_loader import _with_retry
+
+BUCKET_NAME = "f1-media"
+MEDIA_DIR = "./media"
+MANIFEST_PATH = "./media_sync_manifest.json"
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RETRIES = 4
+CACHE_CONTROL = "3600"
+LIST_PAGE_SIZE = 1000
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.jfif', '.webp', '.avif', '.svg')
+# mimetypes does not know all of these on every platform
+CONTENT_TYPES = {
+    '.svg': 'image/svg+xml',
+    '.webp': 'image/webp',
+    '.avif': 'image/avif',
+    '.jfif': 'image/jpeg',
+}
+
+
+def init_supabase():
+    from supabase import create_client
+    load_dotenv()
+    return create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+
+
+def content_type_for(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext in CONTENT_TYPES:
+        return CONTENT_TYPES[ext]
+    guessed, _ = mimetypes.guess_type(path)
+    return guessed or "application/octet-stream"
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(1 << 20):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# ── Local state ──────────────────────────────────────────────
+def load_manifest(path: str = MANIFEST_PATH) -> Dict[str, Any]:
+    if not os.path.exists(path):
+        return {"bucket": BUCKET_NAME, "files": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_manifest(manifest: Dict[str, Any], path: str = MANIFEST_PATH):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def scan_local(media_dir: str, previous: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Every image under media_dir keyed by bucket path; hashes are reused while size and mtime match."""
+    files = {}
+    for root, _, names in os.walk(media_dir):
+        for name in names:
+            if not name.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            local_path = os.path.join(root, name)
+            # ./media/drivers/lewis-hamilton/2025.png => drivers/lewis-hamilton/2025.png
+            rel = os.path.relpath(local_path, media_dir).replace("\\", "/")
+            st = os.stat(local_path)
+            known = previous.get(rel)
+            if known and known["size"] == st.st_size and known["mtime_ns"] == st.st_mtime_ns:
+                sha = known["sha256"]
+            else:
+                sha = file_sha256(local_path)
+            files[rel] = {
+                "sha256": sha,
+                "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+                "content_type": content_type_for(name),
+            }
+    return files
+
+
+# ── Remote state ─────────────────────────────────────────────
+def _list_folder(bucket, prefix: str) -> List[Dict[str, Any]]:
+    items, offset = [], 0
+    while True:
+        page = bucket.list(prefix, {"limit": LIST_PAGE_SIZE, "offset": offset})
+        items.extend(page)
+        if len(page) < LIST_PAGE_SIZE:
+            return items
+        offset += LIST_PAGE_SIZE
+
+
+def list_remote(bucket, concurrency: int) -> Dict[str, Dict[str, Any]]:
+    """All objects in the bucket as {path: {"size", "content_type"}}, folders listed concurrently."""
+    objects: Dict[str, Dict[str, Any]] = {}
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        pending = [pool.submit(_list_folder, bucket, "")]
+        prefixes = [""]
+        while pending:
+            futures, folder_prefixes = pending, prefixes
+            pending, prefixes = [], []
+            for future, prefix in zip(futures, folder_prefixes):
+                for item in future.result():
+                    path = f"{prefix}{item['name']}"
+                    if item.get("id") is None:
+                        # Folders have no id
+                        pending.append(pool.submit(_list_folder, bucket, path))
+                        prefixes.append(f"{path}/")
+                    else:
+                        metadata = item.get("metadata") or {}
+                        objects[path] = {"size": metadata.get("size"), "content_type": metadata.get("mimetype")}
+    return objects
+
+
+# ── Sync ─────────────────────────────────────────────────────
+def plan_sync(local: Dict[str, Dict[str, Any]], synced: Dict[str, Dict[str, Any]],
+              remote: Optional[Dict[str, Dict[str, Any]]], force: bool, prune: bool) -> Dict[str, List[str]]:
+    uploads, retypes = [], []
+    for path, info in sorted(local.items()):
+        last = synced.get(path)
+        if force or last is None or last["sha256"] != info["sha256"]:
+            uploads.append(path)
+        elif remote is not None:
+            obj = remote.get(path)
+            if obj is None or (obj["size"] is not None and obj["size"] != info["size"]):
+                uploads.append(path)
+            elif obj["content_type"] != info["content_type"]:
+                retypes.append(path)
+
+    if remote is not None:
+        candidates = set(remote) if prune else set(remote) & set(synced)
+    else:
+        candidates = set(synced)
+    deletes = sorted(path for path in candidates if path not in local)
+    return {"upload": uploads, "retype": retypes, "delete": deletes}
+
+
+def _upload(bucket, media_dir: str, path: str, content_type: str, retries: int):
+    def run():
+        with open(os.path.join(media_dir, path), "rb") as f:
+            bucket.upload(
+                path=path,
+                file=f,
+                file_options={"cacheControl": CACHE_CONTROL, "upsert": "true", "contentType": content_type},
+            )
+    _with_retry(run, retries, f"upload {path}")
+
+
+def sync_media(media_dir: str = MEDIA_DIR, manifest_path: str = MANIFEST_PATH, force: bool = False,
+               prune: bool = False, remote_check: bool = True, dry_run: bool = False,
+               concurrency: int = DEFAULT_CONCURRENCY, retries: int = DEFAULT_RETRIES,
+               supabase=None) -> Dict[str, Any]:
+    started = time.perf_counter()
+    if not os.path.exists(media_dir):
+        print(f"Pasta '{media_dir}' nao encontrada.")
+        return {}
+
+    manifest = load_manifest(manifest_path)
+    synced = manifest["files"]
+    local = scan_local(media_dir, synced)
+
+    bucket = None
+    if remote_check or not dry_run:
+        supabase = supabase or init_supabase()
+        bucket = supabase.storage.from_(BUCKET_NAME)
+    remote = list_remote(bucket, concurrency) if remote_check else None
+
+    plan = plan_sync(local, synced, remote, force, prune)
+    print(f"🔎 {len(local)} local files: {len(plan['upload'])} to upload, "
+          f"{len(plan['retype'])} with a wrong content type, {len(plan['delete'])} orphaned")
+
+    failed: List[str] = []
+    if not dry_run:
+        to_send = plan["upload"] + plan["retype"]
+
+        def send(path: str):
+            try:
+                _upload(bucket, media_dir, path, local[path]["content_type"], retries)
+                print(f"✅ {path} ({local[path]['content_type']})")
+                return path, True
+            except Exception as e:
+                print(f"❌ Erro ao subir {path}: {e}")
+                return path, False
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for path, ok in pool.map(send, to_send):
+                if not ok:
+                    failed.append(path)
+
+        if plan["delete"]:
+            try:
+                # remove() takes a list, one request per batch
+                for i in range(0, len(plan["delete"]), 100):
+                    batch = plan["delete"][i:i + 100]
+                    _with_retry(lambda: bucket.remove(batch), retries, "remove orphans")
+                print(f"🗑️ {len(plan['delete'])} orphaned objects removed")
+            except Exception as e:
+                print(f"❌ Erro ao remover objetos: {e}")
+                failed.extend(plan["delete"])
+
+        # Failed paths keep their previous entry (or none), so the next run retries them
+        files = {path: info for path, info in local.items() if path not in failed}
+        files.update({path: synced[path] for path in failed if path in synced})
+        manifest["files"] = files
+        manifest["bucket"] = BUCKET_NAME
+        save_manifest(manifest, manifest_path)
+
+    seconds = time.perf_counter() - started
+    summary = {
+        "files": len(local),
+        "uploaded": len(plan["upload"]) - len([p for p in failed if p in plan["upload"]]),
+        "retyped": len(plan["retype"]) - len([p for p in failed if p in plan["retype"]]),
+        "deleted": len(plan["delete"]) - len([p for p in failed if p in plan["delete"]]),
+        "failed": len(failed),
+        "seconds": round(seconds, 2),
+        "dry_run": dry_run,
+    }
+    print(f"🏁 Finalizado em {seconds:.1f}s: {json.dumps(summary)}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=f"Sync {MEDIA_DIR} to the '{BUCKET_NAME}' bucket")
+    parser.add_argument("--media-dir", default=MEDIA_DIR)
+    parser.add_argument("--manifest", default=MANIFEST_PATH)
+    parser.add_argument("--force", action="store_true", help="Upload every file")
+    parser.add_argument("--prune", action="store_true", help="Delete every remote object without a local file")
+    parser.add_argument("--no-remote", action="store_true", help="Do not list the bucket; trust the manifest")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES)
+    args = parser.parse_args()
+
+    sync_media(
+        args.media_dir, args.manifest, force=args.force, prune=args.prune,
+        remote_check=not args.no_remote, dry_run=args.dry_run,
+        concurrency=args.concurrency, retries=args.retries,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,12 @@
 import os
+import sys
 import urllib.request
 import zipfile
-import pandas as pd
 from supabase import create_client, Client
 from dotenv import load_dotenv
+from bulk_loader import load_tables
+from f1db_sync import forget_tables, record_baseline, sync_tables
+from materialize_stats import SOURCE_TABLES, materialize
 
 # Configurações iniciais
 DATA_DIR = "./data"
@@ -50,50 +53,33 @@ def download_and_extract_data():
     print("✅ Extração concluída.")
 
 def process_and_upload(supabase: Client):
-    for item in TABLES_ORDER:
-        csv_file = os.path.join(DATA_DIR, item["csv"])
-        table_name = item["table"]
-        
-        if not os.path.exists(csv_file):
-            print(f"⚠️ Atenção: {csv_file} não encontrado. Pulando...")
-            continue
-            
-        print(f"🚀 Iniciando upload para tabela: {table_name}")
-        
-        # Lê o CSV padrão (F1DB usa campos vazios em vez de \N). low_memory evita warnings de mixed types.
-        df = pd.read_csv(csv_file, low_memory=False)
-        
-        # Converte para minúsculo pois no PostgreSQL as colunas não-entre-aspas viram lowercase
-        df.columns = df.columns.str.lower()
-        
-        # Converte para os melhores tipos (o Int64 permite inteiros com valores vazios, evitando virar float 469.0)
-        df = df.convert_dtypes()
-        
-        # Substitui pd.NA e NaN por None real para o JSON aceitar campos nulos
-        df = df.replace({pd.NA: None, float('nan'): None})
-        
-        records = df.to_dict(orient="records")
-        total_records = len(records)
-        print(f"📊 {total_records} registros carregados do CSV. Subindo para o Supabase em pedaços...")
-        
-        # Envia em chunks para evitar timeout na API do Supabase
-        chunk_size = 1000
-        for i in range(0, total_records, chunk_size):
-            chunk = records[i:i+chunk_size]
-            try:
-                # Usa upsert para não dar erro se tentar rodar novamente
-                supabase.table(table_name).upsert(chunk).execute()
-                print(f"   ⏳ {min(i+chunk_size, total_records)}/{total_records} inseridos...")
-            except Exception as e:
-                print(f"   ❌ Erro no bloco {i} a {i+chunk_size} na tabela {table_name}: {e}")
-                
-        print(f"✅ Tabela {table_name} finalizada!\n")
+    # Streaming em chunks, tabelas independentes em paralelo (respeitando as FKs)
+    # e COPY direto no Postgres quando DATABASE_URL estiver configurada
+    summary = load_tables(TABLES_ORDER, supabase, data_dir=DATA_DIR, database_url=os.getenv("DATABASE_URL"))
+    # Registra o estado carregado para que as próximas execuções com --incremental enviem só o que mudou,
+    # apenas das tabelas carregadas por completo; as que falharam serão enviadas inteiras na próxima vez
+    complete = set(summary["complete_tables"])
+    record_baseline([item for item in TABLES_ORDER if item["table"] in complete], DATA_DIR)
+    if summary["failed_tables"]:
+        print(f"⚠️ Tabelas com falhas: {', '.join(summary['failed_tables'])}")
+        forget_tables(summary["failed_tables"])
+    # Estatísticas de carreira/temporada pré-calculadas (ver materialize_stats.py), desde que
+    # as tabelas de origem tenham sido carregadas sem erros
+    if not SOURCE_TABLES & set(summary["failed_tables"]):
+        materialize(DATA_DIR, supabase)
 
 def main():
     print("🏎️  Motorsport P1 - Inicializando Carga Histórica da F1  🏎️\n")
     supabase = init_supabase()
     # download_and_extract_data() # Already downloaded
-    process_and_upload(supabase)
+    if "--incremental" in sys.argv:
+        # Só linhas inseridas, alteradas ou removidas desde a última carga (ver f1db_sync.py)
+        report = sync_tables(TABLES_ORDER, supabase, data_dir=DATA_DIR)
+        status = {table: report["tables"].get(table, {}).get("status") for table in SOURCE_TABLES}
+        if "changed" in status.values() and "failed" not in status.values():
+            materialize(DATA_DIR, supabase)
+    else:
+        process_and_upload(supabase)
     print("🎉 Setup e Extração Finalizados!")
 
 if __name__ == "__main__":
@@ -1,8 +1,10 @@
 import os
+import sys
 import json
-import pandas as pd
 from supabase import create_client, Client
 from dotenv import load_dotenv
+from bulk_loader import load_tables
+from f1db_sync import forget_tables, record_baseline, sync_tables
 
 DATA_DIR = "./data"
 
@@ -20,34 +22,13 @@ def process_and_upload(supabase: Client):
         tables_order = json.load(f)
         
     print(f"Encontradas {len(tables_order)} novas tabelas baseadas nos CSVs restantes.")
-    
-    for item in tables_order:
-        csv_file = os.path.join(DATA_DIR, item["csv"])
-        table_name = item["table"]
-        
-        if not os.path.exists(csv_file):
-            continue
-            
-        print(f"🚀 Subindo {table_name}...")
-        
-        df = pd.read_csv(csv_file, low_memory=False)
-        df.columns = df.columns.str.lower()
-        df = df.convert_dtypes()
-        df = df.replace({pd.NA: None, float('nan'): None})
-        
-        records = df.to_dict(orient="records")
-        total_records = len(records)
-        
-        chunk_size = 1000
-        for i in range(0, total_records, chunk_size):
-            chunk = records[i:i+chunk_size]
-            try:
-                supabase.table(table_name).upsert(chunk).execute()
-                print(f"   ⏳ {min(i+chunk_size, total_records)}/{total_records} inseridos...")
-            except Exception as e:
-                print(f"   ❌ Erro na tabela {table_name}: {e}")
-                
-        print(f"✅ Tabela {table_name} finalizada!\n")
+    if "--incremental" in sys.argv:
+        sync_tables(tables_order, supabase, data_dir=DATA_DIR)
+        return
+    summary = load_tables(tables_order, supabase, data_dir=DATA_DIR, database_url=os.getenv("DATABASE_URL"))
+    complete = set(summary["complete_tables"])
+    record_baseline([item for item in tables_order if item["table"] in complete], DATA_DIR)
+    forget_tables(summary["failed_tables"])
 
 if __name__ == "__main__":
     supabase = init_supabase()
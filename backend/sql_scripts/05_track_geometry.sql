@@ -0,0 +1,9 @@
+-- 05_track_geometry.sql
+-- Shared circuit outlines, one row per circuit layout (see track_geometry_service.py)
+
+CREATE TABLE IF NOT EXISTS public.track_geometry (
+    layout_key VARCHAR(255) PRIMARY KEY,   -- e.g. 'monza-5800' (venue + rounded lap length)
+    circuit VARCHAR(255),
+    data JSONB NOT NULL,                   -- polyline, per-point distance and simplified levels
+    created_at TIMESTAMPTZ DEFAULT now()
+);
@@ -0,0 +1,23 @@
+-- 06_fastf1_cache_versioning.sql
+-- Versioning and expiry for computed FastF1 artifacts (see app/services/artifact_cache.py)
+
+CREATE TABLE IF NOT EXISTS public.fastf1_cache (
+    id BIGSERIAL PRIMARY KEY,
+    year INTEGER NOT NULL,
+    round INTEGER NOT NULL,
+    session_name VARCHAR(16) NOT NULL,
+    data_type VARCHAR(255) NOT NULL,
+    data JSONB,
+    UNIQUE (year, round, session_name, data_type)
+);
+
+ALTER TABLE public.fastf1_cache
+    ADD COLUMN IF NOT EXISTS version VARCHAR(32),        -- version of the artifact type (versioned_artifact)
+    ADD COLUMN IF NOT EXISTS expires_at TIMESTAMPTZ,     -- NULL = permanent (session older than the fresh window)
+    ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT now();
+
+-- Purging expired rows and invalidating by type
+CREATE INDEX IF NOT EXISTS idx_fastf1_cache_expires_at
+    ON public.fastf1_cache (expires_at) WHERE expires_at IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_fastf1_cache_data_type
+    ON public.fastf1_cache (data_type);
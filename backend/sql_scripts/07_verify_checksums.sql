@@ -0,0 +1,92 @@
+-- 07_verify_checksums.sql
+-- Per-chunk content checksums of an F1DB table, called by verify_counts.py through RPC.
+--
+-- Rows are assigned to p_buckets chunks by the md5 of their key columns; each
+-- chunk reports its row count and the sum of the first 60 bits of md5(row).
+-- verify_counts.py computes the same values from the CSV, so a mismatching
+-- chunk pinpoints the rows that need to be re-synced.
+--
+-- Values are compared in a canonical text form per column kind, since the CSV
+-- text and Postgres' own output differ (13:00 vs 13:00:00, 325.430 vs 325.43):
+--
+--   number   trim_scale(value::numeric)                     325.43, 10, 0
+--   boolean  true / false
+--   time     seconds since midnight, as a number            46800, 3723.5
+--   date     YYYY-MM-DD
+--   text     the value itself
+--
+-- NULL is \N and values are joined with chr(31).
+
+CREATE OR REPLACE FUNCTION public.f1db_column_kinds(
+    p_table TEXT,
+    p_columns TEXT[]
+)
+RETURNS TABLE (column_name TEXT, kind TEXT)
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+AS $$
+    SELECT c.name,
+           CASE
+               WHEN t.typcategory = 'N' THEN 'number'
+               WHEN t.typcategory = 'B' THEN 'boolean'
+               WHEN t.typname IN ('time', 'timetz') THEN 'time'
+               WHEN t.typname = 'date' THEN 'date'
+               ELSE 'text'
+           END
+    FROM unnest(p_columns) WITH ORDINALITY AS c(name, position)
+    LEFT JOIN pg_attribute a
+           ON a.attrelid = format('public.%I', p_table)::regclass
+          AND a.attname = c.name
+          AND NOT a.attisdropped
+    LEFT JOIN pg_type t ON t.oid = a.atttypid
+    ORDER BY c.position;
+$$;
+
+CREATE OR REPLACE FUNCTION public.f1db_chunk_checksums(
+    p_table TEXT,
+    p_columns TEXT[],
+    p_key TEXT[],
+    p_buckets INTEGER
+)
+RETURNS TABLE (bucket INTEGER, row_count BIGINT, checksum TEXT)
+LANGUAGE plpgsql
+STABLE
+SECURITY INVOKER
+AS $$
+DECLARE
+    row_expr TEXT;
+    key_expr TEXT;
+BEGIN
+    WITH kinds AS (
+        SELECT k.column_name, k.kind, k.position
+        FROM public.f1db_column_kinds(p_table, p_columns || p_key) WITH ORDINALITY AS k(column_name, kind, position)
+    ),
+    canonical AS (
+        SELECT column_name, position, format('coalesce(%s, %L)',
+            CASE kind
+                WHEN 'number'  THEN format('trim_scale(%I::numeric)::text', column_name)
+                WHEN 'boolean' THEN format('CASE WHEN %I THEN ''true'' ELSE ''false'' END', column_name)
+                WHEN 'time'    THEN format('trim_scale(extract(epoch FROM %I)::numeric)::text', column_name)
+                WHEN 'date'    THEN format('to_char(%I, ''YYYY-MM-DD'')', column_name)
+                ELSE format('%I::text', column_name)
+            END, '\N') AS expr
+        FROM kinds
+    )
+    SELECT
+        (SELECT string_agg(expr, ' || chr(31) || ' ORDER BY position)
+           FROM canonical WHERE position <= cardinality(p_columns)),
+        (SELECT string_agg(expr, ' || chr(31) || ' ORDER BY position)
+           FROM canonical WHERE position > cardinality(p_columns))
+      INTO row_expr, key_expr;
+
+    RETURN QUERY EXECUTE format(
+        'SELECT ((''x'' || substr(md5(%s), 1, 8))::bit(32)::bigint %% %s)::int AS bucket,
+                count(*)::bigint AS row_count,
+                sum((''x'' || substr(md5(%s), 1, 15))::bit(60)::bigint)::text AS checksum
+         FROM public.%I
+         GROUP BY 1',
+        key_expr, greatest(p_buckets, 1), row_expr, p_table
+    );
+END;
+$$;
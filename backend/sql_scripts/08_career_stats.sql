@@ -0,0 +1,130 @@
+-- 08_career_stats.sql
+-- Precomputed driver/constructor statistics, written by materialize_stats.py after
+-- seeding and read by app/services/stats_service.py.
+--
+-- points = race + sprint points scored by the entity's cars; championship_points
+-- are the official totals from the final standings (after dropped scores).
+
+CREATE TABLE IF NOT EXISTS public.driver_season_stats (
+    driver_id VARCHAR(255) REFERENCES public.drivers(id),
+    year INT,
+    constructor_ids TEXT[],
+    entries INT NOT NULL DEFAULT 0,
+    starts INT NOT NULL DEFAULT 0,
+    race_wins INT NOT NULL DEFAULT 0,
+    podiums INT NOT NULL DEFAULT 0,
+    poles INT NOT NULL DEFAULT 0,
+    fastest_laps INT NOT NULL DEFAULT 0,
+    grand_slams INT NOT NULL DEFAULT 0,
+    retirements INT NOT NULL DEFAULT 0,
+    laps INT NOT NULL DEFAULT 0,
+    race_points FLOAT NOT NULL DEFAULT 0,
+    sprint_starts INT NOT NULL DEFAULT 0,
+    sprint_wins INT NOT NULL DEFAULT 0,
+    sprint_points FLOAT NOT NULL DEFAULT 0,
+    points FLOAT NOT NULL DEFAULT 0,
+    best_finish INT,
+    avg_finish FLOAT,                      -- classified finishes only
+    best_grid INT,
+    best_qualifying INT,
+    avg_qualifying FLOAT,
+    championship_position INT,
+    championship_points FLOAT,
+    championship_won BOOLEAN,
+    updated_at TIMESTAMPTZ DEFAULT now(),
+    PRIMARY KEY (driver_id, year)
+);
+
+CREATE TABLE IF NOT EXISTS public.driver_career_stats (
+    driver_id VARCHAR(255) PRIMARY KEY REFERENCES public.drivers(id),
+    constructor_ids TEXT[],
+    seasons INT NOT NULL DEFAULT 0,
+    first_year INT,
+    last_year INT,
+    entries INT NOT NULL DEFAULT 0,
+    starts INT NOT NULL DEFAULT 0,
+    race_wins INT NOT NULL DEFAULT 0,
+    podiums INT NOT NULL DEFAULT 0,
+    poles INT NOT NULL DEFAULT 0,
+    fastest_laps INT NOT NULL DEFAULT 0,
+    grand_slams INT NOT NULL DEFAULT 0,
+    retirements INT NOT NULL DEFAULT 0,
+    laps INT NOT NULL DEFAULT 0,
+    race_points FLOAT NOT NULL DEFAULT 0,
+    sprint_starts INT NOT NULL DEFAULT 0,
+    sprint_wins INT NOT NULL DEFAULT 0,
+    sprint_points FLOAT NOT NULL DEFAULT 0,
+    points FLOAT NOT NULL DEFAULT 0,
+    best_finish INT,
+    avg_finish FLOAT,
+    best_grid INT,
+    best_qualifying INT,
+    avg_qualifying FLOAT,
+    championships INT NOT NULL DEFAULT 0,
+    best_championship_position INT,
+    championship_points FLOAT,
+    updated_at TIMESTAMPTZ DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS public.constructor_season_stats (
+    constructor_id VARCHAR(255) REFERENCES public.constructors(id),
+    year INT,
+    driver_ids TEXT[],
+    entries INT NOT NULL DEFAULT 0,        -- races entered (not cars)
+    starts INT NOT NULL DEFAULT 0,
+    race_wins INT NOT NULL DEFAULT 0,
+    one_twos INT NOT NULL DEFAULT 0,
+    podiums INT NOT NULL DEFAULT 0,        -- podium places, so a 1-2 counts twice
+    poles INT NOT NULL DEFAULT 0,
+    fastest_laps INT NOT NULL DEFAULT 0,
+    grand_slams INT NOT NULL DEFAULT 0,
+    retirements INT NOT NULL DEFAULT 0,
+    laps INT NOT NULL DEFAULT 0,
+    race_points FLOAT NOT NULL DEFAULT 0,
+    sprint_starts INT NOT NULL DEFAULT 0,
+    sprint_wins INT NOT NULL DEFAULT 0,
+    sprint_points FLOAT NOT NULL DEFAULT 0,
+    points FLOAT NOT NULL DEFAULT 0,
+    best_finish INT,
+    avg_finish FLOAT,
+    best_grid INT,
+    best_qualifying INT,
+    avg_qualifying FLOAT,
+    championship_position INT,             -- NULL before 1958
+    championship_points FLOAT,
+    championship_won BOOLEAN,
+    updated_at TIMESTAMPTZ DEFAULT now(),
+    PRIMARY KEY (constructor_id, year)
+);
+
+CREATE TABLE IF NOT EXISTS public.constructor_career_stats (
+    constructor_id VARCHAR(255) PRIMARY KEY REFERENCES public.constructors(id),
+    driver_ids TEXT[],
+    seasons INT NOT NULL DEFAULT 0,
+    first_year INT,
+    last_year INT,
+    entries INT NOT NULL DEFAULT 0,
+    starts INT NOT NULL DEFAULT 0,
+    race_wins INT NOT NULL DEFAULT 0,
+    one_twos INT NOT NULL DEFAULT 0,
+    podiums INT NOT NULL DEFAULT 0,
+    poles INT NOT NULL DEFAULT 0,
+    fastest_laps INT NOT NULL DEFAULT 0,
+    grand_slams INT NOT NULL DEFAULT 0,
+    retirements INT NOT NULL DEFAULT 0,
+    laps INT NOT NULL DEFAULT 0,
+    race_points FLOAT NOT NULL DEFAULT 0,
+    sprint_starts INT NOT NULL DEFAULT 0,
+    sprint_wins INT NOT NULL DEFAULT 0,
+    sprint_points FLOAT NOT NULL DEFAULT 0,
+    points FLOAT NOT NULL DEFAULT 0,
+    best_finish INT,
+    avg_finish FLOAT,
+    best_grid INT,
+    best_qualifying INT,
+    avg_qualifying FLOAT,
+    championships INT NOT NULL DEFAULT 0,
+    best_championship_position INT,
+    championship_points FLOAT,
+    updated_at TIMESTAMPTZ DEFAULT now()
+);
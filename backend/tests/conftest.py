@@ -0,0 +1,220 @@
+import csv
+import os
+import re
+import sys
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# Settings() requires these; the unit tests never reach Supabase
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_KEY", "test")
+os.environ.setdefault("WARM_ANALYTICS_ON_STARTUP", "false")
+
+import pandas as pd  # noqa: E402
+import pytest  # noqa: E402
+
+
+@pytest.fixture
+def write_csv(tmp_path):
+    """write_csv("name.csv", header, rows) -> path of a CSV in a temp directory."""
+
+    def write(name, header, rows):
+        path = tmp_path / name
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+        return str(path)
+
+    return write
+
+
+# ── Supabase ─────────────────────────────────────────────────
+def _like(pattern: str):
+    """PostgREST LIKE pattern ('*' or '%' any run, '_' one character, backslash escapes) as a regex."""
+    out, chars = [], iter(pattern)
+    for ch in chars:
+        if ch == "\\":
+            out.append(re.escape(next(chars, "")))
+        elif ch in "*%":
+            out.append(".*")
+        elif ch == "_":
+            out.append(".")
+        else:
+            out.append(re.escape(ch))
+    return re.compile("".join(out) + r"\Z", re.S)
+
+
+_FILTERS = {
+    "eq": lambda value, arg: value == arg,
+    "neq": lambda value, arg: value != arg,
+    "gt": lambda value, arg: value is not None and value > arg,
+    "gte": lambda value, arg: value is not None and value >= arg,
+    "lt": lambda value, arg: value is not None and value < arg,
+    "lte": lambda value, arg: value is not None and value <= arg,
+    "in_": lambda value, arg: value in arg,
+    "is_": lambda value, arg: value is None if arg == "null" else value is arg,
+    "like": lambda value, arg: value is not None and _like(arg).match(str(value)) is not None,
+}
+
+
+class FakeQuery:
+    def __init__(self, db, table: str):
+        self.db = db
+        self.table = table
+        self.action = None
+        self.payload: List[Dict[str, Any]] = []
+        self.filters: List[tuple] = []
+        self.row_limit = None
+
+    def select(self, *columns, **kwargs):
+        self.action = "select"
+        return self
+
+    def upsert(self, rows, **kwargs):
+        self.action, self.payload = "upsert", list(rows)
+        return self
+
+    def insert(self, rows, **kwargs):
+        self.action, self.payload = "insert", list(rows)
+        return self
+
+    def delete(self):
+        self.action = "delete"
+        return self
+
+    def limit(self, n):
+        self.row_limit = n
+        return self
+
+    def __getattr__(self, name):
+        if name not in _FILTERS:
+            raise AttributeError(name)
+
+        def add(column, value):
+            self.filters.append((name, column, value))
+            return self
+        return add
+
+    def matches(self, row) -> bool:
+        return all(_FILTERS[op](row.get(column), value) for op, column, value in self.filters)
+
+    def execute(self):
+        self.db.queries.append(self)
+        if self.table in self.db.failing:
+            raise RuntimeError(f"{self.table} unavailable")
+        rows = self.db.tables.setdefault(self.table, [])
+        if self.action == "select":
+            data = [row for row in rows if self.matches(row)][:self.row_limit]
+        elif self.action == "delete":
+            if not self.filters:
+                # Supabase runs PostgREST with pg_safeupdate
+                raise RuntimeError("DELETE requires a WHERE clause")
+            data = [row for row in rows if self.matches(row)]
+            rows[:] = [row for row in rows if not self.matches(row)]
+        else:
+            key = self.db.keys.get(self.table)
+            if self.action == "upsert" and key:
+                new = {tuple(row[c] for c in key) for row in self.payload}
+                if len(new) != len(self.payload):
+                    raise RuntimeError("ON CONFLICT DO UPDATE command cannot affect row a second time")
+                rows[:] = [row for row in rows if tuple(row[c] for c in key) not in new]
+            rows.extend(self.payload)
+            data = self.payload
+        return SimpleNamespace(data=data, count=len(data))
+
+
+class FakeSupabase:
+    """
+    In-memory stand-in for the Supabase client: tables are lists of row dicts,
+    every executed query is kept in `queries`. Upserts replace rows by the
+    table's key in `keys`; tables in `failing` raise on every request.
+    """
+
+    def __init__(self, tables=None, keys=None, failing=()):
+        self.tables: Dict[str, List[Dict[str, Any]]] = {name: list(rows) for name, rows in (tables or {}).items()}
+        self.keys: Dict[str, List[str]] = dict(keys or {})
+        self.failing = set(failing)
+        self.queries: List[FakeQuery] = []
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    from_ = table
+
+    def executed(self, action: Optional[str] = None, table: Optional[str] = None) -> List[FakeQuery]:
+        return [q for q in self.queries if (action is None or q.action == action) and (table is None or q.table == table)]
+
+
+@pytest.fixture
+def fake_supabase():
+    """fake_supabase(tables=None, keys=None, failing=()) -> FakeSupabase."""
+    return FakeSupabase
+
+
+# ── FastF1 sessions ──────────────────────────────────────────
+class FakeLap(dict):
+    """A lap row (LapTime, Compound, sector times...) whose telemetry is a prepared DataFrame."""
+
+    def __init__(self, telemetry: Optional[pd.DataFrame] = None, lap_seconds: Optional[float] = None, **fields):
+        if lap_seconds is None and telemetry is not None:
+            lap_seconds = float(telemetry["Time"].iloc[-1].total_seconds())
+        super().__init__({
+            "LapTime": pd.Timedelta(seconds=lap_seconds) if lap_seconds is not None else pd.NaT,
+            "Compound": "SOFT",
+            "TyreLife": 1.0,
+            "Sector1Time": pd.NaT,
+            "Sector2Time": pd.NaT,
+            "Sector3Time": pd.NaT,
+            **fields,
+        })
+        self.telemetry = telemetry
+
+    def get_telemetry(self) -> pd.DataFrame:
+        return self.telemetry
+
+
+class FakeLaps:
+    """The part of fastf1's Laps the services use, with one lap per driver."""
+
+    def __init__(self, laps: Dict[str, FakeLap]):
+        self.laps = laps
+        self.empty = not laps
+
+    def __getitem__(self, column):
+        return pd.Series(list(self.laps), dtype=object)
+
+    def pick_drivers(self, driver):
+        return FakeLaps({driver: self.laps[driver]} if driver in self.laps else {})
+
+    def pick_fastest(self):
+        timed = [lap for lap in self.laps.values() if not pd.isna(lap["LapTime"])]
+        return min(timed, key=lambda lap: lap["LapTime"]) if timed else None
+
+
+class FakeSession:
+    def __init__(self, laps: Dict[str, FakeLap], event: Optional[Dict[str, Any]] = None):
+        self.laps = FakeLaps(laps)
+        self.event = event or {}
+
+
+def telemetry_frame(distance, seconds, **channels) -> pd.DataFrame:
+    """Lap telemetry with Distance (m), Time (s, as timedeltas) and any other channels."""
+    return pd.DataFrame({"Distance": distance, "Time": pd.to_timedelta(seconds, unit="s"), **channels})
+
+
+@pytest.fixture
+def fake_session():
+    """fake_session({driver: FakeLap or telemetry DataFrame}, event=None) -> session stub."""
+
+    def make(laps: Dict[str, Any], event: Optional[Dict[str, Any]] = None):
+        laps = {d: lap if isinstance(lap, FakeLap) else FakeLap(lap) for d, lap in laps.items()}
+        return FakeSession(laps, event)
+
+    make.lap = FakeLap
+    make.telemetry = telemetry_frame
+    return make
@@ -0,0 +1,86 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from app.services import artifact_cache
+from app.services.artifact_cache import _is_valid, _like_escape, artifact_version, versioned_artifact
+
+
+@pytest.fixture
+def versions(monkeypatch):
+    monkeypatch.setattr(artifact_cache, "ARTIFACT_VERSIONS", {})
+    versioned_artifact("laps", version=1)(lambda: None)
+    versioned_artifact("laps_summary", version=4)(lambda: None)
+
+
+def test_artifact_version_uses_the_longest_registered_prefix(versions):
+    assert artifact_version("laps") == "1"
+    assert artifact_version("laps_VER") == "1"
+    assert artifact_version("laps_summary_2") == "4"
+    assert artifact_version("lapsXsummary") is None
+
+
+def test_rows_of_another_version_or_expired_are_misses(versions):
+    future = (datetime.now(timezone.utc) + timedelta(hours=1)).isoformat()
+    past = (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat()
+    assert _is_valid({"data_type": "laps_VER", "version": "1", "expires_at": None})
+    assert _is_valid({"data_type": "laps_VER", "version": "1", "expires_at": future})
+    assert not _is_valid({"data_type": "laps_VER", "version": "1", "expires_at": past})
+    # Bumping the version turns every existing row into a miss
+    versioned_artifact("laps", version=2)(lambda: None)
+    assert not _is_valid({"data_type": "laps_VER", "version": "1", "expires_at": None})
+
+
+def test_like_escape():
+    assert _like_escape("all_laps") == "all\\_laps"
+    assert _like_escape("50%\\") == "50\\%\\\\"
+
+
+def cache_row(data_type, year=2024, round=1, session_name="R"):
+    return {"year": year, "round": round, "session_name": session_name, "data_type": data_type}
+
+
+def test_invalidate_deletes_the_type_and_its_escaped_variants(monkeypatch, fake_supabase):
+    db = fake_supabase({"fastf1_cache": [
+        cache_row("all_laps"), cache_row("all_laps_VER"), cache_row("allXlaps_VER"),
+        cache_row("all_laps", round=2),
+    ]})
+    monkeypatch.setattr(artifact_cache, "get_supabase", lambda: db)
+
+    assert artifact_cache.invalidate_cached(2024, 1, "R", "all_laps") == 2
+    assert db.tables["fastf1_cache"] == [cache_row("allXlaps_VER"), cache_row("all_laps", round=2)]
+
+
+def test_event_date_is_read_again_after_its_ttl(monkeypatch, fake_supabase):
+    db = fake_supabase({"races": [{"year": 2024, "round": 1, "date": "2024-03-02"}]})
+    clock = [1000.0]
+    monkeypatch.setattr(artifact_cache, "get_supabase", lambda: db)
+    monkeypatch.setattr(artifact_cache.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(artifact_cache, "_EVENT_DATES", {})
+
+    assert artifact_cache._event_date(2024, 1) == date(2024, 3, 2)
+    assert artifact_cache._event_date(2024, 1) == date(2024, 3, 2)
+    assert len(db.executed("select", "races")) == 1
+
+    # Rescheduled race: the new date is picked up once the memo expires
+    db.tables["races"][0]["date"] = "2024-03-09"
+    clock[0] += artifact_cache.EVENT_DATE_TTL_SECONDS + 1
+    assert artifact_cache._event_date(2024, 1) == date(2024, 3, 9)
+    assert len(db.executed("select", "races")) == 2
+
+
+def test_invalidate_everything(monkeypatch, fake_supabase):
+    db = fake_supabase({"fastf1_cache": [cache_row("stints"), cache_row("laps", year=2023, session_name="Q")]})
+    monkeypatch.setattr(artifact_cache, "get_supabase", lambda: db)
+
+    # The fake rejects an unfiltered DELETE, like Supabase's pg_safeupdate
+    assert artifact_cache.invalidate_cached() == 2
+    assert db.tables["fastf1_cache"] == []
+
+
+def test_invalidate_a_type_across_sessions(monkeypatch, fake_supabase):
+    db = fake_supabase({"fastf1_cache": [cache_row("stints"), cache_row("stints", year=2023), cache_row("laps")]})
+    monkeypatch.setattr(artifact_cache, "get_supabase", lambda: db)
+
+    assert artifact_cache.invalidate_cached(data_type="stints") == 2
+    assert db.tables["fastf1_cache"] == [cache_row("laps")]
@@ -0,0 +1,106 @@
+import sys
+import types
+
+import pytest
+
+from bulk_loader import PRIMARY_KEYS, LoadStats, count_csv_rows, dependency_levels, iter_csv_chunks, load_tables, superseded_rows
+
+
+RESULTS_HEADER = ["raceId", "driverId", "positionText"]
+RESULTS_ROWS = [
+    ["1", "hamilton", "1"],
+    ["1", "verstappen", "2"],
+    # Shared car: the same key again, the last row wins
+    ["1", "hamilton", "DSQ"],
+    ["2", "hamilton", ""],
+]
+
+
+def test_superseded_rows_keeps_last_occurrence(write_csv):
+    path = write_csv("results.csv", RESULTS_HEADER, RESULTS_ROWS)
+    assert superseded_rows(path, ["raceid", "driverid"]) == {0}
+
+
+def test_iter_csv_chunks_lowercases_nulls_and_skips(write_csv):
+    path = write_csv("results.csv", RESULTS_HEADER, RESULTS_ROWS)
+    chunks = list(iter_csv_chunks(path, 2, skip={0}))
+    assert [len(c) for c in chunks] == [2, 1]
+    assert chunks[0][0] == {"raceid": "1", "driverid": "verstappen", "positiontext": "2"}
+    assert chunks[1][0]["positiontext"] is None
+
+
+def test_count_csv_rows(write_csv):
+    assert count_csv_rows(write_csv("results.csv", RESULTS_HEADER, RESULTS_ROWS)) == 4
+    assert count_csv_rows(write_csv("empty.csv", RESULTS_HEADER, [])) == 0
+
+
+def test_dependency_levels_put_parents_first():
+    items = [{"table": "results"}, {"table": "races"}, {"table": "drivers"}, {"table": "circuits"}]
+    levels = [[item["table"] for item in level] for level in dependency_levels(items)]
+    flat = [table for level in levels for table in level]
+    assert flat.index("circuits") < flat.index("races") < flat.index("results")
+    assert flat.index("drivers") < flat.index("results")
+
+
+def test_report_splits_complete_and_failed_tables():
+    stats = LoadStats()
+    for table in ("races", "results"):
+        stats.start(table)
+    stats.add("races", 10)
+    stats.add("results", 5)
+    stats.add("results", 3, failed=True)
+    report = stats.report(1.0)
+    assert report["rows"] == 15
+    assert report["failed_rows"] == 3
+    assert report["complete_tables"] == ["races"]
+    assert report["failed_tables"] == ["results"]
+
+
+def test_rest_load_drops_repeated_keys(write_csv, tmp_path, fake_supabase):
+    write_csv("results.csv", RESULTS_HEADER, RESULTS_ROWS)
+    # Like Postgres, the fake rejects an upsert that touches a key twice
+    db = fake_supabase(keys=PRIMARY_KEYS)
+    summary = load_tables([{"csv": "results.csv", "table": "results"}], db, data_dir=str(tmp_path),
+                          chunk_size=10, retries=0)
+
+    assert summary["method"] == "rest"
+    assert summary["rows"] == 3
+    assert summary["complete_tables"] == ["results"]
+    loaded = {(r["raceid"], r["driverid"]): r["positiontext"] for r in db.tables["results"]}
+    assert loaded == {("1", "hamilton"): "DSQ", ("1", "verstappen"): "2", ("2", "hamilton"): None}
+
+
+def test_rest_load_reports_failed_table(write_csv, tmp_path, fake_supabase):
+    write_csv("races.csv", ["id", "year"], [["1", "2024"], ["2", "2024"]])
+    write_csv("results.csv", RESULTS_HEADER, RESULTS_ROWS)
+    db = fake_supabase(keys=PRIMARY_KEYS, failing={"results"})
+    summary = load_tables(
+        [{"csv": "races.csv", "table": "races"}, {"csv": "results.csv", "table": "results"}],
+        db, data_dir=str(tmp_path), retries=0,
+    )
+
+    assert summary["complete_tables"] == ["races"]
+    assert summary["failed_tables"] == ["results"]
+    assert summary["failed_rows"] == 3
+
+
+def test_copy_failure_counts_every_csv_row_as_failed(write_csv, tmp_path, monkeypatch):
+    write_csv("results.csv", RESULTS_HEADER, RESULTS_ROWS)
+
+    def connect(*args, **kwargs):
+        raise OSError("connection refused")
+
+    monkeypatch.setitem(sys.modules, "psycopg", types.SimpleNamespace(connect=connect, sql=None))
+    summary = load_tables([{"csv": "results.csv", "table": "results"}], data_dir=str(tmp_path),
+                          retries=0, database_url="postgresql://localhost/f1")
+
+    assert summary["method"] == "copy"
+    assert summary["rows"] == 0
+    # The whole table is rolled back, so every row of the CSV counts as failed
+    assert summary["failed_rows"] == 4
+    assert summary["failed_tables"] == ["results"]
+
+
+def test_rest_requires_a_client(tmp_path):
+    with pytest.raises(ValueError):
+        load_tables([], data_dir=str(tmp_path))
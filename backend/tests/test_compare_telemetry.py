@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from app.services import telemetry_service
+
+
+def lap_telemetry(fake_session, lap_seconds, distance_scale=1.0, length=5000.0):
+    distance = np.linspace(0.0, length, 801)
+    # Constant-speed lap; the shape does not matter for the delta
+    seconds = distance / length * lap_seconds
+    n = len(distance)
+    return fake_session.telemetry(
+        distance * distance_scale, seconds,
+        Speed=np.full(n, 200.0), RPM=np.full(n, 11000.0), Throttle=np.full(n, 100.0),
+        X=distance, Y=np.zeros(n), nGear=np.full(n, 7), Brake=np.zeros(n, dtype=bool),
+    )
+
+
+@pytest.fixture
+def compare(monkeypatch, fake_session):
+    def run(laps, **kwargs):
+        session = fake_session(laps)
+        monkeypatch.setattr(telemetry_service, "get_fastf1_session", lambda *args: session)
+        return telemetry_service.compare_telemetry(2024, 1, "Q", list(laps), **kwargs)
+    return run
+
+
+def test_identical_laps_with_drifting_distance_have_no_delta(compare, fake_session):
+    result = compare({
+        "VER": lap_telemetry(fake_session, 82.86),
+        "LEC": lap_telemetry(fake_session, 82.86, distance_scale=1.01),
+    }, reference="VER")
+
+    assert max(abs(d) for d in result["drivers"]["LEC"]["delta"]) < 0.005
+
+
+def test_delta_ends_at_the_lap_time_gap(compare, fake_session):
+    result = compare({
+        "VER": lap_telemetry(fake_session, 82.86, distance_scale=0.995),
+        "LEC": lap_telemetry(fake_session, 83.36, distance_scale=1.01),
+    })
+
+    assert result["reference"] == "VER"
+    # The grid runs over the whole reference lap, end point included
+    assert result["distance"][0] == 0.0
+    assert result["distance"][-1] == pytest.approx(5000 * 0.995)
+    assert result["drivers"]["LEC"]["delta"][-1] == pytest.approx(0.5, abs=0.005)
+    assert result["drivers"]["VER"]["delta"] == [0.0] * len(result["distance"])
+    assert len(result["drivers"]["LEC"]["telemetry"]["Speed"]) == len(result["distance"])
+
+
+def test_unknown_drivers_are_skipped(compare, fake_session):
+    assert compare({"VER": lap_telemetry(fake_session, 82.86)}, reference="HAM")["reference"] == "VER"
+    assert compare({}) == {}
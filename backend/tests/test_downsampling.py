@@ -0,0 +1,54 @@
+import numpy as np
+
+from app.services import telemetry_service
+from app.services.telemetry_service import downsample_indices, snap_points
+
+
+def lap(n=1000):
+    x = np.linspace(0, 6 * np.pi, n)
+    speed = 200 + 100 * np.sin(x)
+    # Braking zones ahead of each of the three slowest corners
+    brake = np.zeros(n, dtype=bool)
+    for start in (200, 530, 860):
+        brake[start:start + 40] = True
+    return speed, brake
+
+
+def test_short_laps_are_returned_whole():
+    speed, brake = lap(50)
+    assert downsample_indices(speed, brake, 200).tolist() == list(range(50))
+
+
+def test_keeps_extremes_brake_onsets_and_ends():
+    speed, brake = lap()
+    idx = downsample_indices(speed, brake, 100)
+
+    assert np.all(np.diff(idx) > 0)
+    assert idx[0] == 0 and idx[-1] == len(speed) - 1
+    assert {int(np.argmin(speed)), int(np.argmax(speed))} <= set(idx.tolist())
+    assert {200, 530, 860} <= set(idx.tolist())
+    # Min and max of 50 buckets, plus the ends and brake onsets
+    assert len(idx) <= 100 + 2 + 3
+
+
+def test_nan_samples_and_uneven_buckets():
+    speed, brake = lap(1003)
+    speed[10:20] = np.nan
+    idx = downsample_indices(speed, brake, 64)
+    assert idx.max() == len(speed) - 1 and idx.min() == 0
+
+
+def test_points_snap_to_levels_of_detail():
+    assert [snap_points(p) for p in (None, 0, 20, 250, 251, 700, 2000)] == [None, None, 250, 250, 500, 1000, 2000]
+    # Beyond the top level the full lap is cheaper than another cached variant
+    assert snap_points(5000) is None
+
+
+def test_nearby_point_counts_share_a_cache_entry(monkeypatch, fake_session):
+    keys = []
+    monkeypatch.setattr(telemetry_service, "get_cached_data", lambda year, round, session_name, key: keys.append(key))
+    monkeypatch.setattr(telemetry_service, "set_cached_data", lambda *args: None)
+    session = fake_session({})
+    for points in (300, 450, 500):
+        telemetry_service.get_driver_telemetry(2024, 1, "Q", "VER", points, session=session)
+    assert keys == ["telemetry_VER_500"] * 3
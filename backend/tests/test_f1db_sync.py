@@ -0,0 +1,90 @@
+from bulk_loader import PRIMARY_KEYS
+from f1db_sync import diff_table, forget_tables, load_manifest, record_baseline, sync_tables, table_key
+
+RACES = {"csv": "races.csv", "table": "races"}
+RESULTS = {"csv": "results.csv", "table": "results"}
+
+
+def test_table_key_prefers_primary_then_natural_keys():
+    assert table_key("results", ["raceid", "driverid", "points"]) == ["raceid", "driverid"]
+    assert table_key("seasons_drivers", ["year", "driverid", "constructorid"]) == ["year", "driverid"]
+    assert table_key("races_laps", ["raceid", "positiondisplayorder", "lap"]) == ["raceid", "positiondisplayorder"]
+    assert table_key("unknown", ["a", "b"]) == ["a", "b"]
+
+
+def test_diff_table_last_repeated_key_wins(write_csv, tmp_path):
+    write_csv("results.csv", ["raceId", "driverId", "points"], [
+        ["1", "hamilton", "25"],
+        ["1", "hamilton", "0"],
+        ["1", "verstappen", "18"],
+    ])
+    entry, changes = diff_table(RESULTS, {}, str(tmp_path))
+
+    assert entry["row_count"] == 2
+    assert entry["key"] == ["raceid", "driverid"]
+    assert {(r["driverid"], r["points"]) for r in changes["upsert"]} == {("hamilton", "0"), ("verstappen", "18")}
+    assert changes["changed"] == [] and changes["delete"] == []
+
+
+def test_diff_table_against_previous_entry(write_csv, tmp_path):
+    header = ["raceId", "driverId", "points"]
+    write_csv("results.csv", header, [["1", "hamilton", "25"], ["1", "verstappen", "18"]])
+    previous, _ = diff_table(RESULTS, {}, str(tmp_path))
+
+    write_csv("results.csv", header, [["1", "hamilton", "25"], ["1", "leclerc", "15"], ["1", "verstappen", "19"]])
+    entry, changes = diff_table(RESULTS, previous, str(tmp_path))
+
+    assert sorted(r["driverid"] for r in changes["upsert"]) == ["leclerc", "verstappen"]
+    assert len(changes["changed"]) == 1
+    assert changes["delete"] == []
+    assert entry["checksum"] != previous["checksum"]
+
+    write_csv("results.csv", header, [["1", "hamilton", "25"]])
+    _, changes = diff_table(RESULTS, entry, str(tmp_path))
+    assert changes["upsert"] == []
+    assert len(changes["delete"]) == 2
+
+
+def test_forget_tables_drops_only_known_tables(write_csv, tmp_path):
+    manifest_path = str(tmp_path / "manifest.json")
+    write_csv("races.csv", ["id", "year"], [["1", "2024"]])
+    write_csv("results.csv", ["raceId", "driverId"], [["1", "hamilton"]])
+    record_baseline([RACES, RESULTS], data_dir=str(tmp_path), manifest_path=manifest_path)
+
+    forget_tables(["results", "pit_stops"], manifest_path)
+    assert set(load_manifest(manifest_path)["tables"]) == {"races"}
+
+
+def test_forget_tables_without_manifest_writes_nothing(tmp_path):
+    manifest_path = tmp_path / "manifest.json"
+    forget_tables(["results"], str(manifest_path))
+    assert not manifest_path.exists()
+
+
+def test_sync_sends_only_changes_and_skips_unchanged_files(write_csv, tmp_path, fake_supabase):
+    manifest_path = str(tmp_path / "manifest.json")
+    db = fake_supabase(keys=PRIMARY_KEYS)
+    write_csv("races.csv", ["id", "year"], [["1", "2024"]])
+    write_csv("results.csv", ["raceId", "driverId", "points"], [["1", "hamilton", "25"], ["1", "verstappen", "18"]])
+
+    first = sync_tables([RACES, RESULTS], db, data_dir=str(tmp_path), manifest_path=manifest_path, retries=0)
+    assert first["tables"]["results"] == {"status": "changed", "inserted": 2, "updated": 0, "deleted": 0}
+    assert len(db.tables["results"]) == 2
+
+    write_csv("results.csv", ["raceId", "driverId", "points"], [["1", "hamilton", "26"]])
+    db.queries.clear()
+    second = sync_tables([RACES, RESULTS], db, data_dir=str(tmp_path), manifest_path=manifest_path, retries=0)
+
+    assert second["tables"]["races"] == {"status": "unchanged"}
+    assert second["tables"]["results"] == {"status": "changed", "inserted": 0, "updated": 1, "deleted": 1}
+    assert db.tables["results"] == [{"raceid": "1", "driverid": "hamilton", "points": "26"}]
+    assert {q.table for q in db.queries} == {"results"}
+
+
+def test_sync_keeps_manifest_of_failed_table(write_csv, tmp_path, fake_supabase):
+    manifest_path = str(tmp_path / "manifest.json")
+    write_csv("races.csv", ["id", "year"], [["1", "2024"]])
+
+    report = sync_tables([RACES], fake_supabase(failing={"races"}), data_dir=str(tmp_path), manifest_path=manifest_path, retries=0)
+    assert report["tables"]["races"]["status"] == "failed"
+    assert load_manifest(manifest_path)["tables"] == {}
@@ -0,0 +1,81 @@
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from app.core import fastf1_client
+from app.core.session_errors import (
+    NOT_AVAILABLE, TRANSIENT, UNSUPPORTED, NegativeCache, SessionUnavailableError,
+)
+
+
+class StubSession:
+    def __init__(self, started, laps=1, api_support=True, load_error=None):
+        self.date = pd.Timestamp.now(tz="UTC").tz_localize(None) - started
+        self.event = {"F1ApiSupport": api_support}
+        self.laps = pd.DataFrame({"LapNumber": range(laps)})
+        self.load_error = load_error
+
+    def load(self, **kwargs):
+        if self.load_error:
+            raise self.load_error
+
+
+@pytest.fixture
+def fastf1(monkeypatch):
+    """Point the client at a stub FastF1 that hands out `fastf1.session` (or raises `fastf1.error`)."""
+    stub = SimpleNamespace(session=None, error=None, calls=0)
+
+    def get_session(year, round, session_type):
+        stub.calls += 1
+        if stub.error:
+            raise stub.error
+        return stub.session
+
+    monkeypatch.setattr(fastf1_client, "fastf1", SimpleNamespace(get_session=get_session))
+    monkeypatch.setattr(fastf1_client, "ensure_cache", lambda: None)
+    monkeypatch.setattr(fastf1_client.cache_manager, "record_load", lambda *args: None)
+    monkeypatch.setattr(fastf1_client, "failed_loads", NegativeCache())
+    return stub
+
+
+def load_kind(fastf1, session=None, error=None):
+    fastf1.session, fastf1.error = session, error
+    with pytest.raises(SessionUnavailableError) as exc:
+        fastf1_client._load(2024, 1, "R")
+    return exc.value.kind
+
+
+def test_schedule_errors(fastf1):
+    assert load_kind(fastf1, error=ValueError("Session type 'SQ' does not exist")) == UNSUPPORTED
+    assert load_kind(fastf1, error=ConnectionError("schedule backend down")) == TRANSIENT
+
+
+def test_sessions_without_data_yet(fastf1):
+    assert load_kind(fastf1, StubSession(started=pd.Timedelta(days=-2))) == NOT_AVAILABLE
+    assert load_kind(fastf1, StubSession(started=pd.Timedelta(hours=1), laps=0)) == NOT_AVAILABLE
+
+
+def test_sessions_without_laps_long_after_the_start(fastf1):
+    old = pd.Timedelta(days=30)
+    assert load_kind(fastf1, StubSession(started=old, laps=0, api_support=False)) == UNSUPPORTED
+    # The data should exist, so an empty load is most likely an outage
+    assert load_kind(fastf1, StubSession(started=old, laps=0)) == TRANSIENT
+    assert load_kind(fastf1, StubSession(started=old, load_error=OSError("rate limited"))) == TRANSIENT
+
+
+def test_loaded_session_is_returned(fastf1):
+    fastf1.session = StubSession(started=pd.Timedelta(days=30))
+    assert fastf1_client._load(2024, 1, "R") is fastf1.session
+
+
+def test_failures_are_remembered_with_their_ttl(fastf1, monkeypatch):
+    monkeypatch.setattr(fastf1_client.settings, "FASTF1_NEGATIVE_TTL_UNSUPPORTED", 3600)
+    fastf1.error = ValueError("no such round")
+
+    for _ in range(2):
+        with pytest.raises(SessionUnavailableError) as exc:
+            fastf1_client.load_session_to_disk(2024, 30, "R")
+        assert exc.value.kind == UNSUPPORTED
+        assert 3599 <= exc.value.retry_after <= 3601
+    assert fastf1.calls == 1
@@ -0,0 +1,127 @@
+import threading
+
+import pytest
+
+from app.services.live_analytics import LiveAnalytics, StintPace, parse_laps_behind, parse_time
+
+
+def timing(lines):
+    return [{"method": "TimingData", "data": {"Lines": lines}}]
+
+
+def sectors(*values):
+    return {"Sectors": {str(i): {"Value": v} for i, v in enumerate(values)}}
+
+
+@pytest.mark.parametrize("value, expected", [("1:32.456", 92.456), ("31.234", 31.234), ("+0.512", 0.512)])
+def test_parse_time(value, expected):
+    assert parse_time(value) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("value", ["", "LAP 3", None])
+def test_parse_time_rejects_non_times(value):
+    assert parse_time(value) is None
+
+
+def test_parse_laps_behind():
+    assert parse_laps_behind("1L") == 1
+    assert parse_laps_behind("+2 LAPS") == 2
+    assert parse_laps_behind("+1.234") is None
+
+
+def test_stint_pace_drops_laps_slower_than_107_percent():
+    pace = StintPace()
+    for lap in (100.0, 95.0, 101.0):
+        pace.add(lap)
+    # A long run needs more than 3 laps
+    assert pace.pace is None
+    pace.add(96.0)
+    assert pace.pace == pytest.approx(98.0)
+
+    # New fastest lap, threshold 96.3: 100 and 101 drop out for good
+    pace.add(90.0)
+    assert pace.pace is None
+    pace.add(91.0)
+    assert pace.pace == pytest.approx((95.0 + 96.0 + 90.0 + 91.0) / 4)
+
+
+def test_gaps_and_returned_deltas():
+    analytics = LiveAnalytics()
+    changes = analytics.update(timing({
+        "1": {"Position": "1", "GapToLeader": "", "IntervalToPositionAhead": {"Value": ""}},
+        "44": {"Position": "2", "GapToLeader": "+1.250", "IntervalToPositionAhead": {"Value": "+1.250"}},
+        "22": {"Position": "3", "GapToLeader": "1L", "IntervalToPositionAhead": {"Value": "1L"}},
+    }))
+    assert changes["44"]["gap_to_leader"] == 1250
+    assert changes["22"]["gap_laps"] == 1
+    assert analytics.snapshot()["22"].get("gap_to_leader") is None
+
+    # Only what changed comes back
+    assert analytics.update(timing({"44": {"Position": "2", "GapToLeader": "+1.300"}})) == {"44": {"gap_to_leader": 1300}}
+
+
+def test_sector_colours_follow_session_and_personal_bests():
+    analytics = LiveAnalytics()
+    analytics.update(timing({"1": sectors("30.000", "40.000", "25.000")}))
+    assert analytics.snapshot()["1"]["sector_colors"] == [2, 2, 2]
+
+    changes = analytics.update(timing({"44": sectors("29.500", "40.500", "25.000")}))
+    # A first time in a sector is a personal best
+    assert changes["44"]["sector_colors"] == [2, 1, 2]
+    # Car 1 lost the purple first sector and is demoted to green
+    assert changes["1"]["sector_colors"] == [1, 2, 2]
+
+    analytics.update(timing({"44": sectors("29.800", "40.400", "25.100")}))
+    assert analytics.snapshot()["44"]["sector_colors"] == [0, 1, 0]
+
+
+def test_laps_and_stints():
+    analytics = LiveAnalytics()
+    analytics.update([{"method": "TimingAppData", "data": {"Lines": {"1": {"Stints": [{"Compound": "SOFT"}]}}}}])
+    for lap in ("1:31.000", "1:30.000", "1:30.500", "1:30.400"):
+        analytics.update(timing({"1": {"LastLapTime": {"Value": lap}}}))
+
+    driver = analytics.snapshot()["1"]
+    assert (driver["stint"], driver["compound"], driver["stint_laps"]) == (1, "SOFT", 4)
+    assert (driver["last_lap"], driver["best_lap"]) == (90400, 90000)
+    assert driver["long_run_pace"] == 90475
+
+    changes = analytics.update([{"method": "TimingAppData",
+                                 "data": {"Lines": {"1": {"Stints": {"1": {"Compound": "HARD"}}}}}}])
+    assert changes["1"] == {"stint": 2, "stint_laps": 0, "long_run_pace": None, "compound": "HARD"}
+
+
+def test_new_session_and_reset_start_from_scratch():
+    analytics = LiveAnalytics()
+    analytics.update([{"method": "SessionInfo", "data": {"Path": "2024/race/"}}])
+    analytics.update(timing({"1": {"Position": "1"}}))
+    analytics.update([{"method": "SessionInfo", "data": {"Path": "2024/race/"}}])
+    assert "1" in analytics.snapshot()
+
+    analytics.update([{"method": "SessionInfo", "data": {"Path": "2024/quali/"}}])
+    assert analytics.snapshot() == {}
+
+    analytics.update(timing({"1": sectors("30.000")}))
+    analytics.reset()
+    assert analytics.snapshot() == {} and analytics.session_best_sectors == [None, None, None]
+
+
+def test_reset_waits_for_an_update_in_flight():
+    analytics = LiveAnalytics()
+    analytics.update(timing({"1": {"Position": "1"}}))
+
+    # Stand in for the feed thread being halfway through update()
+    with analytics._lock:
+        resetter = threading.Thread(target=analytics.reset)
+        resetter.start()
+        resetter.join(0.1)
+        assert resetter.is_alive()
+        assert "1" in analytics.drivers
+    resetter.join(5)
+    assert analytics.snapshot() == {}
+
+
+def test_merge_folds_worker_deltas():
+    analytics = LiveAnalytics()
+    analytics.merge({"16": {"position": 1, "gap_to_leader": None}})
+    assert analytics.snapshot()["16"]["position"] == 1
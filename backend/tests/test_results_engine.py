@@ -0,0 +1,82 @@
+import pytest
+
+from app.services.results_engine import RESULTS_CSV, QUALIFYING_CSV, ResultsEngine
+
+RESULTS_HEADER = ["raceId", "year", "driverId", "constructorId", "positionDisplayOrder", "positionNumber",
+                  "positionText", "gridPositionNumber", "points", "polePosition"]
+RESULTS = [
+    ["1", "2020", "hamilton", "mercedes", "1", "1", "1", "1", "25", "true"],
+    ["1", "2020", "bottas", "mercedes", "2", "2", "2", "2", "18", "false"],
+    ["1", "2020", "verstappen", "red-bull", "3", "3", "3", "3", "15", "false"],
+    ["2", "2020", "bottas", "mercedes", "1", "1", "1", "1", "25", "true"],
+    ["2", "2020", "verstappen", "red-bull", "2", "2", "2", "12", "18", "false"],
+    ["2", "2020", "hamilton", "mercedes", "20", "", "DNS", "", "0", "false"],
+    ["3", "2021", "russell", "mercedes", "1", "1", "1", "11", "25", "false"],
+    ["3", "2021", "hamilton", "mercedes", "2", "2", "2", "1", "18", "true"],
+    ["3", "2021", "verstappen", "red-bull", "3", "3", "3", "2", "15", "false"],
+]
+QUALIFYING_HEADER = ["raceId", "year", "driverId", "constructorId", "positionNumber",
+                     "timeMillis", "q1Millis", "q2Millis", "q3Millis"]
+QUALIFYING = [
+    ["1", "2020", "hamilton", "mercedes", "1", "", "81000", "80500", "80000"],
+    ["1", "2020", "bottas", "mercedes", "2", "", "81200", "80700", "80200"],
+    ["2", "2020", "bottas", "mercedes", "1", "", "81000", "80500", "80000"],
+    # No Q3 time: the gap falls back to Q2
+    ["2", "2020", "hamilton", "mercedes", "2", "", "81500", "81000", ""],
+    ["3", "2021", "hamilton", "mercedes", "1", "", "80000", "79500", "79000"],
+    ["3", "2021", "russell", "mercedes", "2", "", "80100", "79800", "79500"],
+]
+
+
+@pytest.fixture
+def engine(write_csv, tmp_path):
+    write_csv(RESULTS_CSV, RESULTS_HEADER, RESULTS)
+    write_csv(QUALIFYING_CSV, QUALIFYING_HEADER, QUALIFYING)
+    return ResultsEngine(str(tmp_path))
+
+
+def test_teammates(engine):
+    assert engine.teammates("hamilton") == [
+        # Race 2 does not count as ahead or behind: Hamilton did not start
+        {"teammate_id": "bottas", "races": 2, "ahead": 1, "behind": 0, "first_year": 2020, "last_year": 2020},
+        {"teammate_id": "russell", "races": 1, "ahead": 0, "behind": 1, "first_year": 2021, "last_year": 2021},
+    ]
+    assert engine.teammates("nobody") is None
+
+
+def test_head_to_head(engine):
+    h2h = engine.head_to_head("hamilton", "bottas")
+    assert (h2h["races"], h2h["both_started"], h2h["qualifying_sessions"]) == (2, 1, 2)
+    assert h2h["hamilton"] == {"ahead": 1, "wins": 1, "podiums": 1, "points": 25.0, "qualifying_ahead": 1}
+    assert h2h["bottas"] == {"ahead": 0, "wins": 1, "podiums": 2, "points": 43.0, "qualifying_ahead": 1}
+    # Bottas +200 ms in Q3, then -500 ms in Q2
+    assert h2h["median_qualifying_gap_ms"] == -150.0
+    assert [s["year"] for s in h2h["seasons"]] == [2020]
+
+
+def test_head_to_head_teammates_only(engine):
+    h2h = engine.head_to_head("hamilton", "verstappen", teammates_only=True)
+    assert h2h["races"] == 0 and h2h["seasons"] == []
+    assert engine.head_to_head("hamilton", "verstappen")["races"] == 3
+
+
+def test_qualifying_gap(engine):
+    seasons = engine.qualifying_gap("hamilton")
+    assert [(s["year"], s["sessions"], s["ahead"], s["behind"], s["median_gap_ms"], s["teammates"])
+            for s in seasons] == [(2020, 2, 1, 1, 150.0, ["bottas"]), (2021, 1, 1, 0, -500.0, ["russell"])]
+
+
+def test_aggregate_filters_and_orders(engine):
+    outside_top_10 = engine.aggregate(grid_min=11)
+    assert outside_top_10["matched_results"] == 2
+    assert [(r["driver"], r["wins"]) for r in outside_top_10["rows"]] == [("russell", 1), ("verstappen", 0)]
+
+    by_year = engine.aggregate(group_by="year")
+    assert [(r["year"], r["entries"], r["starts"], r["wins"]) for r in by_year["rows"]] == [(2020, 6, 5, 2), (2021, 3, 3, 1)]
+
+    mercedes_2020 = engine.aggregate(group_by="constructor", year_from=2020, year_to=2020, constructor_id="mercedes")
+    assert mercedes_2020["rows"] == [{"constructor": "mercedes", "entries": 4, "starts": 3, "wins": 2,
+                                      "podiums": 3, "points": 68.0, "poles": 2}]
+
+    assert engine.aggregate(driver_id="hamilton", order_by="points")["rows"][0]["points"] == 43.0
+    assert engine.aggregate(constructor_id="ferrari") is None
@@ -0,0 +1,61 @@
+import pytest
+
+import seed
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Replace the loaders seed.py drives and record what it asks them to do."""
+    recorded = {"baseline": None, "forget": None, "materialize": 0}
+    summary = {"complete_tables": [], "failed_tables": []}
+
+    monkeypatch.setattr(seed, "load_tables", lambda *args, **kwargs: summary)
+    monkeypatch.setattr(seed, "record_baseline",
+                        lambda items, *args, **kwargs: recorded.update(baseline=[i["table"] for i in items]))
+    monkeypatch.setattr(seed, "forget_tables", lambda tables, *args, **kwargs: recorded.update(forget=list(tables)))
+
+    def materialize(*args, **kwargs):
+        recorded["materialize"] += 1
+
+    monkeypatch.setattr(seed, "materialize", materialize)
+    recorded["summary"] = summary
+    return recorded
+
+
+def test_full_load_baselines_only_complete_tables(calls):
+    calls["summary"].update(complete_tables=["circuits", "races"], failed_tables=["results"])
+    seed.process_and_upload(supabase=None)
+
+    assert calls["baseline"] == ["circuits", "races"]
+    assert calls["forget"] == ["results"]
+
+
+def test_full_load_without_failures_forgets_nothing(calls):
+    calls["summary"].update(complete_tables=[item["table"] for item in seed.TABLES_ORDER])
+    seed.process_and_upload(supabase=None)
+
+    assert calls["baseline"] == [item["table"] for item in seed.TABLES_ORDER]
+    assert calls["forget"] is None
+
+
+@pytest.mark.parametrize("failed, materialized", [([], 1), (["results"], 0), (["pit_stops"], 1)])
+def test_full_load_materializes_unless_a_source_table_failed(calls, failed, materialized):
+    calls["summary"].update(failed_tables=failed)
+    seed.process_and_upload(supabase=None)
+    assert calls["materialize"] == materialized
+
+
+@pytest.mark.parametrize("statuses, materialized", [
+    ({}, 0),
+    ({"results": "changed"}, 1),
+    ({"results": "changed", "qualifying": "failed"}, 0),
+    ({"pit_stops": "changed"}, 0),
+])
+def test_incremental_sync_materializes_only_on_source_changes(calls, monkeypatch, statuses, materialized):
+    report = {"tables": {table: {"status": status} for table, status in statuses.items()}}
+    monkeypatch.setattr(seed, "sync_tables", lambda *args, **kwargs: report)
+    monkeypatch.setattr(seed, "init_supabase", lambda: None)
+    monkeypatch.setattr(seed.sys, "argv", ["seed.py", "--incremental"])
+
+    seed.main()
+    assert calls["materialize"] == materialized
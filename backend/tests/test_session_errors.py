@@ -0,0 +1,72 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.session_errors import (
+    NOT_AVAILABLE, TRANSIENT, UNSUPPORTED, NegativeCache, SessionUnavailableError,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+KEY = (2024, 1, "R")
+
+
+def test_negative_cache_raises_until_the_ttl_runs_out():
+    clock = FakeClock()
+    cache = NegativeCache(clock=clock)
+    cache.remember(KEY, SessionUnavailableError(TRANSIENT, "timeout"), ttl_seconds=60)
+
+    clock.now += 59.5
+    with pytest.raises(SessionUnavailableError) as exc:
+        cache.check(KEY)
+    assert exc.value.kind == TRANSIENT and str(exc.value) == "timeout"
+    assert exc.value.retry_after == 1
+    assert cache.stats() == {UNSUPPORTED: 0, NOT_AVAILABLE: 0, TRANSIENT: 1}
+
+    clock.now += 0.5
+    cache.check(KEY)
+    assert cache.stats()[TRANSIENT] == 0
+
+
+def test_negative_cache_ignores_zero_ttl_and_clears():
+    cache = NegativeCache(clock=FakeClock())
+    cache.remember(KEY, SessionUnavailableError(UNSUPPORTED, "no data"), ttl_seconds=0)
+    cache.check(KEY)
+
+    cache.remember(KEY, SessionUnavailableError(UNSUPPORTED, "no data"), ttl_seconds=60)
+    cache.clear(KEY)
+    cache.check(KEY)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    from app.services import telemetry_service
+    import main
+
+    def serve(error):
+        def fail(*args, **kwargs):
+            raise error
+        monkeypatch.setattr(telemetry_service, "get_driver_telemetry", fail)
+        return TestClient(main.app).get("/api/v1/telemetry/2024/1/R/VER")
+    return serve
+
+
+def test_unsupported_sessions_are_404_without_retry_after(client):
+    response = client(SessionUnavailableError(UNSUPPORTED, "No timing data", retry_after=86400))
+    assert response.status_code == 404
+    assert response.json() == {"detail": "No timing data", "reason": UNSUPPORTED}
+    assert "retry-after" not in response.headers
+
+
+@pytest.mark.parametrize("kind", [NOT_AVAILABLE, TRANSIENT])
+def test_retryable_sessions_are_503_with_retry_after(client, kind):
+    response = client(SessionUnavailableError(kind, "later", retry_after=120))
+    assert response.status_code == 503
+    assert response.json()["reason"] == kind
+    assert response.headers["retry-after"] == "120"
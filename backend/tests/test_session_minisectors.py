@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from app.services import session_service
+
+
+@pytest.fixture(autouse=True)
+def offline(monkeypatch):
+    """No fastf1_cache reads or writes, and a 100-point stand-in for the shared track geometry."""
+    monkeypatch.setattr(session_service, "get_cached_data", lambda *args: None)
+    monkeypatch.setattr(session_service, "set_cached_data", lambda *args: None)
+    monkeypatch.setattr(session_service, "ensure_track_geometry", lambda session, tel: {"layout": "test"})
+    monkeypatch.setattr(session_service, "distance_to_indices",
+                        lambda geometry, fractions: np.round(np.asarray(fractions) * 100).astype(int))
+
+
+@pytest.fixture
+def session(fake_session):
+    distance = np.arange(0.0, 1001.0, 10.0)
+    # VER: 50 m/s all the way; LEC: 100 m/s then 25 m/s, with 1% more integrated distance
+    ver_time = distance / 50
+    lec_time = np.where(distance <= 500, distance / 100, 5 + (distance - 500) / 25)
+    lec_speed = np.where(distance < 500, 100.0, 25.0)
+    return fake_session({
+        "VER": fake_session.telemetry(distance, ver_time, Speed=np.full(len(distance), 50.0)),
+        "LEC": fake_session.telemetry(distance * 1.01, lec_time, Speed=lec_speed),
+    })
+
+
+def test_minisector_boundaries():
+    assert session_service._minisector_boundaries(1000.0, 4).tolist() == [0.0, 250.0, 500.0, 750.0, 1000.0]
+
+
+def test_fastest_driver_per_minisector(session):
+    result = session_service.get_minisectors(2024, 1, "Q", num_minisectors=2, session=session)
+
+    assert result["track_layout"] == "test"
+    first, second = result["segments"]
+    assert (first["start_distance"], first["end_distance"], first["start_index"], first["end_index"]) == (0.0, 500.0, 0, 50)
+    assert first["fastest_driver"] == "LEC" and second["fastest_driver"] == "VER"
+    assert first["times"] == {"VER": 10000, "LEC": 5000}
+    assert second["times"] == {"VER": 10000, "LEC": 20000}
+    assert first["avg_speeds"] == {"VER": 50.0, "LEC": 100.0}
+
+
+def test_segments_cover_the_lap(session):
+    segments = session_service.get_minisectors(2024, 1, "Q", num_minisectors=25, session=session)["segments"]
+    assert [s["minisector"] for s in segments] == list(range(1, 26))
+    assert sum(s["times"]["VER"] for s in segments) == pytest.approx(20000, abs=25)
+    assert all(a["end_index"] == b["start_index"] for a, b in zip(segments, segments[1:]))
+
+
+def test_no_laps(fake_session):
+    assert session_service.get_minisectors(2024, 1, "Q", session=fake_session({})) == {"track_layout": None, "segments": []}
+
+
+def test_speed_gaps_and_times_just_under_a_millisecond(fake_session):
+    distance = np.arange(0.0, 1001.0, 10.0)
+    speed = np.full(len(distance), 50.0)
+    speed[5:15] = np.nan
+    # 9.9999999 s in each half: rounds to 10000 ms rather than truncating to 9999
+    ver = fake_session.telemetry(distance, distance / 50 * (1 - 1e-8), Speed=speed)
+    result = session_service.get_minisectors(2024, 1, "Q", num_minisectors=2, session=fake_session({"VER": ver}))
+
+    first, second = result["segments"]
+    assert first["times"] == second["times"] == {"VER": 10000}
+    # Missing samples are left out of the average instead of counting as 0 km/h
+    assert first["avg_speeds"] == {"VER": 50.0}
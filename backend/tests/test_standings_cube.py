@@ -0,0 +1,54 @@
+import pytest
+
+from app.services.standings_cube import RACES_CSV, STANDINGS_CSV, StandingsCube
+
+
+@pytest.fixture
+def cube(write_csv, tmp_path):
+    write_csv(RACES_CSV, ["id", "year", "grandPrixId"], [
+        ["1", "2020", "bahrain"], ["2", "2020", "emilia-romagna"], ["3", "2020", "abu-dhabi"],
+        ["4", "2021", "bahrain"],
+    ])
+    write_csv(STANDINGS_CSV["drivers"][0], ["raceId", "year", "round", "positionNumber", "driverId", "points"], [
+        ["1", "2020", "1", "1", "hamilton", "25"],
+        ["1", "2020", "1", "2", "bottas", "18"],
+        # Hamilton is not listed after round 2; Verstappen first scores there
+        ["2", "2020", "2", "1", "bottas", "43"],
+        ["2", "2020", "2", "2", "verstappen", "33"],
+        ["4", "2021", "1", "1", "verstappen", "25"],
+    ])
+    write_csv(STANDINGS_CSV["constructors"][0], ["raceId", "year", "round", "positionNumber", "constructorId", "points"], [
+        # One row per engine: places keep the best, points add up
+        ["1", "2020", "1", "3", "mercedes", "18"],
+        ["1", "2020", "1", "1", "mercedes", "25"],
+        ["1", "2020", "1", "2", "red-bull", "15"],
+    ])
+    return StandingsCube(str(tmp_path))
+
+
+def test_driver_progression(cube):
+    season = cube.progression(2020)
+    assert season["scheduled_rounds"] == 3
+    assert season["rounds"] == [1, 2]
+    assert season["grand_prix_ids"] == ["bahrain", "emilia-romagna"]
+    # Ordered by final place, unclassified last
+    assert season["ids"] == ["bottas", "verstappen", "hamilton"]
+    assert season["points"] == [[18.0, 43.0], [0.0, 33.0], [25.0, 25.0]]
+    assert season["positions"] == [[2, 1], [None, 2], [1, None]]
+
+
+def test_seasons_are_independent(cube):
+    season = cube.progression(2021)
+    assert (season["rounds"], season["ids"], season["points"]) == ([1], ["verstappen"], [[25.0]])
+
+
+def test_constructor_rows_are_combined(cube):
+    season = cube.progression(2020, "constructors")
+    assert season["ids"] == ["mercedes", "red-bull"]
+    assert season["points"] == [[43.0], [15.0]]
+    assert season["positions"] == [[1], [2]]
+
+
+def test_unknown_season(cube):
+    assert cube.progression(1949) is None
+    assert cube.progression(2022, "constructors") is None
@@ -0,0 +1,57 @@
+import gzip
+import io
+
+import numpy as np
+import pytest
+
+from app.services import telemetry_export_service as export
+
+
+@pytest.fixture
+def session(monkeypatch, fake_session):
+    session = fake_session({"VER": fake_session.lap(lap_seconds=90.0), "LEC": fake_session.lap(lap_seconds=90.5)})
+    monkeypatch.setattr(export, "get_fastf1_session", lambda *args: session)
+    # No merged telemetry for anyone (e.g. every driver failed to load)
+    monkeypatch.setattr(export, "build_driver_telemetry", lambda session, driver: None)
+    return session
+
+
+def test_unknown_drivers_raise_lookup_error(session):
+    with pytest.raises(LookupError):
+        export.export_session_telemetry(2024, 1, "R", "csv.gz", drivers=["HAM"])
+
+
+def test_empty_csv_export_still_has_a_header(session):
+    data = b"".join(export.export_session_telemetry(2024, 1, "R", "csv.gz", channels=["Speed"]))
+    assert gzip.decompress(data) == b"Driver,LapNumber,SessionTime,Speed\n"
+
+
+def test_empty_parquet_export_is_a_valid_file(session):
+    pq = pytest.importorskip("pyarrow.parquet")
+    data = b"".join(export.export_session_telemetry(2024, 1, "R", "parquet", drivers=["VER"], channels=["Speed", "Gear"]))
+    table = pq.read_table(io.BytesIO(data))
+    assert table.num_rows == 0
+    assert table.column_names == ["Driver", "LapNumber", "SessionTime", "Speed", "Gear"]
+
+
+def test_empty_and_non_empty_parquet_share_column_types(session, monkeypatch):
+    pq = pytest.importorskip("pyarrow.parquet")
+    channels = ["Speed", "Gear", "Brake"]
+
+    def schema():
+        data = b"".join(export.export_session_telemetry(2024, 1, "R", "parquet", channels=channels))
+        return pq.read_schema(io.BytesIO(data))
+
+    empty = schema()
+    # Two laps of two samples each, shaped like telemetry_index.build_driver_telemetry
+    entry = {
+        "columns": {"Time": np.array([0.0, 1.0, 2.0, 3.0]), "Speed": np.full(4, 280.0),
+                    "Gear": np.full(4, 8.0), "Brake": np.zeros(4)},
+        "lap_numbers": np.array([1, 2]),
+        "starts": np.array([0, 2]),
+    }
+    monkeypatch.setattr(export, "build_driver_telemetry", lambda session, driver: entry)
+    written = schema()
+
+    assert [(f.name, str(f.type)) for f in written] == [(f.name, str(f.type)) for f in empty]
+    assert str(written.field("LapNumber").type) == "int64"
@@ -0,0 +1,47 @@
+import gc
+import threading
+
+from app.services import telemetry_index
+from app.services.telemetry_index import get_session_index
+
+
+def test_index_lives_as_long_as_its_session(fake_session):
+    session = fake_session({})
+    index = get_session_index(session)
+    assert get_session_index(session) is index
+    assert get_session_index(fake_session({})) is not index
+
+    count = len(telemetry_index._INDEXES)
+    del session
+    gc.collect()
+    # Evicted sessions are not kept alive by their index
+    assert len(telemetry_index._INDEXES) == count - 1
+
+
+def test_drivers_are_built_once_and_independently(fake_session, monkeypatch):
+    release_ver = threading.Event()
+    builds = []
+
+    def build(session, driver_id):
+        builds.append(driver_id)
+        if driver_id == "VER":
+            assert release_ver.wait(5)
+        return {"driver": driver_id}
+
+    monkeypatch.setattr(telemetry_index, "build_driver_telemetry", build)
+    session = fake_session({})
+    index = get_session_index(session)
+
+    results = {}
+    slow = [threading.Thread(target=lambda: results.setdefault("VER", index.driver("VER"))) for _ in range(2)]
+    for thread in slow:
+        thread.start()
+
+    # LEC is served while VER is still being built
+    assert index.driver("LEC") == {"driver": "LEC"}
+    release_ver.set()
+    for thread in slow:
+        thread.join(5)
+
+    assert results["VER"] == {"driver": "VER"}
+    assert sorted(builds) == ["LEC", "VER"]
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services import track_geometry_service as geometry
+from app.services.track_geometry_service import douglas_peucker, get_layout_key
+
+
+@pytest.fixture
+def races(write_csv, tmp_path, monkeypatch):
+    write_csv("f1db-races.csv", ["id", "year", "round", "circuitId", "courseLength"], [
+        ["1100", "2023", "15", "monza", "5.793"],
+        ["1117", "2024", "16", "monza", "5.793"],
+        ["1046", "2020", "16", "bahrain", "3.543"],
+    ])
+    monkeypatch.setattr(geometry, "_RACE_LAYOUTS", geometry._load_race_layouts(str(tmp_path)))
+
+
+def monza(year, round_number):
+    return {"Location": "Monza", "RoundNumber": round_number, "EventDate": pd.Timestamp(f"{year}-09-01")}
+
+
+def test_layout_key_uses_the_official_length(races, fake_session):
+    # Integrated telemetry distance drifts from session to session and year to year
+    keys = {
+        get_layout_key(fake_session({}, event=monza(2023, 15)), 5742.0),
+        get_layout_key(fake_session({}, event=monza(2024, 16)), 5826.0),
+    }
+    assert keys == {"monza-5793"}
+    # Another layout of the same circuit gets its own key
+    sakhir = {"Location": "Sakhir", "RoundNumber": 16, "EventDate": pd.Timestamp("2020-12-06")}
+    assert get_layout_key(fake_session({}, event=sakhir), 3510.0) == "bahrain-3543"
+
+
+def test_layout_key_falls_back_to_venue_and_lap_length(races, fake_session):
+    testing = {"Location": "Sakhir", "RoundNumber": 0, "EventDate": pd.Timestamp("2024-02-23")}
+    assert get_layout_key(fake_session({}, event=testing), 5390.0) == "sakhir-5400"
+    assert get_layout_key(fake_session({}), 5390.0) == "unknown-5400"
+
+
+def test_douglas_peucker_keeps_corners_and_drops_straights():
+    # An L: two straight runs of 11 points meeting at a right angle
+    run = np.linspace(0.0, 100.0, 11)
+    points = np.concatenate([np.column_stack([run, np.zeros(11)]), np.column_stack([np.full(10, 100.0), run[1:]])])
+
+    assert douglas_peucker(points, 1.0).tolist() == [0, 10, 20]
+    assert douglas_peucker(points, 0).tolist() == list(range(len(points)))
+
+
+def test_douglas_peucker_on_a_closed_lap():
+    angle = np.linspace(0.0, 2 * np.pi, 401)
+    points = np.column_stack([1000 * np.cos(angle), 1000 * np.sin(angle)])
+
+    coarse, fine = douglas_peucker(points, 50.0), douglas_peucker(points, 1.0)
+    assert coarse[0] == 0 and coarse[-1] == len(points) - 1
+    assert 4 <= len(coarse) < len(fine) < len(points)
+    # Every dropped point lies within the tolerance of the simplified outline
+    for start, end in zip(coarse[:-1], coarse[1:]):
+        a, ab = points[start], points[end] - points[start]
+        inner = points[start + 1:end] - a
+        dists = np.abs(ab[0] * inner[:, 1] - ab[1] * inner[:, 0]) / np.hypot(*ab)
+        assert np.all(dists <= 50.0)
@@ -0,0 +1,66 @@
+import pytest
+
+from verify_counts import canonical, count_csv_rows, csv_chunk_checksums, expected_rows, row_bucket, row_checksum
+
+RESULTS_HEADER = ["raceId", "driverId", "points", "time"]
+KINDS = {"raceid": "number", "driverid": "text", "points": "number", "time": "time"}
+
+
+@pytest.mark.parametrize("value, kind, expected", [
+    ("325.430", "number", "325.43"),
+    ("10", "number", "10"),
+    ("1E+1", "number", "10"),
+    ("0.000", "number", "0"),
+    ("-0", "number", "0"),
+    ("13:00", "time", "46800"),
+    ("01:02:03.500", "time", "3723.5"),
+    ("TRUE", "boolean", "true"),
+    ("f", "boolean", "false"),
+    ("2024-03-02", "date", "2024-03-02"),
+    ("Hamilton", "text", "Hamilton"),
+    (None, "number", None),
+    # Not a number: left as is, so the chunk mismatches
+    ("n/a", "number", "n/a"),
+])
+def test_canonical(value, kind, expected):
+    assert canonical(value, kind) == expected
+
+
+def test_count_csv_rows_without_trailing_newline(tmp_path):
+    path = tmp_path / "races.csv"
+    path.write_text("id,year\n1,2024\n2,2024")
+    assert count_csv_rows(str(path)) == 2
+    path.write_text("")
+    assert count_csv_rows(str(path)) == 0
+
+
+def test_expected_rows_subtracts_repeated_primary_keys(write_csv):
+    rows = [["1", "hamilton", "25", ""], ["1", "hamilton", "0", ""], ["1", "verstappen", "18", ""]]
+    assert expected_rows(write_csv("results.csv", RESULTS_HEADER, rows), "results") == 2
+    # No primary key: every row is loaded
+    assert expected_rows(write_csv("seasons_drivers.csv", RESULTS_HEADER, rows), "seasons_drivers") == 3
+
+
+def test_chunk_checksums_ignore_text_form_of_values(write_csv):
+    plain = write_csv("a.csv", RESULTS_HEADER, [["1", "hamilton", "25", "13:00:00"], ["2", "hamilton", "", ""]])
+    padded = write_csv("b.csv", RESULTS_HEADER, [["1.0", "hamilton", "25.000", "13:00"], ["2", "hamilton", "", ""]])
+
+    key, chunks = csv_chunk_checksums(plain, "results", 4, KINDS)
+    assert key == ["raceid", "driverid"]
+    assert csv_chunk_checksums(padded, "results", 4, KINDS)[1] == chunks
+    assert sum(count for count, _ in chunks.values()) == 2
+
+
+def test_chunk_checksums_keep_last_row_of_a_key(write_csv):
+    repeated = write_csv("a.csv", RESULTS_HEADER, [["1", "hamilton", "25", ""], ["1", "hamilton", "0", ""]])
+    last_only = write_csv("b.csv", RESULTS_HEADER, [["1", "hamilton", "0", ""]])
+
+    assert csv_chunk_checksums(repeated, "results", 1, KINDS) == csv_chunk_checksums(last_only, "results", 1, KINDS)
+
+
+def test_chunk_checksums_match_row_hashes(write_csv):
+    path = write_csv("a.csv", RESULTS_HEADER, [["1", "hamilton", "25.50", ""]])
+    _, chunks = csv_chunk_checksums(path, "results", 8, KINDS)
+
+    values = ["1", "hamilton", "25.5", None]
+    assert chunks == {row_bucket(values[:2], 8): [1, row_checksum(values)]}
@@ -1,71 +1,16 @@
-import os
-from supabase import create_client, Client
-from dotenv import load_dotenv
-
-load_dotenv()
-
-# The Bucket Name inside your Supabase project
-BUCKET_NAME = "f1-media"
+from media_sync import BUCKET_NAME, MEDIA_DIR, sync_media
 
 # Local directory where your images are stored, e.g.:
 # ./media/drivers/lewis-hamilton/2024.png
 # ./media/drivers/lewis-hamilton/2025.png
 # ./media/cars/ferrari/2025.png
-MEDIA_DIR = "./media"
-
-def init_supabase() -> Client:
-    url = os.getenv("SUPABASE_URL")
-    key = os.getenv("SUPABASE_KEY")
-    return create_client(url, key)
+# Each file is stored under its path relative to MEDIA_DIR in the BUCKET_NAME bucket.
 
 def upload_images():
-    supabase = init_supabase()
-
-    if not os.path.exists(MEDIA_DIR):
-        print(f"Pasta '{MEDIA_DIR}' nao encontrada.")
-        return
-
-    # Loop over all files in the MEDIA_DIR recursively
-    uploaded = 0
-    for root, dirs, files in os.walk(MEDIA_DIR):
-        for file in files:
-            # We only care about images
-            if not file.lower().endswith(('.png', '.jpg', '.jpeg', '.webp', '.svg')):
-                continue
-
-            local_path = os.path.join(root, file)
-            # Make the storage path relative to the media folder
-            # So ./media/drivers/lewis-hamilton/2025.png => drivers/lewis-hamilton/2025.png
-            relative_path = os.path.relpath(local_path, MEDIA_DIR).replace("\\", "/")
-            
-            import mimetypes
-
-            content_type, _ = mimetypes.guess_type(local_path)
-            if not content_type:
-                if file.lower().endswith('.svg'):
-                    content_type = "image/svg+xml"
-                elif file.lower().endswith('.webp'):
-                    content_type = "image/webp"
-                else:
-                    content_type = "application/octet-stream"
-
-            print(f"Subindo {relative_path} (Type: {content_type})...")
-            
-            with open(local_path, "rb") as f:
-                # Upsert is True so if you update an image, it replaces it
-                try:
-                    # Tenta upload (com upsert) para substituir se já existir
-                    res = supabase.storage.from_(BUCKET_NAME).upload(
-                        path=relative_path,
-                        file=f,
-                        file_options={"cacheControl": "3600", "upsert": "true", "contentType": content_type}
-                    )
-                    uploaded += 1
-                    print(f"✅ {relative_path} salvo/atualizado com sucesso!")
-                except Exception as e:
-                    print(f"❌ Erro ao subir {relative_path}: {e}")
-
-    print(f"\nFinalizado! {uploaded} novas imagens foram enviadas para o bucket '{BUCKET_NAME}'.")
+    # Só envia arquivos novos ou alterados (manifesto de hashes), em paralelo,
+    # corrigindo content types e removendo objetos cujo arquivo local foi apagado.
+    # Opções (--force, --prune, --dry-run...): python media_sync.py --help
+    sync_media(MEDIA_DIR)
 
 if __name__ == "__main__":
     upload_images()
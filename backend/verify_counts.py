@@ -1,10 +1,49 @@
-import os
+"""
+Verify that the database matches the F1DB CSVs.
+
+For every table, concurrently:
+
+- the CSV rows are counted by scanning the file through mmap (no parsing)
+- the table is checked through the f1db_chunk_checksums RPC
+  (sql_scripts/07_verify_checksums.sql): rows are split into chunks by a hash
+  of their key, and each chunk's row count and content checksum are compared
+  with the same values computed from the CSV. Both sides hash every value in
+  the canonical form of its column type (f1db_column_kinds), and repeated
+  primary keys in the CSV keep only their last row, as the loader does
+- without the RPC installed, or with --counts-only, only the row counts are compared
+
+Mismatching chunks are listed in verify_report.json and can be re-sent with
+--resync, which writes only the CSV rows of those chunks:
+
+    python verify_counts.py
+    python verify_counts.py --counts-only --tables-file tables_list.json
+    python verify_counts.py --resync
+    python verify_counts.py --checksum     # compare with the f1db_sync manifest
+"""
+
+import argparse
+import csv
+import hashlib
 import json
-import pandas as pd
+import mmap
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Optional, Tuple
+
 from supabase import create_client, Client
 from dotenv import load_dotenv
 
 DATA_DIR = "./data"
+REPORT_PATH = "./verify_report.json"
+DEFAULT_WORKERS = 8
+# Target rows per checksum chunk
+CHUNK_ROWS = 1000
+
+_SEPARATOR = "\x1f"
+_NULL = "\\N"
+
 
 def init_supabase() -> Client:
     load_dotenv()
@@ -12,29 +51,285 @@ def init_supabase() -> Client:
     key = os.getenv("SUPABASE_KEY")
     return create_client(url, key)
 
-def verify():
+
+def count_csv_rows(path: str) -> int:
+    """Data rows of a CSV (lines minus the header), counted without parsing."""
+    if os.path.getsize(path) == 0:
+        return 0
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        lines = sum(mm[i:i + (1 << 20)].count(b"\n") for i in range(0, len(mm), 1 << 20))
+        if mm[-1:] != b"\n":
+            lines += 1
+    return max(0, lines - 1)
+
+
+def expected_rows(path: str, table: str) -> int:
+    """Rows the table should hold: CSV rows minus repeated primary keys (the loader keeps the last)."""
+    from bulk_loader import PRIMARY_KEYS, superseded_rows
+
+    rows = count_csv_rows(path)
+    if table in PRIMARY_KEYS:
+        rows -= len(superseded_rows(path, PRIMARY_KEYS[table]))
+    return rows
+
+
+def bucket_count(rows: int) -> int:
+    return max(1, rows // CHUNK_ROWS)
+
+
+def _text(values: List[Optional[str]]) -> bytes:
+    return _SEPARATOR.join(_NULL if v is None else v for v in values).encode()
+
+
+def _number(value: str) -> str:
+    number = Decimal(value)
+    return "0" if number == 0 else format(number.normalize(), "f")
+
+
+def _seconds(value: str) -> str:
+    hours, minutes, *seconds = value.split(":")
+    return _number(str(int(hours) * 3600 + int(minutes) * 60 + Decimal(seconds[0] if seconds else "0")))
+
+
+_CANONICAL = {
+    "number": _number,
+    "boolean": lambda v: "true" if v.strip().lower() in ("true", "t", "1", "yes", "y", "on") else "false",
+    "time": _seconds,
+    "date": lambda v: date.fromisoformat(v).isoformat(),
+}
+
+
+def canonical(value: Optional[str], kind: str) -> Optional[str]:
+    """A CSV value in the text form f1db_chunk_checksums gives a column of this kind."""
+    if value is None or kind not in _CANONICAL:
+        return value
+    try:
+        return _CANONICAL[kind](value)
+    except (ValueError, InvalidOperation):
+        # Postgres would not have accepted it either; leave it to mismatch
+        return value
+
+
+def row_bucket(key_values: List[Optional[str]], buckets: int) -> int:
+    return int(hashlib.md5(_text(key_values)).hexdigest()[:8], 16) % buckets
+
+
+def row_checksum(values: List[Optional[str]]) -> int:
+    return int(hashlib.md5(_text(values)).hexdigest()[:15], 16)
+
+
+def _csv_rows(path: str):
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        columns = [name.lower() for name in next(reader)]
+        yield columns
+        for values in reader:
+            yield [v if v != "" else None for v in values]
+
+
+def csv_header(path: str) -> List[str]:
+    return next(_csv_rows(path))
+
+
+def csv_chunk_checksums(path: str, table: str, buckets: int,
+                        kinds: Dict[str, str]) -> Tuple[List[str], Dict[int, List[int]]]:
+    """Same chunks and checksums as f1db_chunk_checksums, from the CSV."""
+    from bulk_loader import PRIMARY_KEYS
+    from f1db_sync import table_key
+
+    rows = _csv_rows(path)
+    columns = next(rows)
+    key = table_key(table, columns)
+    key_idx = [columns.index(c) for c in key]
+    column_kinds = [kinds.get(c, "text") for c in columns]
+
+    def normalized(values: List[Optional[str]]) -> List[Optional[str]]:
+        return [canonical(v, k) for v, k in zip(values, column_kinds)]
+
+    if table in PRIMARY_KEYS:
+        # Repeated keys: only the last row reaches the database
+        latest = {tuple(values[i] for i in key_idx): values for values in rows}
+        rows = iter(latest.values())
+
+    chunks: Dict[int, List[int]] = {}
+    for values in rows:
+        values = normalized(values)
+        bucket = row_bucket([values[i] for i in key_idx], buckets)
+        entry = chunks.setdefault(bucket, [0, 0])
+        entry[0] += 1
+        entry[1] += row_checksum(values)
+    return key, chunks
+
+
+def db_count(supabase: Client, table: str) -> int:
+    res = supabase.from_(table).select("*", count="exact", head=True).execute()
+    return res.count
+
+
+def db_column_kinds(supabase: Client, table: str, columns: List[str]) -> Optional[Dict[str, str]]:
+    """Column kinds from the database, or None if the RPC is not installed."""
+    try:
+        res = supabase.rpc("f1db_column_kinds", {"p_table": table, "p_columns": columns}).execute()
+    except Exception as e:
+        if "f1db_column_kinds" in str(e):
+            return None
+        raise
+    return {row["column_name"]: row["kind"] for row in res.data or []}
+
+
+def db_chunk_checksums(supabase: Client, table: str, columns: List[str], key: List[str],
+                       buckets: int) -> Optional[Dict[int, List[int]]]:
+    """Chunk counts/checksums from the database, or None if the RPC is not installed."""
+    try:
+        res = supabase.rpc("f1db_chunk_checksums", {
+            "p_table": table, "p_columns": columns, "p_key": key, "p_buckets": buckets,
+        }).execute()
+    except Exception as e:
+        if "f1db_chunk_checksums" in str(e):
+            return None
+        raise
+    return {row["bucket"]: [row["row_count"], int(row["checksum"])] for row in res.data or []}
+
+
+def check_table(supabase: Client, item: Dict[str, Any], counts_only: bool) -> Dict[str, Any]:
+    table = item["table"]
+    path = os.path.join(DATA_DIR, item["csv"])
+    csv_count = expected_rows(path, table)
+    result: Dict[str, Any] = {"csv": csv_count}
+    try:
+        if not counts_only:
+            buckets = bucket_count(csv_count)
+            columns = csv_header(path)
+            kinds = db_column_kinds(supabase, table, columns)
+            db_chunks = None
+            if kinds is not None:
+                key, csv_chunks = csv_chunk_checksums(path, table, buckets, kinds)
+                db_chunks = db_chunk_checksums(supabase, table, columns, key, buckets)
+            if db_chunks is not None:
+                bad = sorted(
+                    b for b in set(csv_chunks) | set(db_chunks)
+                    if csv_chunks.get(b) != db_chunks.get(b)
+                )
+                result.update({
+                    "db": sum(count for count, _ in db_chunks.values()),
+                    "chunks": buckets,
+                    "bad_chunks": bad,
+                    "status": "OK" if not bad else "FAILED",
+                })
+                return result
+            result["note"] = "f1db_column_kinds / f1db_chunk_checksums RPCs not installed, counts only"
+        result["db"] = db_count(supabase, table)
+        result["status"] = "OK" if result["db"] == csv_count else "FAILED"
+    except Exception as e:
+        result.update({"db": 0, "status": f"ERROR: {e}"})
+    return result
+
+
+def verify(tables_file: str = "tables_list.json", counts_only: bool = False,
+           workers: int = DEFAULT_WORKERS) -> Dict[str, Any]:
     supabase = init_supabase()
-    with open("tables_list.json", "r") as f:
+    with open(tables_file, "r") as f:
         tables_order = json.load(f)
+    items = [item for item in tables_order if os.path.exists(os.path.join(DATA_DIR, item["csv"]))]
 
-    report = {}
-    for item in tables_order:
-        csv_file = os.path.join(DATA_DIR, item["csv"])
-        table_name = item["table"]
-        if not os.path.exists(csv_file):
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda item: check_table(supabase, item, counts_only), items))
+    report = {item["table"]: result for item, result in zip(items, results)}
+
+    with open(REPORT_PATH, "w") as f:
+        json.dump({"tables_file": tables_file, "tables": report}, f, indent=2)
+    print(json.dumps(report, indent=2))
+    return report
+
+
+def resync(report_path: str = REPORT_PATH):
+    """Re-send the CSV rows of the chunks reported as bad by the last verification."""
+    from f1db_sync import PRIMARY_KEYS, delete_keys, key_string, table_key, write_rows
+    from bulk_loader import DEFAULT_RETRIES
+
+    supabase = init_supabase()
+    with open(report_path) as f:
+        saved = json.load(f)
+    with open(saved["tables_file"]) as f:
+        csv_of = {item["table"]: item["csv"] for item in json.load(f)}
+
+    for table, result in saved["tables"].items():
+        bad = set(result.get("bad_chunks") or [])
+        if not bad:
             continue
-            
-        df = pd.read_csv(csv_file, low_memory=False)
-        csv_count = len(df)
-        
+        rows = _csv_rows(os.path.join(DATA_DIR, csv_of[table]))
+        columns = next(rows)
+        key = table_key(table, columns)
+        key_idx = [columns.index(c) for c in key]
+        # Chunks are assigned on the canonical key values, as in check_table
+        kinds = db_column_kinds(supabase, table, columns) or {}
+        key_kinds = [kinds.get(c, "text") for c in key]
+
+        def bucket(values: List[Optional[str]]) -> int:
+            return row_bucket([canonical(values[i], k) for i, k in zip(key_idx, key_kinds)], result["chunks"])
+
+        # Last row per key, as a sequential load would leave it
+        selected = list({
+            key_string(row, key): row
+            for row in (dict(zip(columns, values)) for values in rows if bucket(values) in bad)
+        }.values())
+        if table not in PRIMARY_KEYS:
+            # No upsert without a primary key: replace the rows of those chunks
+            delete_keys(supabase, table, key, list({key_string(r, key) for r in selected}), DEFAULT_RETRIES)
+        write_rows(supabase, table, selected, table in PRIMARY_KEYS, DEFAULT_RETRIES)
+        print(f"🔁 {table}: re-sent {len(selected)} rows from {len(bad)} chunks")
+
+
+def verify_checksums():
+    """
+    Incremental-sync mode: compare against f1db_sync_manifest.json instead of
+    re-reading every CSV. A table is OK when its CSV still has the checksum
+    that was last synced and the database holds the manifest's row count.
+    """
+    from f1db_sync import MANIFEST_PATH, file_digest, load_manifest
+
+    supabase = init_supabase()
+    manifest = load_manifest(MANIFEST_PATH)
+
+    def check(table_name: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+        csv_file = os.path.join(DATA_DIR, entry["csv"])
+        if not os.path.exists(csv_file):
+            return {"status": "MISSING CSV"}
+        synced = file_digest(csv_file) == entry["csv_sha256"]
         try:
-            res = supabase.from_(table_name).select("*", count="exact", head=True).execute()
-            db_count = res.count
-            report[table_name] = {"csv": csv_count, "db": db_count, "status": "OK" if csv_count == db_count else "FAILED"}
+            count = db_count(supabase, table_name)
         except Exception as e:
-            report[table_name] = {"csv": csv_count, "db": 0, "status": f"ERROR: {e}"}
+            return {"csv": entry["row_count"], "db": 0, "status": f"ERROR: {e}"}
+        if not synced:
+            status = "PENDING SYNC"
+        elif count != entry["row_count"]:
+            status = "FAILED"
+        else:
+            status = "OK"
+        return {"csv": entry["row_count"], "db": count, "checksum": entry["checksum"][:16], "status": status}
 
+    with ThreadPoolExecutor(max_workers=DEFAULT_WORKERS) as pool:
+        futures = {name: pool.submit(check, name, entry) for name, entry in manifest["tables"].items()}
+    report = {name: future.result() for name, future in futures.items()}
     print(json.dumps(report, indent=2))
 
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify the database against the F1DB CSVs")
+    parser.add_argument("--tables-file", default="tables_list.json")
+    parser.add_argument("--counts-only", action="store_true", help="Compare row counts only")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--resync", action="store_true", help="Re-send the bad chunks of the last report")
+    parser.add_argument("--checksum", action="store_true", help="Compare with the f1db_sync manifest")
+    args = parser.parse_args()
+
+    if args.checksum:
+        verify_checksums()
+    elif args.resync:
+        resync()
+    else:
+        verify(args.tables_file, args.counts_only, args.workers)
+
+
 if __name__ == "__main__":
-    verify()
+    main()
@@ -55,7 +55,8 @@ export default function DriverComparePage() {
         async () => {
             if (!driver1 || !driver2) return null;
             // Defaults to 2024 round 21 (Vegas) for guaranteed FastF1 data during testing
-            return f1Service.getCompareTelemetry(2024, 21, "R", driver1, driver2);
+            // driver2 is the reference, so driver1's delta is negative where driver1 is ahead
+            return f1Service.getCompareTelemetry(2024, 21, "R", [driver1, driver2], driver2);
         },
         [driver1, driver2],
         !driver1 || !driver2
@@ -63,12 +64,12 @@ export default function DriverComparePage() {
 
     // === SPEED TRACE OVERLAY ===
     const speedOption = useMemo(() => {
-        const d1Data = (telemetryData as any)?.[driver1]?.telemetry;
-        const d2Data = (telemetryData as any)?.[driver2]?.telemetry;
+        const d1Data = (telemetryData as any)?.drivers?.[driver1]?.telemetry;
+        const d2Data = (telemetryData as any)?.drivers?.[driver2]?.telemetry;
 
         const d1SpeedData = d1Data ? d1Data.Speed : mockTelemetryVER.map((s) => s.speed);
         const d2SpeedData = d2Data ? d2Data.Speed : mockTelemetryNOR.map((s) => s.speed);
-        const distanceAxis = d1Data ? d1Data.Distance.map((d: number) => Math.round(d)) : mockTelemetryVER.map((s) => Math.round(s.distance));
+        const distanceAxis = d1Data ? (telemetryData as any).distance.map((d: number) => Math.round(d)) : mockTelemetryVER.map((s) => Math.round(s.distance));
 
         return {
             backgroundColor: "transparent",
@@ -174,8 +175,8 @@ export default function DriverComparePage() {
         series: [
             {
                 type: "line",
-                data: (telemetryData as any)?.delta?.length
-                    ? (telemetryData as any).delta.map((d: { distance: number; delta: number }) => [d.distance, d.delta])
+                data: (telemetryData as any)?.drivers?.[driver1]?.delta?.length
+                    ? (telemetryData as any).drivers[driver1].delta.map((delta: number, i: number) => [(telemetryData as any).distance[i], delta])
                     : mockDelta.map((d) => [d.distance, d.deltaTime]),
                 smooth: true,
                 showSymbol: false,
@@ -188,7 +189,7 @@ export default function DriverComparePage() {
                 },
             },
         ],
-    }), [d1Info, d2Info, telemetryData]);
+    }), [driver1, d1Info, d2Info, telemetryData]);
 
     const tabs = [
         { key: "speed" as const, label: t('tabSpeedTrace'), icon: Zap },
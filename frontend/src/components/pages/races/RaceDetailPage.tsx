@@ -37,6 +37,7 @@ export default function RaceDetailPage({ raceId, year, round }: RaceDetailPagePr
     const [stintsData, setStintsData] = useState<any[]>([]);
     const [speedTrapsData, setSpeedTrapsData] = useState<any[]>([]);
     const [minisectorsData, setMinisectorsData] = useState<any[]>([]);
+    const [trackGeometry, setTrackGeometry] = useState<{ indices: number[]; points: number[][] } | null>(null);
     const [bestSectorsData, setBestSectorsData] = useState<any[]>([]);
 
     useEffect(() => {
@@ -199,11 +200,18 @@ export default function RaceDetailPage({ raceId, year, round }: RaceDetailPagePr
                     stints?: any[];
                     speed_traps?: any[];
                     minisectors?: any[];
+                    track_layout?: string | null;
                     best_sectors?: any[];
                 };
 
+                // Minisectors reference a shared, cacheable track outline by index range
+                const geometry = data.track_layout
+                    ? await api.get(`/circuits/layouts/${data.track_layout}/geometry`).catch(() => null) as { indices: number[]; points: number[][] } | null
+                    : null;
+
                 setStintsData(data.stints || []);
                 setSpeedTrapsData(data.speed_traps || []);
+                setTrackGeometry(geometry);
                 setMinisectorsData(data.minisectors || []);
                 setBestSectorsData(data.best_sectors || []);
 
@@ -211,6 +219,7 @@ export default function RaceDetailPage({ raceId, year, round }: RaceDetailPagePr
                 console.error("FastF1 Error:", err);
                 setStintsData([]);
                 setSpeedTrapsData([]);
+                setTrackGeometry(null);
                 setMinisectorsData([]);
                 setBestSectorsData([]);
             } finally {
@@ -318,8 +327,23 @@ export default function RaceDetailPage({ raceId, year, round }: RaceDetailPagePr
     const trackPaths = React.useMemo(() => {
         if (!minisectorsData || minisectorsData.length === 0) return null;
 
+        // Resolve each segment's index range into points of the shared track outline
+        const segmentPoints = (segment: any): number[][] => {
+            if (segment.points) return segment.points;
+            if (!trackGeometry) return [];
+            const { indices, points } = trackGeometry;
+            const first = indices.findIndex(idx => idx >= segment.start_index);
+            if (first === -1) return [];
+            let last = indices.findIndex(idx => idx > segment.end_index);
+            if (last === -1) last = indices.length;
+            // Simplified outlines may have no point inside a short straight segment,
+            // so extend to the neighbouring points to keep the path continuous
+            return points.slice(Math.max(0, first - 1), Math.min(points.length, last + 1));
+        };
+        const segments = minisectorsData.map(segment => ({ ...segment, points: segmentPoints(segment) }));
+
         let minX = Infinity, maxX = -Infinity, minY = Infinity, maxY = -Infinity;
-        minisectorsData.forEach(segment => {
+        segments.forEach(segment => {
             if (!segment.points) return;
             segment.points.forEach(([x, y]: number[]) => {
                 if (x < minX) minX = x;
@@ -341,7 +365,7 @@ export default function RaceDetailPage({ raceId, year, round }: RaceDetailPagePr
         const cx = 100 - ((maxX + minX) / 2) * scale;
         const cy = 100 + ((maxY + minY) / 2) * scale; // Invert Y axis for map orientation
 
-        return minisectorsData.map(segment => {
+        return segments.map(segment => {
             if (!segment.points || segment.points.length === 0) return null;
             const ref = currentResults.find(r => r.driverAbbrev === segment.fastest_driver) || raceResults.find(r => r.driverAbbrev === segment.fastest_driver);
             const color = ref ? ref.constructorColor : "#ffffff";
@@ -360,7 +384,7 @@ export default function RaceDetailPage({ raceId, year, round }: RaceDetailPagePr
             };
         }).filter(Boolean);
 
-    }, [minisectorsData, currentResults, raceResults]);
+    }, [minisectorsData, trackGeometry, currentResults, raceResults]);
 
     const parseTimeToMs = (timeString: string) => {
         if (!timeString || timeString === "\\N") return null;
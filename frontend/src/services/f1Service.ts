@@ -106,9 +106,11 @@ export const f1Service = {
         return this.pollJob(job.job_id);
     },
 
-    async getCompareTelemetry(year: number, round: number, sessionName: string, driver1: string, driver2: string) {
-        // Start the background job
-        const job: any = await api.post(`/telemetry/${year}/${round}/${sessionName}/compare/job?driver1=${driver1}&driver2=${driver2}`);
+    async getCompareTelemetry(year: number, round: number, sessionName: string, drivers: string[], reference?: string) {
+        // Start the background job; the result is aligned on a common distance grid with a delta trace per driver
+        const params = new URLSearchParams({ drivers: drivers.join(",") });
+        if (reference) params.set("reference", reference);
+        const job: any = await api.post(`/telemetry/${year}/${round}/${sessionName}/compare/job?${params}`);
         return this.pollJob(job.job_id);
     }
 };